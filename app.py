@@ -1,7 +1,7 @@
 import os
 import sys
 import datetime
-import uma_detail
+from src import daemon_client, errors
 
 
 dt_now = datetime.datetime.now()
@@ -13,14 +13,21 @@ if not os.path.exists(path):
     msg = "ERROR [{0}] : 存在するファイルを指定して下さい。\n".format(dt_now)
 else:
     try:
-        src = uma_detail.imread_umadetail(path)
-        txt = uma_detail.get_status_to_json(src)
+        # 常駐プロセス（daemon.py）が起動している場合はそちらで読み取る
+        txt = daemon_client.recognize(path)
+        if txt is None:
+            import uma_detail
+            src = uma_detail.imread_umadetail(path)
+            txt = uma_detail.get_status_to_json(src)
         print("結果")
         print(txt)
         msg = "INFO [{0}] : {1}\n".format(dt_now, txt)
-    except IndexError as e:
-        print("ファイルの読込に失敗しました。PNG形式のウマ娘詳細画面を使用して下さい。")
-        msg = "ERROR [{0}] : ファイルの読込に失敗しました。PNG形式のウマ娘詳細画面を使用して下さい。\n".format(dt_now)
+    except errors.NotDetailScreenError as e:
+        print("ウマ娘詳細画面が見つかりませんでした。ウマ娘詳細画面のスクリーンショットを使用して下さい。")
+        msg = "ERROR [{0}] : ウマ娘詳細画面が見つかりませんでした。({1})\n".format(dt_now, e)
+    except errors.UmaDetailError as e:
+        print("ファイルの読込に失敗しました。PNG・JPEG形式のウマ娘詳細画面を使用して下さい。")
+        msg = "ERROR [{0}] : ファイルの読込に失敗しました。PNG・JPEG形式のウマ娘詳細画面を使用して下さい。\n".format(dt_now)
 
 with open("result.log", mode='a', encoding='utf-8') as fstream:
     fstream.write(msg)
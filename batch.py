@@ -0,0 +1,188 @@
+import argparse
+import glob
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import time
+
+import uma_detail
+from src import detail_result, metrics, recognize, result_cache, template_store
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+
+# ワーカープロセスごとの読み取り結果のキャッシュ
+cache = None
+
+
+def find_images(targets: list) -> list:
+    """
+    指定されたファイル・ディレクトリ・globパターンから、読み込む画像のパスの一覧を作成する。
+    :param targets: ファイル・ディレクトリ・globパターンのリスト
+    :return: 画像のパスのリスト（重複なし、指定順）
+    """
+    paths = []
+    for target in targets:
+        if os.path.isdir(target):
+            for root, dirs, files in os.walk(target):
+                dirs.sort()
+                paths += [os.path.join(root, f) for f in sorted(files) if f.lower().endswith(IMAGE_EXTENSIONS)]
+        elif os.path.isfile(target):
+            paths.append(target)
+        else:
+            paths += sorted(p for p in glob.glob(target, recursive=True)
+                            if os.path.isfile(p) and p.lower().endswith(IMAGE_EXTENSIONS))
+    return list(dict.fromkeys(os.path.normpath(p) for p in paths))
+
+
+def load_processed(output: str) -> set:
+    """
+    出力済みのjsonlファイルから、読み取りに成功した画像のパスを取得する。
+    途中で中断した場合の不完全な行は無視する。
+    読み取りに失敗した画像（"error"の行）は含めないため、再開した場合は読み取り直す。
+    :param output: jsonlファイルのパス
+    :return: 処理済みの画像のパスのset
+    """
+    processed = set()
+    if not os.path.exists(output):
+        return processed
+    with open(output, mode='rt', encoding='utf-8') as fstream:
+        for line in fstream:
+            try:
+                record = json.loads(line)
+                if "result" in record:
+                    processed.add(record["path"])
+            except (ValueError, KeyError, TypeError):
+                continue
+    return processed
+
+
+def __init_worker(cache_dir: str = None, metrics_log: bool = False):
+    # テンプレート画像を先に読み込んでおく
+    template_store.preload()
+    global cache
+    cache = result_cache.ResultCache(directory=cache_dir)
+    if metrics_log:
+        # 処理時間・件数などの計測結果を1行1件のjsonとして標準エラー出力に出力する
+        logging.basicConfig(stream=sys.stderr, level=logging.INFO, format="%(message)s")
+        metrics.enable()
+
+
+def process_image(args: tuple) -> dict:
+    """
+    画像1枚を読み取る。失敗した場合も例外は送出せず、エラー内容を結果として返す。
+    :param args: (画像のパス, ステータスの読み取り方法, 縮小して読み込むかどうか)
+    :return: {"path": パス, "result": 読み取り結果(DetailResult)} もしくは {"path": パス, "error": エラー内容}
+             "elapsed"に処理時間[秒]、"peak_rss"にワーカープロセスの最大メモリ使用量[MB]を追加する
+    """
+    path, backend, reduced = args
+    start = time.perf_counter()
+    try:
+        src = uma_detail.imread_umadetail(path, reduced=reduced)
+        record = {"path": path, "result": uma_detail.get_status_result(src, backend, cache)}
+    except (Exception, SystemExit) as e:
+        # 文字認識のツールが無い場合はSystemExitになるため、それも1件のエラーとして扱う
+        record = {"path": path, "error": "{0}: {1}".format(type(e).__name__, e)}
+    record["elapsed"] = round(time.perf_counter() - start, 3)
+    record["peak_rss"] = metrics.get_peak_rss()
+    return record
+
+
+def format_record(record: dict) -> str:
+    """
+    process_imageの結果をjsonlの1行にする。読み取り結果はDetailResult.to_jsonの文字列をそのまま埋め込む。
+    :param record: process_imageの結果
+    :return: json文字列（改行なし）
+    """
+    if "result" not in record:
+        return json.dumps(record, ensure_ascii=False)
+    return '{{"path": {0}, "result": {1}, "elapsed": {2}, "peak_rss": {3}}}'.format(
+        json.dumps(record["path"], ensure_ascii=False), record["result"].to_json(), json.dumps(record["elapsed"]),
+        json.dumps(record["peak_rss"]))
+
+
+def run(paths: list, output, processes: int, backend: str = recognize.BACKEND_TESSERACT,
+        cache_dir: str = None, metrics_log: bool = False, export: detail_result.ColumnWriter = None,
+        reduced: bool = False) -> list:
+    """
+    画像をプロセスプールで並列に読み取り、終わった順に1行1件のjsonとして出力する。
+    :param paths: 画像のパスのリスト
+    :param output: 出力先（書き込み可能なファイルオブジェクト）
+    :param processes: プロセス数
+    :param backend: ステータスの読み取り方法
+    :param cache_dir: 読み取り結果をキャッシュするディレクトリ
+    :param metrics_log: Trueの場合、計測結果を標準エラー出力に出力する
+    :param export: 指定した場合、読み取りに成功した結果を列ごとの形式（CSV・npz）にも出力する
+    :param reduced: Trueの場合、大きなJPEGは縮小して読み込む（uma_detail.imread_umadetailを参照）
+    :return: [成功件数, 失敗件数, ワーカープロセスの最大メモリ使用量[MB]]
+    """
+    count = [0, 0, None]
+    with multiprocessing.Pool(processes, initializer=__init_worker, initargs=(cache_dir, metrics_log)) as pool:
+        for record in pool.imap_unordered(process_image, [(path, backend, reduced) for path in paths]):
+            output.write(format_record(record) + "\n")
+            output.flush()
+            count["error" in record] += 1
+            if record["peak_rss"] is not None:
+                count[2] = max(count[2] or 0, record["peak_rss"])
+            if export is not None and "result" in record:
+                export.write(record["path"], record["result"])
+    return count
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description="ウマ娘詳細画面の画像をまとめて読み取り、結果をjsonl形式で出力します。")
+    parser.add_argument("targets", nargs="+", help="画像ファイル・ディレクトリ・globパターン")
+    parser.add_argument("-o", "--output", help="出力するjsonlファイル 省略した場合は標準出力")
+    parser.add_argument("-j", "--processes", type=int, default=os.cpu_count(), help="プロセス数")
+    parser.add_argument("--backend", default=recognize.BACKEND_TESSERACT,
+                        choices=recognize.BACKENDS, help="ステータスの読み取り方法")
+    parser.add_argument("--no-resume", action="store_true", help="出力ファイルに記録済みの画像も読み取り直す")
+    parser.add_argument("--cache-dir", help="読み取り結果をキャッシュするディレクトリ 同じ画像は読み取りを省略する")
+    parser.add_argument("--metrics", action="store_true", help="処理時間・件数などの計測結果をjsonで標準エラー出力に出力する")
+    parser.add_argument("--reduced-decode", action="store_true",
+                        help="大きなJPEGを縮小して読み込み、処理時間とメモリを減らす（適性などの読み取り結果が変わる場合がある）")
+    parser.add_argument("--export", help="読み取り結果を列ごとにまとめて出力するファイル（.csv もしくは .npz）"
+                                         " 今回読み取った画像の結果のみを出力する")
+    args = parser.parse_args(argv)
+
+    export = detail_result.ColumnWriter(args.export) if args.export else None
+    try:
+        return __run_main(args, export)
+    finally:
+        if export is not None:
+            export.close()
+
+
+def __run_main(args, export: detail_result.ColumnWriter) -> int:
+    paths = find_images(args.targets)
+    if args.output is None:
+        count = run(paths, sys.stdout, args.processes, args.backend, args.cache_dir, args.metrics, export,
+                    args.reduced_decode)
+    else:
+        # 出力ファイルに記録済みの画像は読み取らない（中断した処理の再開）
+        processed = set() if args.no_resume else load_processed(args.output)
+        skipped = len(paths)
+        paths = [path for path in paths if path not in processed]
+        skipped -= len(paths)
+
+        mode = 'w' if args.no_resume else 'a'
+        with open(args.output, mode=mode, encoding='utf-8') as fstream:
+            # 中断により最終行が途中で終わっている場合は改行しておく
+            if fstream.tell() > 0:
+                with open(args.output, mode='rb') as last:
+                    last.seek(-1, os.SEEK_END)
+                    if last.read(1) != b"\n":
+                        fstream.write("\n")
+            count = run(paths, fstream, args.processes, args.backend, args.cache_dir, args.metrics, export,
+                        args.reduced_decode)
+        print("スキップ: {0}件".format(skipped), file=sys.stderr)
+
+    print("成功: {0}件 失敗: {1}件".format(count[0], count[1]), file=sys.stderr)
+    if count[2] is not None:
+        print("ワーカープロセスの最大メモリ使用量: {0}MB".format(count[2]), file=sys.stderr)
+    return 1 if count[1] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
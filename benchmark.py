@@ -0,0 +1,166 @@
+import argparse
+import datetime
+import glob
+import json
+import platform
+import sys
+import time
+
+import cv2
+import numpy
+import pyocr
+
+import uma_detail
+from src import info_json as info, metrics, recognize
+
+# extractは詳細画面の部分の抽出、resizeは高さ1000pxへのリサイズ（uma_detail.extract_umadetailの中の処理）
+# totalは画像の読み込みから読み取り結果の作成まで（uma_detail.imread_umadetail + get_status_result）
+STAGES = ["decode", "extract", "resize", "skill_anchor", "skill_matching", "status_ocr", "aptitude", "total"]
+
+
+def run_stages(path: str, backend: str, roi: bool = False, reduced: bool = False) -> dict:
+    """
+    画像1枚を読み取り、処理段階ごとの処理時間を計測する。
+    totalは処理段階ごとの計測とは別に、公開している関数で画像の読み込みから全体を読み取った時間。
+    :param path: 画像のパス
+    :param backend: ステータスの読み取り方法
+    :param roi: Trueの場合、全体をリサイズせずに読み取る（uma_detail.extract_umadetailを参照）
+    :param reduced: Trueの場合、大きなJPEGは縮小して読み込む（uma_detail.decode_imageを参照）
+    :return: {処理段階: 秒}
+    """
+    times = {}
+
+    def measure(stage, func, *args):
+        start = time.perf_counter()
+        result = func(*args)
+        times[stage] = time.perf_counter() - start
+        return result
+
+    img = measure("decode", uma_detail.decode_image, path, reduced)
+    img = measure("extract", uma_detail.__extract, img)
+    img = measure("resize", uma_detail.__resize, img, roi)
+    start_pos = measure("skill_anchor", uma_detail.get_skill_start_pos, img)
+    measure("skill_matching", uma_detail.get_skill_from_pos, img, start_pos, {}, False)
+    measure("status_ocr", uma_detail.get_status_numbers, [img], None, backend)
+    measure("aptitude", uma_detail.get_suitable_all, img)
+    measure("total", lambda: uma_detail.get_status_result(uma_detail.imread_umadetail(path, roi, reduced), backend))
+    return times
+
+
+def summarize(samples: list) -> dict:
+    """
+    処理時間の一覧から統計値を求める。
+    :param samples: 秒のリスト
+    :return: {"count", "mean", "p50", "p95", "min", "throughput"} 時間はミリ秒、throughputは1秒あたりの件数
+    """
+    values = numpy.array(samples) * 1000
+    return {"count": len(values),
+            "mean": round(float(values.mean()), 3),
+            "p50": round(float(numpy.percentile(values, 50)), 3),
+            "p95": round(float(numpy.percentile(values, 95)), 3),
+            "min": round(float(values.min()), 3),
+            "throughput": round(1000 / float(values.mean()), 2) if values.mean() > 0 else None}
+
+
+def benchmark(paths: list, iterations: int, backend: str, threads: int = 0, roi: bool = False,
+              reduced: bool = False) -> dict:
+    """
+    全ての画像を指定回数ずつ読み取り、処理段階ごとの統計値を求める。
+    :param paths: 画像のパスのリスト
+    :param iterations: 繰り返し回数
+    :param backend: ステータスの読み取り方法
+    :param threads: 並列に読み取るスレッド数（計測結果に記録するのみ）
+    :param roi: Trueの場合、全体をリサイズせずに読み取る
+    :param reduced: Trueの場合、大きなJPEGは縮小して読み込む
+    :return: 計測結果 "meta"の"peak_rss"は計測終了時点の最大メモリ使用量[MB]
+    """
+    # テンプレート画像の読み込みなど、初回のみの処理を計測に含めないように1回ずつ実行しておく
+    for path in paths:
+        run_stages(path, backend, roi, reduced)
+
+    samples = {stage: [] for stage in STAGES}
+    for _ in range(iterations):
+        for path in paths:
+            for stage, elapsed in run_stages(path, backend, roi, reduced).items():
+                samples[stage].append(elapsed)
+
+    return {"meta": {"created": datetime.datetime.now().isoformat(timespec="seconds"),
+                     "python": platform.python_version(), "opencv": cv2.__version__, "numpy": numpy.__version__,
+                     "backend": backend, "threads": threads, "roi": roi, "reduced": reduced,
+                     "iterations": iterations, "images": paths, "peak_rss": metrics.get_peak_rss()},
+            "stages": {stage: summarize(values) for stage, values in samples.items()}}
+
+
+def compare(result: dict, baseline: dict, threshold: float, min_delta: float) -> list:
+    """
+    基準の計測結果と比較して、遅くなった処理段階を返す。
+    :param result: 今回の計測結果
+    :param baseline: 基準の計測結果
+    :param threshold: p50がこの割合を超えて遅くなった場合に遅くなったとする（0.1なら10%）
+    :param min_delta: 差がこのミリ秒以下の場合は誤差として扱う
+    :return: [[処理段階, 基準のp50, 今回のp50, 比率], ...]
+    """
+    regressions = []
+    for stage, stats in result["stages"].items():
+        base = baseline["stages"].get(stage)
+        if base is None:
+            continue
+        ratio = stats["p50"] / base["p50"] if base["p50"] > 0 else float("inf")
+        if ratio > 1 + threshold and stats["p50"] - base["p50"] > min_delta:
+            regressions.append([stage, base["p50"], stats["p50"], round(ratio, 2)])
+    return regressions
+
+
+def print_result(result: dict, baseline: dict = None):
+    print("{0:<15}{1:>10}{2:>10}{3:>10}{4:>12}{5:>10}".format("stage", "mean[ms]", "p50[ms]", "p95[ms]", "images/s",
+                                                            "vs base"))
+    for stage, stats in result["stages"].items():
+        base = (baseline or {}).get("stages", {}).get(stage)
+        diff = "{0:+.1f}%".format((stats["p50"] / base["p50"] - 1) * 100) if base and base["p50"] > 0 else ""
+        print("{0:<15}{1:>10.2f}{2:>10.2f}{3:>10.2f}{4:>12}{5:>10}".format(
+            stage, stats["mean"], stats["p50"], stats["p95"], stats["throughput"], diff))
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description="test/の画像を使用して、処理段階ごとの処理時間を計測します。")
+    parser.add_argument("images", nargs="*", help="計測に使用する画像 省略した場合はtest/のPNG・JPG")
+    parser.add_argument("-n", "--iterations", type=int, default=5, help="繰り返し回数")
+    parser.add_argument("-o", "--output", help="計測結果を出力するjsonファイル")
+    parser.add_argument("--backend", choices=recognize.BACKENDS,
+                        help="ステータスの読み取り方法 省略した場合はtesseractがあればtesseract")
+    parser.add_argument("--compare", help="比較する基準の計測結果（jsonファイル）")
+    parser.add_argument("--threshold", type=float, default=0.1, help="遅くなったと判定する割合")
+    parser.add_argument("--min-delta", type=float, default=0.5, help="誤差として扱う差[ms]")
+    parser.add_argument("--threads", type=int, default=0, help="1枚の画像を並列に読み取るスレッド数 0の場合は順番に処理する")
+    parser.add_argument("--roi", action="store_true", help="全体をリサイズせずに、読み取る部分だけを元の解像度から計算する")
+    parser.add_argument("--reduced-decode", action="store_true", help="大きなJPEGを縮小して読み込む")
+    args = parser.parse_args(argv)
+    uma_detail.set_workers(args.threads)
+
+    paths = args.images or sorted(glob.glob(info.get_path("test/*.PNG")) + glob.glob(info.get_path("test/*.jpg")))
+    backend = args.backend or (recognize.BACKEND_TESSERACT if pyocr.get_available_tools()
+                               else recognize.BACKEND_DIGIT)
+    result = benchmark(paths, args.iterations, backend, args.threads, args.roi, args.reduced_decode)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, mode='rt', encoding='utf-8') as fstream:
+            baseline = json.load(fstream)
+    print_result(result, baseline)
+    if result["meta"]["peak_rss"] is not None:
+        print("最大メモリ使用量: {0}MB".format(result["meta"]["peak_rss"]))
+
+    if args.output:
+        with open(args.output, mode='w', encoding='utf-8') as fstream:
+            json.dump(result, fstream, ensure_ascii=False, indent=2)
+
+    if baseline is not None:
+        regressions = compare(result, baseline, args.threshold, args.min_delta)
+        for stage, base, current, ratio in regressions:
+            print("遅くなっています: {0} {1}ms -> {2}ms (x{3})".format(stage, base, current, ratio))
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
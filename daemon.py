@@ -0,0 +1,184 @@
+import argparse
+import asyncio
+import concurrent.futures
+import json
+import os
+import subprocess
+import sys
+import time
+
+import uma_detail
+from src import daemon_client, recognize, skill_index, skill_matcher, template_store
+
+
+def warm_up():
+    # テンプレート画像・スキル名の索引・文字認識のツールを先に読み込んでおく
+    template_store.preload()
+    skill_matcher.get_signatures()
+    try:
+        recognize.get_tool()
+    except SystemExit:
+        # 文字認識のツールが無い場合も、digitでの読み取りは出来るため起動は続ける
+        pass
+
+
+def recognize_path(path: str, backend: str) -> dict:
+    """
+    画像1枚を読み取り、応答を作成する。
+    :param path: 画像のパス
+    :param backend: ステータスの読み取り方法
+    :return: {"result": json文字列} もしくは {"error": エラー内容, "type": 例外のクラス名}
+    """
+    # テンプレート画像・skill.jsonが更新されていた場合は読み込み直す（スキル名の照合用の縮小画像も作り直される）
+    template_store.reload_if_modified()
+    skill_index.reload_if_modified()
+    try:
+        return {"result": uma_detail.get_status_to_json(uma_detail.imread_umadetail(path), backend)}
+    except (Exception, SystemExit) as e:
+        return {"error": str(e), "type": type(e).__name__}
+
+
+class RecognitionDaemon:
+    """
+    読み込み済みの状態で常駐し、Unixドメインソケットで1行1件のjsonの要求を受け付ける。
+
+    {"command": "recognize", "path": 画像のパス, "backend": "tesseract"} : 画像を読み取る
+    {"command": "ping"}                                                   : 稼働状況
+    {"command": "shutdown"}                                               : 終了する
+    """
+
+    def __init__(self, socket_path: str, idle_timeout: float):
+        self.socket_path = socket_path
+        self.idle_timeout = idle_timeout
+        self.last_active = time.monotonic()
+        self.started = time.time()
+        self.count = 0
+        # 処理中の要求の件数（処理中は終了しない）
+        self.active = 0
+        # 読み取りは1件ずつ行う（待ち受けは止めない）
+        self.executor = concurrent.futures.ThreadPoolExecutor(1)
+        self.stopped = None
+
+    async def serve(self):
+        self.stopped = asyncio.Event()
+        daemon_client.make_socket_dir(self.socket_path)
+        if os.path.lexists(self.socket_path):
+            # 本人が作成したソケット以外は削除しない
+            if not daemon_client.is_trusted_socket(self.socket_path):
+                raise RuntimeError("not an own socket: {0}".format(self.socket_path))
+            if daemon_client.request({"command": "ping"}, self.socket_path, timeout=1) is not None:
+                raise RuntimeError("already running: {0}".format(self.socket_path))
+            # 前回異常終了した場合のソケットを削除する
+            os.remove(self.socket_path)
+
+        # 作成した時点で他のユーザーから接続できないように、ソケットは本人のみ読み書きできる権限で作成する
+        # （作成後にchmodすると、変更するまでの間に接続できてしまう）
+        umask = os.umask(0o177)
+        try:
+            server = await asyncio.start_unix_server(self.handle, self.socket_path)
+        finally:
+            os.umask(umask)
+        watchdog = asyncio.create_task(self.watch_idle())
+        try:
+            await self.stopped.wait()
+        finally:
+            watchdog.cancel()
+            server.close()
+            await server.wait_closed()
+            self.executor.shutdown()
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+
+    async def watch_idle(self):
+        # 一定時間要求が無い場合は終了する
+        while True:
+            remaining = self.idle_timeout - (time.monotonic() - self.last_active)
+            if remaining <= 0 and self.active == 0:
+                self.stopped.set()
+                return
+            await asyncio.sleep(min(max(remaining, 1), 60))
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.last_active = time.monotonic()
+        self.active += 1
+        try:
+            message = json.loads(await reader.readline())
+            response = await self.dispatch(message)
+        except (ValueError, AttributeError, KeyError) as e:
+            response = {"error": str(e), "type": type(e).__name__}
+        finally:
+            self.active -= 1
+        try:
+            writer.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            self.last_active = time.monotonic()
+
+    async def dispatch(self, message: dict) -> dict:
+        command = message.get("command")
+        if command == "recognize":
+            self.count += 1
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, recognize_path, message["path"],
+                                              message.get("backend", recognize.BACKEND_TESSERACT))
+        if command == "ping":
+            return {"status": "ok", "pid": os.getpid(), "requests": self.count,
+                    "uptime": round(time.time() - self.started, 1), "idle_timeout": self.idle_timeout}
+        if command == "shutdown":
+            self.stopped.set()
+            return {"status": "stopped"}
+        raise ValueError("unknown command: {0}".format(command))
+
+
+def start(socket_path: str, idle_timeout: float, wait: float = 30) -> bool:
+    """
+    常駐プロセスをバックグラウンドで起動し、待ち受けを開始するまで待つ。
+    :return: 起動できた場合True
+    """
+    if daemon_client.request({"command": "ping"}, socket_path, timeout=1) is not None:
+        return True
+    subprocess.Popen([sys.executable, os.path.abspath(__file__), "serve", "--socket", socket_path,
+                      "--idle-timeout", str(idle_timeout)],
+                     cwd=os.getcwd(), stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                     stderr=subprocess.DEVNULL, start_new_session=True)
+    deadline = time.monotonic() + wait
+    while time.monotonic() < deadline:
+        if daemon_client.request({"command": "ping"}, socket_path, timeout=1) is not None:
+            return True
+        time.sleep(0.2)
+    return False
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description="読み込み済みの状態で常駐し、app.pyからの読み取りを受け付けます。")
+    parser.add_argument("command", choices=["start", "serve", "stop", "status"],
+                        help="start: バックグラウンドで起動 serve: このプロセスで待ち受け stop: 終了 status: 稼働状況")
+    parser.add_argument("--socket", default=daemon_client.get_socket_path(), help="待ち受けるUnixドメインソケットのパス")
+    parser.add_argument("--idle-timeout", type=float, default=600, help="要求が無い場合に終了するまでの秒数")
+    args = parser.parse_args(argv)
+
+    if args.command == "start":
+        if not start(args.socket, args.idle_timeout):
+            print("起動できませんでした。", file=sys.stderr)
+            return 1
+        print(json.dumps(daemon_client.request({"command": "ping"}, args.socket), ensure_ascii=False))
+    elif args.command == "serve":
+        warm_up()
+        try:
+            asyncio.run(RecognitionDaemon(args.socket, args.idle_timeout).serve())
+        except KeyboardInterrupt:
+            pass
+    else:
+        response = daemon_client.request({"command": "shutdown" if args.command == "stop" else "ping"}, args.socket)
+        if response is None:
+            print("起動していません。", file=sys.stderr)
+            return 1
+        print(json.dumps(response, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
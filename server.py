@@ -0,0 +1,208 @@
+import argparse
+import asyncio
+import collections
+import concurrent.futures
+import json
+import os
+import sys
+import time
+import urllib.parse
+
+import uma_detail
+from src import errors, recognize, result_cache, skill_matcher, template_store
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+               411: "Length Required", 413: "Payload Too Large", 500: "Internal Server Error",
+               503: "Service Unavailable"}
+
+# ワーカープロセスごとの読み取り結果のキャッシュ
+cache = None
+
+
+def init_worker(cache_dir: str = None, threads: int = 0):
+    # テンプレート画像・スキル名の索引・照合用の縮小画像を先に読み込んでおく
+    template_store.preload()
+    uma_detail.set_workers(threads)
+    skill_matcher.get_signatures()
+    global cache
+    cache = result_cache.ResultCache(directory=cache_dir)
+
+
+def warm_up() -> int:
+    """
+    ワーカープロセスを起動させるための処理。
+    :return: プロセスID
+    """
+    return os.getpid()
+
+
+def recognize_image(data: bytes, backend: str) -> dict:
+    """
+    ワーカープロセスで画像データを読み取る。
+    :param data: 画像ファイルの内容
+    :param backend: ステータスの読み取り方法
+    :return: 読み取り結果
+    """
+    src = uma_detail.imread_umadetail(data)
+    return uma_detail.get_status_result(src, backend, cache).to_dict()
+
+
+class RecognitionServer:
+    """
+    画像を受け取り、読み取り結果をjsonで返すHTTPサーバー。
+    読み取りは起動済みのワーカープロセスで行い、処理待ちが上限を超えた場合は503を返す。
+
+    POST /recognize[?backend=digit] : リクエストボディの画像を読み取る（backendはrecognize.BACKENDSのいずれか）
+    GET  /health                    : 稼働状況
+    GET  /metrics                   : 処理件数・処理時間など
+    """
+
+    def __init__(self, workers: int, queue_size: int, max_body: int = 20 * 1024 * 1024, cache_dir: str = None,
+                 threads: int = 0):
+        self.workers = workers
+        self.cache_dir = cache_dir
+        # ワーカープロセスごとの、1枚の画像を並列に読み取るスレッド数
+        self.threads = threads
+        # 処理中と処理待ちを合わせた上限
+        self.capacity = workers + queue_size
+        self.max_body = max_body
+        self.executor = None
+        self.pending = 0
+        self.started = time.time()
+        self.counts = {"requests": 0, "succeeded": 0, "failed": 0, "rejected": 0}
+        self.latencies = collections.deque(maxlen=1000)
+
+    async def start(self, host: str, port: int) -> asyncio.AbstractServer:
+        self.executor = concurrent.futures.ProcessPoolExecutor(self.workers, initializer=init_worker,
+                                                              initargs=(self.cache_dir, self.threads))
+        # 全てのワーカープロセスを起動して、読み込みを済ませておく
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*[loop.run_in_executor(self.executor, warm_up) for _ in range(self.workers)])
+        return await asyncio.start_server(self.handle, host, port)
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            status, body = await self.dispatch(reader)
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError) as e:
+            status, body = 400, {"error": str(e)}
+        try:
+            writer.write(self.response(status, body))
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, reader: asyncio.StreamReader) -> tuple:
+        method, target, _ = (await reader.readline()).decode("latin-1").split(" ", 2)
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            key, _, value = line.partition(":")
+            headers[key.strip().lower()] = value.strip()
+
+        url = urllib.parse.urlsplit(target)
+        if url.path == "/health":
+            return 200, {"status": "ok", "workers": self.workers}
+        if url.path == "/metrics":
+            return 200, self.metrics()
+        if url.path != "/recognize":
+            return 404, {"error": "not found"}
+        if method != "POST":
+            return 405, {"error": "method not allowed"}
+
+        self.counts["requests"] += 1
+        # 処理待ちが上限を超えている場合は、ボディを読まずに断る
+        if self.pending >= self.capacity:
+            self.counts["rejected"] += 1
+            return 503, {"error": "server busy"}
+        if "content-length" not in headers:
+            return 411, {"error": "length required"}
+        length = int(headers["content-length"])
+        if length > self.max_body:
+            return 413, {"error": "payload too large"}
+
+        backend = urllib.parse.parse_qs(url.query).get("backend", [recognize.BACKEND_TESSERACT])[0]
+        if backend not in recognize.BACKENDS:
+            return 400, {"error": "unsupported backend: {0}".format(backend)}
+        self.pending += 1
+        try:
+            data = await reader.readexactly(length)
+            return await self.recognize(data, backend)
+        finally:
+            self.pending -= 1
+
+    async def recognize(self, data: bytes, backend: str) -> tuple:
+        start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(self.executor, recognize_image, data, backend)
+            status, body = 200, result
+            self.counts["succeeded"] += 1
+        except errors.UmaDetailError as e:
+            # 画像として読み込めない、もしくはウマ娘詳細画面ではない
+            status, body = 400, {"error": "{0}: {1}".format(type(e).__name__, e)}
+            self.counts["failed"] += 1
+        except (Exception, SystemExit) as e:
+            status, body = 500, {"error": "{0}: {1}".format(type(e).__name__, e)}
+            self.counts["failed"] += 1
+        self.latencies.append(time.perf_counter() - start)
+        return status, body
+
+    def metrics(self) -> dict:
+        latencies = sorted(self.latencies)
+
+        def percentile(p):
+            return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))], 4) if latencies else None
+
+        return dict(self.counts, pending=self.pending, workers=self.workers, capacity=self.capacity,
+                    latency_p50=percentile(0.5), latency_p95=percentile(0.95),
+                    uptime=round(time.time() - self.started, 1))
+
+    @staticmethod
+    def response(status: int, body: dict) -> bytes:
+        content = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        header = "HTTP/1.1 {0} {1}\r\n" \
+                 "Content-Type: application/json; charset=utf-8\r\n" \
+                 "Content-Length: {2}\r\n" \
+                 "{3}" \
+                 "Connection: close\r\n\r\n" \
+            .format(status, STATUS_TEXT[status], len(content), "Retry-After: 1\r\n" if status == 503 else "")
+        return header.encode("latin-1") + content
+
+
+async def serve(host: str, port: int, workers: int, queue_size: int, cache_dir: str = None, threads: int = 0):
+    app = RecognitionServer(workers, queue_size, cache_dir=cache_dir, threads=threads)
+    server = await app.start(host, port)
+    print("http://{0}:{1}/ で待ち受けています。".format(host, port), file=sys.stderr)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        app.close()
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description="ウマ娘詳細画面の画像を受け取り、読み取り結果を返すHTTPサーバー")
+    parser.add_argument("--host", default="127.0.0.1", help="待ち受けるアドレス")
+    parser.add_argument("--port", type=int, default=8080, help="待ち受けるポート")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count(), help="ワーカープロセス数")
+    parser.add_argument("--queue", type=int, default=16, help="処理待ちの上限 超えた場合は503を返す")
+    parser.add_argument("--cache-dir", help="読み取り結果をキャッシュするディレクトリ 省略した場合はメモリ上のみ")
+    parser.add_argument("--threads", type=int, default=0,
+                        help="ワーカープロセスごとに1枚の画像を並列に読み取るスレッド数 0の場合は順番に処理する")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.queue, args.cache_dir, args.threads))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
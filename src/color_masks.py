@@ -0,0 +1,77 @@
+import threading
+
+import cv2
+import numpy
+
+from src import imagetools as imgtools
+
+
+def in_range(img: numpy.ndarray, min_rgb: list, max_rgb: list) -> numpy.ndarray:
+    """
+    [R,G,B]で指定した範囲内（両端を含む）の画素を255、範囲外を0としたマスクをcv2.inRangeで作成する。
+    :param img: ndarray [B,G,R]
+    :param min_rgb: [R,G,B]の最小値
+    :param max_rgb: [R,G,B]の最大値
+    :return: ndarray(uint8) 画像の形状から色の次元を除いたもの
+    """
+    return cv2.inRange(img, numpy.array(min_rgb[::-1]), numpy.array(max_rgb[::-1]))
+
+
+class ColorMasks:
+    """
+    画像1枚の一部分（band）について、色ごとのマスクを1回だけ作成して共有する。
+    座標は元の画像の座標で指定し、切り出した画像・マスクはbandのビュー（コピーなし）を返す。
+    マスクは初回に作成するため、複数のスレッドから使用する場合も同じ配列を返す。
+    """
+
+    def __init__(self, img: numpy.ndarray, top: int, left: int, bottom: int, right: int):
+        """
+        :param img: ndarray もしくはRoiImage
+        :param top: bandの上端
+        :param left: bandの左端
+        :param bottom: bandの下端
+        :param right: bandの右端
+        """
+        self.top, self.left = top, left
+        # RoiImageの場合も、ここで1回だけ元の解像度から計算する
+        self.band = numpy.ascontiguousarray(img[self.top: bottom, self.left: right])
+        self.__masks = {}
+        self.__lock = threading.Lock()
+
+    def crop(self, array: numpy.ndarray, pos) -> numpy.ndarray:
+        """
+        bandもしくはマスクから、元の画像の座標の範囲を切り出す。
+        :param array: band もしくはマスク
+        :param pos: 元の画像の座標(Position)
+        :return: ndarray（ビュー）
+        """
+        return array[pos.top - self.top: pos.bottom - self.top, pos.left - self.left: pos.right - self.left]
+
+    def in_range(self, min_rgb: list, max_rgb: list) -> numpy.ndarray:
+        """
+        band全体の色の範囲のマスクを返す。同じ範囲は1回だけ作成する。
+        :param min_rgb: [R,G,B]の最小値（両端を含む）
+        :param max_rgb: [R,G,B]の最大値（両端を含む）
+        :return: ndarray(uint8) 範囲内は255
+        """
+        key = ("in_range", tuple(min_rgb), tuple(max_rgb))
+        return self.__get(key, lambda: in_range(self.band, min_rgb, max_rgb))
+
+    def light(self, luminance: int) -> numpy.ndarray:
+        """
+        band全体のimagetools.except_light_colorで白色に加工される画素のマスクを返す。
+        :param luminance: 除去する色の輝度
+        :return: ndarray(bool)
+        """
+        return self.__get(("light", luminance), lambda: imgtools.light_color_mask(self.band, luminance))
+
+    def __get(self, key: tuple, create) -> numpy.ndarray:
+        mask = self.__masks.get(key)
+        if mask is None:
+            with self.__lock:
+                mask = self.__masks.get(key)
+                if mask is None:
+                    mask = create()
+                    mask.flags.writeable = False
+                    self.__masks[key] = mask
+        return mask
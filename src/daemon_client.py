@@ -0,0 +1,116 @@
+import json
+import os
+import socket
+import stat
+import tempfile
+
+from src import errors
+
+# 常駐プロセスに接続できない場合に、すぐに諦めるための接続のタイムアウト[秒]
+CONNECT_TIMEOUT = 0.5
+# 読み取り結果を待つタイムアウト[秒]
+RESPONSE_TIMEOUT = 120
+
+
+def get_socket_path() -> str:
+    """
+    常駐プロセスが待ち受けるUnixドメインソケットのパスを返す。環境変数UMA_DETAIL_SOCKETで変更できる。
+    既定は$XDG_RUNTIME_DIR、無い場合は一時ディレクトリに作成する本人専用のディレクトリ(0700)の中。
+    :return: パス
+    """
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir and os.path.isdir(runtime_dir):
+        default = os.path.join(runtime_dir, "uma_detail.sock")
+    else:
+        default = os.path.join(tempfile.gettempdir(), "uma_detail-{0}".format(__get_uid()), "daemon.sock")
+    return os.environ.get("UMA_DETAIL_SOCKET", default)
+
+
+def __get_uid():
+    return os.getuid() if hasattr(os, "getuid") else "user"
+
+
+def make_socket_dir(socket_path: str) -> None:
+    """
+    ソケットを作成するディレクトリが無い場合は、本人のみ読み書きできる権限(0700)で作成する。
+    :param socket_path: ソケットのパス
+    :raises PermissionError: 他のユーザーがソケットを置き換えられるディレクトリ
+    """
+    directory = os.path.dirname(os.path.abspath(socket_path))
+    try:
+        os.mkdir(directory, 0o700)
+    except FileExistsError:
+        pass
+    st = os.lstat(directory)
+    if not hasattr(os, "getuid"):
+        return
+    # 本人の所有で他のユーザーが書き込めないディレクトリか、/tmpのようにrootの所有で他のユーザーのファイルを削除できない
+    # ディレクトリのみ
+    private = st.st_uid == os.getuid() and st.st_mode & 0o022 == 0
+    shared = st.st_uid == 0 and st.st_mode & stat.S_ISVTX
+    if not stat.S_ISDIR(st.st_mode) or not (private or shared):
+        raise PermissionError("untrusted socket directory: {0}".format(directory))
+
+
+def is_trusted_socket(socket_path: str) -> bool:
+    """
+    本人が作成したソケットかどうかを返す。他のユーザーが先に作成したソケットには接続しない。
+    :param socket_path: ソケットのパス
+    :return: 本人の所有のソケットの場合True
+    """
+    try:
+        st = os.lstat(socket_path)
+    except OSError:
+        return False
+    return stat.S_ISSOCK(st.st_mode) and (not hasattr(os, "getuid") or st.st_uid == os.getuid())
+
+
+def request(message: dict, socket_path: str = None, timeout: float = RESPONSE_TIMEOUT):
+    """
+    常駐プロセスに1件の要求を送り、応答を受け取る。（1行1件のjson）
+    :param message: 要求 {"command": "recognize" | "ping" | "shutdown", ...}
+    :param socket_path: ソケットのパス 省略した場合はget_socket_path()
+    :param timeout: 応答を待つタイムアウト[秒]
+    :return: 応答(dict) 常駐プロセスが起動していない場合はNone
+    """
+    socket_path = socket_path or get_socket_path()
+    # 本人が作成したソケットではない場合は、画像のパスを送らずにこのプロセスで読み取る
+    if not hasattr(socket, "AF_UNIX") or not is_trusted_socket(socket_path):
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(CONNECT_TIMEOUT)
+            sock.connect(socket_path)
+            sock.settimeout(timeout)
+            sock.sendall(json.dumps(message, ensure_ascii=False).encode("utf-8") + b"\n")
+            with sock.makefile("rb") as reader:
+                line = reader.readline()
+    except OSError:
+        return None
+    # 途中で切断された・壊れた応答は、起動していない場合と同じく扱う（呼び出し元で読み取り直す）
+    try:
+        response = json.loads(line) if line else None
+    except ValueError:
+        return None
+    return response if isinstance(response, dict) else None
+
+
+def recognize(path: str, backend: str = "tesseract", socket_path: str = None):
+    """
+    常駐プロセスで画像を読み取る。
+    :param path: 画像のパス
+    :param backend: ステータスの読み取り方法
+    :param socket_path: ソケットのパス
+    :return: uma_detail.get_status_to_jsonと同じjson文字列 常駐プロセスで読み取れなかった場合はNone
+    :raises errors.UmaDetailError: 画像として読み込めない、もしくはウマ娘詳細画面ではない
+    """
+    response = request({"command": "recognize", "path": os.path.abspath(path), "backend": backend}, socket_path)
+    if response is None:
+        return None
+    if "result" in response:
+        return response["result"]
+    # 読み取りの失敗は同じ例外として送出し、それ以外の失敗はNone（呼び出し元で読み取り直す）
+    error = getattr(errors, response.get("type", ""), None)
+    if isinstance(error, type) and issubclass(error, errors.UmaDetailError):
+        raise error(response.get("error", ""))
+    return None
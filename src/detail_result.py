@@ -0,0 +1,229 @@
+import csv
+import json
+from json.encoder import encode_basestring
+
+import numpy
+
+# 読み取る項目の名前（jsonのキー）
+STATUS_FIELDS = ["speed", "stamina", "power", "guts", "intelligence"]
+SUITABLE_FIELDS = ["turf", "dirt", "sprint", "mile", "medium", "long", "runner", "leader", "betweener", "chaser"]
+SKILL_FIELD = "skills"
+# 適性の文字（npzでは文字の番号で保存する）
+RANKS = "SABCDEFG"
+
+
+class DetailResult:
+    """
+    ウマ娘詳細画面1枚分の読み取り結果。
+
+    status          : ステータス（int） STATUS_FIELDSの順番
+    aptitudes       : 適性の文字 SUITABLE_FIELDSの順番
+    skills          : [(スキル名, 固有スキルのレベル), ...] 読み取った順番 レベルが無い場合は""
+    aptitude_scores : 適性の一致度 不明な場合はNone
+    skill_scores    : スキル名の一致度 skillsの順番 不明な場合はNone
+    skipped_slots   : 空きのスキルの枠の数
+    tab             : 選択されているタブ
+    """
+
+    __slots__ = ("status", "aptitudes", "skills", "aptitude_scores", "skill_scores", "skipped_slots", "tab")
+
+    def __init__(self, status, aptitudes, skills, aptitude_scores=None, skill_scores=None,
+                 skipped_slots: int = 0, tab: str = ""):
+        """
+        :param status: ステータス（数字の文字列も指定できる）
+        :param aptitudes: 適性の文字
+        :param skills: [(スキル名, レベル), ...] もしくは {スキル名: レベル}
+        :param aptitude_scores: 適性の一致度
+        :param skill_scores: スキル名の一致度
+        :param skipped_slots: 空きのスキルの枠の数
+        :param tab: 選択されているタブ
+        """
+        self.status = tuple(int(value) for value in status)
+        self.aptitudes = tuple(aptitudes)
+        self.skills = tuple(skills.items() if isinstance(skills, dict) else (tuple(item) for item in skills))
+        self.aptitude_scores = self.__round_scores(aptitude_scores)
+        self.skill_scores = self.__round_scores(skill_scores)
+        self.skipped_slots = skipped_slots
+        self.tab = tab
+
+    def __eq__(self, other):
+        if not isinstance(other, DetailResult):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self):
+        return "DetailResult({0})".format(", ".join("{0}={1!r}".format(name, getattr(self, name))
+                                                    for name in self.__slots__))
+
+    def to_dict(self, confidence: bool = False) -> dict:
+        """
+        get_status_to_jsonと同じ形式のdictを返す。
+        :param confidence: Trueの場合、"meta"に一致度を追加する
+        :return: dict
+        """
+        result = dict(zip(STATUS_FIELDS, self.status))
+        result.update(zip(SUITABLE_FIELDS, self.aptitudes))
+        result[SKILL_FIELD] = dict(self.skills)
+        result["meta"] = {"skipped_slots": self.skipped_slots, "tab": self.tab}
+        if confidence:
+            result["meta"]["confidence"] = {"aptitudes": self.aptitude_scores, "skills": self.skill_scores}
+        return result
+
+    def to_json(self, confidence: bool = False) -> str:
+        """
+        dictを経由せずにjson文字列を作成する。スキル名などの文字列はjsonの規則でエスケープする。
+        :param confidence: Trueの場合、"meta"に一致度を追加する
+        :return: json文字列
+        """
+        parts = ['"{0}": {1}'.format(field, value) for field, value in zip(STATUS_FIELDS, self.status)]
+        parts += ['"{0}": {1}'.format(field, encode_basestring(value))
+                  for field, value in zip(SUITABLE_FIELDS, self.aptitudes)]
+        parts.append('"{0}": {{{1}}}'.format(SKILL_FIELD, ", ".join(
+            "{0}: {1}".format(encode_basestring(name), encode_basestring(level)) for name, level in self.skills)))
+        meta = '"skipped_slots": {0}, "tab": {1}'.format(self.skipped_slots, encode_basestring(self.tab))
+        if confidence:
+            meta += ', "confidence": {{"aptitudes": {0}, "skills": {1}}}'.format(
+                self.__scores_to_json(self.aptitude_scores), self.__scores_to_json(self.skill_scores))
+        parts.append('"meta": {{{0}}}'.format(meta))
+        return "{" + ", ".join(parts) + "}"
+
+    @staticmethod
+    def __round_scores(scores):
+        # jsonに保存して読み込み直した場合も同じ値になるように、小数点以下4桁に丸めておく
+        if scores is None:
+            return None
+        return tuple(round(float(score), 4) if score is not None else None for score in scores)
+
+    @staticmethod
+    def __scores_to_json(scores) -> str:
+        if scores is None:
+            return "null"
+        return "[" + ", ".join(repr(score) if score is not None else "null" for score in scores) + "]"
+
+    @classmethod
+    def from_dict(cls, value: dict):
+        """
+        to_dictの形式のdictから作成する。
+        :param value: dict
+        :return: DetailResult
+        """
+        meta = value.get("meta", {})
+        confidence = meta.get("confidence") or {}
+        return cls([value[field] for field in STATUS_FIELDS], [value[field] for field in SUITABLE_FIELDS],
+                   value[SKILL_FIELD], confidence.get("aptitudes"), confidence.get("skills"),
+                   meta.get("skipped_slots", 0), meta.get("tab", ""))
+
+    @classmethod
+    def from_json(cls, text: str):
+        """
+        to_jsonの形式のjson文字列から作成する。
+        :param text: json文字列
+        :return: DetailResult
+        """
+        return cls.from_dict(json.loads(text))
+
+
+def parse_level(level: str) -> int:
+    """
+    固有スキルのレベルを数字にする。
+    :param level: "lv{数字}" もしくは ""
+    :return: レベル レベルが無い場合は0、数字として読み取れなかった場合は-1
+    """
+    if not level:
+        return 0
+    return int(level[2:]) if level.startswith("lv") and level[2:].isdecimal() else -1
+
+
+class ColumnWriter:
+    """
+    読み取り結果を列ごとにまとめて出力する。1行ずつjsonを解析せずに大量の結果を読み込めるようにする。
+    出力先の拡張子で形式を選ぶ。
+
+    .csv : path, speed〜intelligence, turf〜chaser, skills, skill_levels の列
+           skills・skill_levelsはjsonの配列の文字列（スキル名にどの文字が含まれていても json.loads で元に戻せる）
+           （skill_levelsは固有スキルのみ"lv3"、それ以外は空）
+    .npz : paths(str N), status(int32 N×5), aptitudes(uint8 N×10 RANKSの番号), aptitude_scores(float32 N×10),
+           skill_vocabulary(str V), skill_ids(int32 M skill_vocabularyの番号), skill_levels(int8 M parse_level),
+           skill_scores(float32 M), skill_offsets(int64 N+1 i件目のスキルは[skill_offsets[i]: skill_offsets[i+1]]),
+           skipped_slots(int16 N), tabs(str N)
+           一致度が不明な場合はnan
+    """
+
+    def __init__(self, path: str):
+        """
+        :param path: 出力するファイル（.csv もしくは .npz）
+        """
+        self.path = path
+        self.format = path.lower().rsplit(".", 1)[-1]
+        if self.format not in ("csv", "npz"):
+            raise ValueError("ColumnWriter: unsupported format: {0}".format(path))
+        self.count = 0
+        self.__fstream = None
+        self.__writer = None
+        self.__columns = None
+        self.__vocabulary = {}
+        if self.format == "csv":
+            # CSVは1件ずつ書き込む
+            self.__fstream = open(path, mode='wt', encoding='utf-8', newline='')
+            self.__writer = csv.writer(self.__fstream)
+            self.__writer.writerow(["path"] + STATUS_FIELDS + SUITABLE_FIELDS + [SKILL_FIELD, "skill_levels"])
+        else:
+            # npzは列ごとのリストに追加しておき、closeでまとめて保存する
+            self.__columns = {"paths": [], "status": [], "aptitudes": [], "aptitude_scores": [], "skill_ids": [],
+                              "skill_levels": [], "skill_scores": [], "skill_offsets": [0], "skipped_slots": [],
+                              "tabs": []}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write(self, path: str, result: DetailResult):
+        """
+        読み取り結果を1件追加する。
+        :param path: 画像のパス
+        :param result: 読み取り結果
+        """
+        self.count += 1
+        if self.__writer is not None:
+            self.__writer.writerow([path] + list(result.status) + list(result.aptitudes) +
+                                   [json.dumps([name for name, _ in result.skills], ensure_ascii=False),
+                                    json.dumps([level for _, level in result.skills], ensure_ascii=False)])
+            return
+        columns = self.__columns
+        columns["paths"].append(path)
+        columns["status"].append(result.status)
+        columns["aptitudes"].append([RANKS.find(rank) for rank in result.aptitudes])
+        columns["aptitude_scores"].append([numpy.nan if score is None else score for score in
+                                           result.aptitude_scores or [None] * len(SUITABLE_FIELDS)])
+        columns["skill_ids"] += [self.__vocabulary.setdefault(name, len(self.__vocabulary))
+                                 for name, _ in result.skills]
+        columns["skill_levels"] += [parse_level(level) for _, level in result.skills]
+        columns["skill_scores"] += [numpy.nan if score is None else score for score in
+                                    result.skill_scores or [None] * len(result.skills)]
+        columns["skill_offsets"].append(len(columns["skill_ids"]))
+        columns["skipped_slots"].append(result.skipped_slots)
+        columns["tabs"].append(result.tab)
+
+    def close(self):
+        if self.__fstream is not None:
+            self.__fstream.close()
+            self.__fstream = self.__writer = None
+        if self.__columns is not None:
+            columns, self.__columns = self.__columns, None
+            count = len(columns["paths"])
+            numpy.savez_compressed(
+                self.path,
+                paths=numpy.array(columns["paths"], dtype=str),
+                status=numpy.array(columns["status"], dtype=numpy.int32).reshape(count, len(STATUS_FIELDS)),
+                aptitudes=numpy.array(columns["aptitudes"], dtype=numpy.uint8).reshape(count, len(SUITABLE_FIELDS)),
+                aptitude_scores=numpy.array(columns["aptitude_scores"], dtype=numpy.float32)
+                .reshape(count, len(SUITABLE_FIELDS)),
+                skill_vocabulary=numpy.array(list(self.__vocabulary), dtype=str),
+                skill_ids=numpy.array(columns["skill_ids"], dtype=numpy.int32),
+                skill_levels=numpy.array(columns["skill_levels"], dtype=numpy.int8),
+                skill_scores=numpy.array(columns["skill_scores"], dtype=numpy.float32),
+                skill_offsets=numpy.array(columns["skill_offsets"], dtype=numpy.int64),
+                skipped_slots=numpy.array(columns["skipped_slots"], dtype=numpy.int16),
+                tabs=numpy.array(columns["tabs"], dtype=str))
@@ -0,0 +1,173 @@
+import cv2
+import numpy
+
+from src import info_json as info, template_store
+
+DIGITS = "0123456789"
+
+
+def segment_digits(gray: numpy.ndarray, threshold: int) -> list:
+    """
+    数字部分の画像を列方向の射影で1文字ずつに分割する。
+    :param gray: グレースケール画像(ndarray)
+    :param threshold: この値未満の画素を文字とする
+    :return: [top, bottom, [[left, right], ...]] 文字が無い場合は[0, 0, []]
+    """
+    ink = gray < threshold
+    rows = numpy.nonzero(ink.any(axis=1))[0]
+    if len(rows) == 0:
+        return [0, 0, []]
+    top, bottom = int(rows[0]), int(rows[-1]) + 1
+
+    # 文字のある列が連続している範囲を1文字とする
+    cols = numpy.concatenate([[0], ink[top: bottom].any(axis=0).astype(numpy.int8), [0]])
+    edges = numpy.diff(cols)
+    starts, ends = numpy.nonzero(edges == 1)[0], numpy.nonzero(edges == -1)[0]
+
+    # 隣の文字と接している場合は、文字の幅（高さの約3/4）で等分する
+    glyph_width = (bottom - top) * 0.75
+    spans = []
+    for left, right in zip(starts, ends):
+        count = max(1, round((right - left) / glyph_width)) if right - left > glyph_width * 1.3 else 1
+        bounds = numpy.linspace(left, right, count + 1).round().astype(int)
+        spans += [[int(bounds[i]), int(bounds[i + 1])] for i in range(count)]
+    return [top, bottom, spans]
+
+
+def normalize_glyph(gray: numpy.ndarray, width: int, height: int) -> numpy.ndarray:
+    """
+    1文字分の画像を、縦横比を保ったまま高さをheightに揃えて、width×heightの中央に配置する。
+    :param gray: 1文字分のグレースケール画像(ndarray)
+    :param width: 正規化後の幅
+    :param height: 正規化後の高さ
+    :return: 文字の濃さ(0.0〜1.0)のndarray height×width
+    """
+    ink = (255 - gray.astype(numpy.float32)) / 255
+    h, w = ink.shape[:2]
+    new_w = min(width, max(1, round(w * height / h)))
+    glyph = cv2.resize(ink, dsize=(new_w, height), interpolation=cv2.INTER_AREA)
+
+    dst = numpy.zeros((height, width), dtype=numpy.float32)
+    left = (width - new_w) // 2
+    dst[:, left: left + new_w] = glyph
+    return dst
+
+
+def extract_glyphs(img: numpy.ndarray) -> numpy.ndarray:
+    """
+    数字部分の画像から1文字ずつ正規化した画像を取り出す。
+    :param img: ndarray（カラーまたはグレースケール）
+    :return: ndarray 文字数×height×width
+    """
+    threshold, width, height, _ = info.get_digit_setting()
+    gray = img if img.ndim == 2 else cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    top, bottom, spans = segment_digits(gray, threshold)
+    glyphs = [normalize_glyph(gray[top: bottom, left: right], width, height) for left, right in spans]
+    return numpy.array(glyphs, dtype=numpy.float32).reshape(-1, height, width)
+
+
+def __to_vectors(glyphs: numpy.ndarray) -> numpy.ndarray:
+    # 平均を引いて長さを1にする（内積が正規化相互相関になる）
+    vectors = glyphs.reshape(len(glyphs), -1)
+    vectors = vectors - vectors.mean(axis=1, keepdims=True)
+    norm = numpy.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / numpy.where(norm == 0, 1, norm)
+
+
+def get_templates() -> numpy.ndarray:
+    """
+    同梱の数字のテンプレート画像（0〜9を横に並べたもの）を読み込み、比較用のベクトルにする。
+    :return: ndarray 10×(width×height)
+    """
+    _, width, height, _ = info.get_digit_setting()
+    tile = template_store.get_template_gray(info.get_template_matching_image_path_digit())
+    glyphs = numpy.array([(255 - tile[:height, i * width: (i + 1) * width].astype(numpy.float32)) / 255
+                          for i in range(len(DIGITS))])
+    return __to_vectors(glyphs)
+
+
+def recognize_digits(img: numpy.ndarray) -> str:
+    """
+    ステータスの数字を文字認識せずに、テンプレートとの比較で読み取る。
+    :param img: ndarray
+    :return: 読み取った数字の文字列 テンプレートと一致しない文字は"?"
+    """
+    glyphs = extract_glyphs(img)
+    if len(glyphs) == 0:
+        return ""
+    min_score = info.get_digit_setting()[3]
+    scores = __to_vectors(glyphs) @ get_templates().T
+    best = scores.argmax(axis=1)
+    return "".join(DIGITS[i] if scores[n, i] >= min_score else "?" for n, i in enumerate(best))
+
+
+def make_digit_tile(samples: list) -> numpy.ndarray:
+    """
+    数字のテンプレート画像を作成する。同梱のテンプレート画像を作り直す場合に使用する。
+    :param samples: [[数字部分の画像(ndarray), 正解の文字列], ...]
+    :return: 0〜9の文字の平均を横に並べたグレースケール画像(ndarray)
+    """
+    _, width, height, _ = info.get_digit_setting()
+    total = numpy.zeros((len(DIGITS), height, width), dtype=numpy.float32)
+    count = numpy.zeros(len(DIGITS))
+    for img, label in samples:
+        glyphs = extract_glyphs(img)
+        if len(glyphs) != len(label):
+            raise ValueError("make_digit_tile: cannot segment sample: %s" % label)
+        for glyph, digit in zip(glyphs, label):
+            total[DIGITS.index(digit)] += glyph
+            count[DIGITS.index(digit)] += 1
+    if not count.all():
+        raise ValueError("make_digit_tile: missing digits: %s" % [d for d, c in zip(DIGITS, count) if not c])
+
+    glyphs = total / count[:, None, None]
+    return (255 - numpy.hstack(list(glyphs)) * 255).round().clip(0, 255).astype(numpy.uint8)
+
+
+def __load_expected_samples(expected_path: str, suffix: str = "") -> list:
+    """
+    正解の値を記録したjsonから、画像ごとのステータス部分の画像と正解の文字列を取得する。
+    :param expected_path: 正解の値を記録したjsonのパス
+    :param suffix: 指定した場合、ファイル名がこの文字列で終わる画像のみ
+    :return: [[ファイル名, 項目名, 数字部分の画像(ndarray), 正解の文字列], ...]
+    """
+    import json
+    import os
+    import uma_detail
+
+    with open(expected_path, mode='rt', encoding='utf-8') as fstream:
+        expected = json.load(fstream)
+    samples = []
+    for filename, status in expected.items():
+        if filename.startswith("$") or not filename.endswith(suffix):
+            continue
+        img = uma_detail.imread_umadetail(os.path.join(os.path.dirname(expected_path), filename))
+        for key, value in status.items():
+            pos = info.get_position(key)
+            samples.append([filename, key, img[pos.top: pos.bottom, pos.left: pos.right], str(value)])
+    return samples
+
+
+if __name__ == "__main__":
+    # python -m src.digit_classifier        : test/の画像で読み取りの正解率を確認する
+    # python -m src.digit_classifier build  : test/のPNG画像からテンプレート画像を作り直す
+    import sys
+
+    expected_json = info.get_path("test/expected_status.json")
+    if sys.argv[1:] == ["build"]:
+        samples = __load_expected_samples(expected_json, ".PNG")
+        cv2.imwrite(info.get_template_matching_image_path_digit(),
+                    make_digit_tile([[img, label] for _, _, img, label in samples]))
+    else:
+        # テンプレート画像はtest/のPNG画像から作成しているため、PNG画像の正解率は作成に使用した画像での値（in-sample）
+        # JPEG画像はテンプレート画像の作成に使用していない（held-out）が、IMG_0518.PNGと同じ画面のため独立した画像ではない
+        samples = __load_expected_samples(expected_json)
+        correct = {True: [0, 0], False: [0, 0]}
+        for filename, key, img, label in samples:
+            result = recognize_digits(img)
+            in_sample = filename.endswith(".PNG")
+            correct[in_sample][0] += result == label
+            correct[in_sample][1] += 1
+            print("{0} {1}: {2} (正解: {3}){4}".format(filename, key, result, label, "" if result == label else " NG"))
+        print("正解率（テンプレート画像の作成に使用した画像 in-sample）: {0}/{1}".format(*correct[True]))
+        print("正解率（テンプレート画像の作成に使用していない画像 held-out）: {0}/{1}".format(*correct[False]))
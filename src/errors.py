@@ -0,0 +1,16 @@
+class UmaDetailError(Exception):
+    """
+    ウマ娘詳細画面の読み取りで発生する例外の基底クラス。
+    """
+
+
+class ImageDecodeError(UmaDetailError, ValueError):
+    """
+    画像として読み込めないデータが指定された。
+    """
+
+
+class NotDetailScreenError(UmaDetailError, IndexError):
+    """
+    画像からウマ娘詳細画面の部分が見つからない。
+    """
@@ -1,4 +1,4 @@
-import itertools
+import math
 
 import cv2
 import numpy
@@ -38,61 +38,165 @@ def resize_by_aspect(img: numpy.ndarray, arg_height: int) -> cv2:
     return cv2.resize(img, dsize=(nw, nh))
 
 
-def search_color(img: numpy.ndarray, scan_direction: int, start_pos: list,
-                 min_rgb: list, max_rgb: list, opt_except: bool = False) -> int:
+def resize_coefficients(dst_size: int, src_size: int, vertical: bool = False) -> numpy.ndarray:
     """
-    画像内の指定された位置から指定した方向に走査を行い、指定した色が最初に出現する位置を返します。
+    cv2.resize（INTER_LINEAR、uint8）と同じ計算で、出力の位置ごとに参照する入力の位置と重み（11bitの固定小数点）を求める。
+    :param dst_size: リサイズ後の幅（高さ）
+    :param src_size: リサイズ前の幅（高さ）
+    :param vertical: 高さ方向の場合はTrue（端の扱いが幅方向と異なる）
+    :return: ndarray(int32) 4×dst_size [参照する位置1, 参照する位置2, 位置1の重み, 位置2の重み]
+    """
+    scale = 1.0 / (dst_size / src_size)
+    f = ((numpy.arange(dst_size) + 0.5) * scale - 0.5).astype(numpy.float32)
+    s = numpy.floor(f).astype(numpy.int32)
+    f -= s.astype(numpy.float32)
+    if vertical:
+        # 高さ方向は、重みはそのままで画像の外の行を端の行に置き換える
+        return numpy.array([numpy.clip(s, 0, src_size - 1), numpy.clip(s + 1, 0, src_size - 1),
+                            numpy.rint((numpy.float32(1) - f) * numpy.float32(2048)),
+                            numpy.rint(f * numpy.float32(2048))], dtype=numpy.int32)
+    # 幅方向は、画像の外を参照する場合は端の列のみを使用する
+    f[s < 0], s[s < 0] = 0, 0
+    edge = s >= src_size - 1
+    f[edge], s[edge] = 0, src_size - 1
+    return numpy.array([s, numpy.minimum(s + 1, src_size - 1),
+                        numpy.rint((numpy.float32(1) - f) * numpy.float32(2048)),
+                        numpy.rint(f * numpy.float32(2048))], dtype=numpy.int32)
+
+
+def resize_region(img: numpy.ndarray, rows: numpy.ndarray, cols: numpy.ndarray) -> numpy.ndarray:
+    """
+    cv2.resizeの結果のうち、指定した行・列の部分だけを計算する。
+    画像全体をリサイズせずに、全体をリサイズした場合と同じ画素値を返す。（uint8、INTER_LINEARのみ）
+    :param img: リサイズ前の画像(ndarray uint8)
+    :param rows: 計算する行のresize_coefficients(リサイズ後の高さ, 元の高さ, True)[:, 行の一覧]
+    :param cols: 計算する列のresize_coefficients(リサイズ後の幅, 元の幅)[:, 列の一覧]
+    :return: ndarray 行の数×列の数（×チャンネル数）
+    """
+    if rows.shape[1] == 0 or cols.shape[1] == 0:
+        return numpy.zeros((rows.shape[1], cols.shape[1]) + img.shape[2:], dtype=numpy.uint8)
+    channels = img.shape[2] if img.ndim == 3 else 1
+    top, bottom, left = rows[0].min(), rows[1].max() + 1, cols[0].min()
+
+    # 参照する範囲を 行×(列×チャンネル) の2次元として、列の位置をチャンネルごとの位置に展開する
+    src = img[top: bottom, left: cols[1].max() + 1].reshape(bottom - top, -1)
+    channel = numpy.arange(channels)
+    x0 = ((cols[0] - left)[:, None] * channels + channel).ravel()
+    x1 = ((cols[1] - left)[:, None] * channels + channel).ravel()
+
+    # 横方向に補間してから、縦方向に補間する（丸め方はcv2.resizeの固定小数点演算と同じ）
+    line = src.take(x0, axis=1).astype(numpy.int32) * numpy.repeat(cols[2], channels) + \
+        src.take(x1, axis=1).astype(numpy.int32) * numpy.repeat(cols[3], channels)
+    line >>= 4
+    value = (line.take(rows[0] - top, axis=0) * rows[2][:, None] >> 16) + \
+        (line.take(rows[1] - top, axis=0) * rows[3][:, None] >> 16)
+    value += 2
+    value >>= 2
+    return value.astype(numpy.uint8).reshape((rows.shape[1], cols.shape[1]) + img.shape[2:])
+
+
+def color_range_mask(pixels: numpy.ndarray, min_rgb: list, max_rgb: list, opt_except: bool = False) -> numpy.ndarray:
+    """
+    行・列などの画素の並び（cv2の[B,G,R]）をまとめて判別し、指定した色に該当する位置をTrueとしたマスクを返します。
+    :param pixels: ndarray (..., 3)
+    :param min_rgb: [R,G,B] 検索する色（最小）
+    :param max_rgb: [R,G,B] 検索する色（最大）
+    :param opt_except: Trueを指定した場合、指定色以外（全ての値が最小未満、もしくは最大超過）をTrueとする
+    :return: ndarray(bool) 画素の並びから色の次元を除いたもの
+    """
+    rgb = pixels[..., ::-1]
+    if opt_except:
+        return (rgb < min_rgb).all(axis=-1) | (rgb > max_rgb).all(axis=-1)
+    return ((rgb >= min_rgb) & (rgb <= max_rgb)).all(axis=-1)
+
+
+def search_colors(img: numpy.ndarray, scan_direction: int, start: int, lines: list,
+                  min_rgb: list, max_rgb: list, opt_except: bool = False) -> numpy.ndarray:
+    """
+    search_colorを複数の列（行）に対してまとめて行い、指定した色が最初に出現する位置を返します。
     :param img: ndarray
     :param scan_direction: 走査する方向 0: S, 1: N, 2: E, 3: W
-    :param start_pos: 走査を開始する位置 [y, x]
+    :param start: 走査を開始する位置 S,NならY座標、E,WならX座標
+    :param lines: 走査する列（行）の一覧 S,NならX座標、E,WならY座標
     :param min_rgb: [R,G,B] 検索する色（最小）
     :param max_rgb: [R,G,B] 検索する色（最大）
     :param opt_except: Trueを指定した場合、指定色以外を検索　Falseを指定した、省略の場合、指定色を検索
-    :return: int 最初に見つかった位置 見つからなかった場合は負数
+    :return: ndarray(int) 列（行）ごとに最初に見つかった位置 見つからなかった場合は-1
     """
     height, width = img.shape[:2]
+    lines = numpy.asarray(lines, dtype=numpy.intp)
 
+    # 走査する位置の一覧を作成し、必要な画素だけを走査方向が先頭の軸になるように切り出す
     if scan_direction == 0:
-        r = range(start_pos[0], height, 1)
+        scan = numpy.arange(start, height)
     elif scan_direction == 1:
-        r = range(start_pos[0] - 1, 0, -1)
+        scan = numpy.arange(start - 1, 0, -1)
     elif scan_direction == 2:
-        r = range(start_pos[1], width, 1)
+        scan = numpy.arange(start, width)
     elif scan_direction == 3:
-        r = range(start_pos[1] - 1, 0, -1)
+        scan = numpy.arange(start - 1, 0, -1)
+    else:
+        raise ValueError("search_colors: unsupported scan_direction: %s" % scan_direction)
+
+    if len(scan) == 0:
+        return numpy.full(len(lines), -1)
+    if scan_direction <= 1:
+        block = img[numpy.ix_(scan, lines)]
+    else:
+        block = img[numpy.ix_(lines, scan)].swapaxes(0, 1)
+    mask = color_range_mask(block, min_rgb, max_rgb, opt_except)
+    found = mask.any(axis=0)
+    first = mask.argmax(axis=0)
+    return numpy.where(found, scan[first], -1)
 
-    for i in r:
-        colors = img[(i, start_pos[1])] if scan_direction <= 1 else img[(start_pos[0], i)]
-        if opt_except:
-            min_copy, max_copy = list(map(lambda x: x - 1, min_rgb)), \
-                                 list(map(lambda x: x + 1, max_rgb))
-            result = (is_color_range(colors, [0] * 3, min_copy, True)
-                      or is_color_range(colors, max_copy, [255] * 3, True))
-        else:
-            result = is_color_range(colors, min_rgb, max_rgb, True)
 
-        if result:
-            return i
-    return -1
+def search_color(img: numpy.ndarray, scan_direction: int, start_pos: list,
+                 min_rgb: list, max_rgb: list, opt_except: bool = False) -> int:
+    """
+    画像内の指定された位置から指定した方向に走査を行い、指定した色が最初に出現する位置を返します。
+    :param img: ndarray
+    :param scan_direction: 走査する方向 0: S, 1: N, 2: E, 3: W
+    :param start_pos: 走査を開始する位置 [y, x]
+    :param min_rgb: [R,G,B] 検索する色（最小）
+    :param max_rgb: [R,G,B] 検索する色（最大）
+    :param opt_except: Trueを指定した場合、指定色以外を検索　Falseを指定した、省略の場合、指定色を検索
+    :return: int 最初に見つかった位置 見つからなかった場合は負数
+    """
+    if scan_direction <= 1:
+        start, line = start_pos[0], start_pos[1]
+    else:
+        start, line = start_pos[1], start_pos[0]
+    return int(search_colors(img, scan_direction, start, [line], min_rgb, max_rgb, opt_except)[0])
 
 
-def except_light_color(img: numpy.ndarray, luminance: int) -> numpy.ndarray:
+def except_light_color(img: numpy.ndarray, luminance: int, inplace: bool = False) -> numpy.ndarray:
     """
     画像の明るい部分を白色に加工します。
+    画像1枚（高さ, 幅, 3）の他、同サイズの画像をまとめた配列（枚数, 高さ, 幅, 3）も一度に加工できます。
     :param img: ndarray
     :param luminance: 除去する色の輝度 指定した値以上の色を除去対象とする 0〜100の値を指定 0に近いほど暗く、100に近いほど明るい
+    :param inplace: Trueを指定した場合、コピーせずに引数の配列へ直接書き込む
     :return: 加工したndarray もしくは加工前のndarray
     """
-    height, width = img.shape[:2]
-    dst = img.copy()
-    for x, y in itertools.product(range(0, width, 1), range(0, height, 1)):
-        colors = dst[(y, x)]
-        dbg = int(get_luminance(colors))
-        if not dbg <= luminance:
-            dst[(y, x)] = [255] * 3
+    dst = img if inplace else img.copy()
+    dst[light_color_mask(dst, luminance)] = 255
     return dst
 
 
+def light_color_mask(img: numpy.ndarray, luminance: int) -> numpy.ndarray:
+    """
+    except_light_colorで白色に加工される画素をTrueとしたマスクを返します。
+    :param img: ndarray (..., 3)
+    :param luminance: 除去する色の輝度
+    :return: ndarray(bool) 画像の形状から色の次元を除いたもの
+    """
+    # int(get_luminance(画素)) > luminance と同じ判定を、整数のまま全画素まとめて行う。
+    # （get_luminanceの分母2550を両辺に掛けて比較する）
+    weights = numpy.array([299, 587, 114], dtype=numpy.int32)
+    threshold = (math.floor(luminance) + 1) * 2550
+    return numpy.dot(img, weights) >= threshold
+
+
 def cv_image(img: Image) -> numpy.ndarray:
     """
     Pillow から numpy へ変換を行う。
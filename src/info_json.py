@@ -1,23 +1,89 @@
 import functools
+import hashlib
 import json
+import os
+import warnings
 
+import numpy
 
-class Position:
-    def __init__(self, arg_top, arg_left, arg_bottom, arg_right):
-        self.left = int(arg_left)
-        self.top = int(arg_top)
-        self.right = int(arg_right)
-        self.bottom = int(arg_bottom)
-        self.width = int(arg_right - arg_left)
-        self.height = int(arg_bottom - arg_top)
+from src.position import Position
 
+# パッケージのルートディレクトリ（カレントディレクトリに関係なくjson・画像を読み込めるようにする）
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+INFO_JSON_PATH = os.path.join(BASE_DIR, "json", "info.json")
+SKILL_JSON_PATH = os.path.join(BASE_DIR, "json", "skill.json")
+# src/layout.pyの形式の版 形式を変更した場合は上げて、src.layout_compilerで作り直す
+LAYOUT_VERSION = 1
 
-with open("json/info.json", mode='rt', encoding='utf-8') as fstream:
-    read_json = json.load(fstream)
+
+def get_path(relative: str) -> str:
+    """
+    パッケージのルートからの相対パスを絶対パスにする。
+    :param relative: 相対パス（info.jsonの画像のパスなど）
+    :return: 絶対パス
+    """
+    return os.path.join(BASE_DIR, relative)
+
+
+def source_digest(path: str) -> str:
+    """
+    src/layout.pyの作成に使用したjsonと同じ内容かを判別するためのハッシュ値を返す。
+    :param path: jsonのパス
+    :return: ハッシュ値（16進数の文字列）
+    """
+    with open(path, mode='rb') as fstream:
+        return hashlib.blake2b(fstream.read(), digest_size=16).hexdigest()
+
+
+def get_layout_sources() -> dict:
+    """
+    :return: {パッケージのルートからの相対パス: 絶対パス} src/layout.pyの作成に使用するjson
+    """
+    return {os.path.relpath(path, BASE_DIR).replace(os.sep, "/"): path for path in (INFO_JSON_PATH, SKILL_JSON_PATH)}
+
+
+def load_layout():
+    """
+    src.layout_compilerで作成したsrc/layout.pyを読み込む。
+    作成後にjsonが変更されている場合は使用しない（jsonを直接読み込む）。
+    :return: src.layoutモジュール 無い場合・古い場合はNone
+    """
+    try:
+        from src import layout
+    except ImportError:
+        return None
+    try:
+        fresh = layout.LAYOUT_VERSION == LAYOUT_VERSION and layout.SOURCES == {
+            name: source_digest(path) for name, path in get_layout_sources().items()}
+    except (AttributeError, OSError):
+        fresh = False
+    if not fresh:
+        warnings.warn("info_json: src/layout.py is out of date, run: python -m src.layout_compiler")
+        return None
+    return layout
+
+
+def __read(path: str) -> dict:
+    with open(path, mode='rt', encoding='utf-8') as fstream:
+        return json.load(fstream)
+
+
+__layout = load_layout()
+read_json = __layout.read_json if __layout is not None else __read(INFO_JSON_PATH)
+# 直下の要素の座標（jsonを読み込んだ場合は要素ごとに初回に作成する）
+__positions = dict(__layout.POSITIONS) if __layout is not None else {}
 
 
 def get_position(status: str, mydict: dict = read_json) -> Position:
-    target = mydict[status]
+    if mydict is read_json:
+        position = __positions.get(status)
+        if position is None:
+            position = __positions[status] = __to_position(read_json[status])
+        return position
+    return __to_position(mydict[status])
+
+
+def __to_position(target: dict) -> Position:
     return Position(target["top"], target["left"], target["bottom"], target["right"])
 
 
@@ -53,6 +119,15 @@ def get_position_skills_detect() -> int:
     return read_json['info']['skills']['leftside']['left'] + pos_name.left
 
 
+def get_skills_empty_detect() -> list:
+    """
+    空きスキルスロットの判別に使用する値を返す。
+    :return: [背景色との差の許容値, 背景色と判別する画素の割合]
+    """
+    p = read_json['info']['skills']['empty']
+    return [p['tolerance'], p['ratio']]
+
+
 def get_position_skills_leftside() -> int:
     return read_json['info']['skills']['leftside']['left']
 
@@ -61,32 +136,46 @@ def get_position_skills_rightside() -> int:
     return read_json['info']['skills']['rightside']['left']
 
 
-def get_position_skills(start_y_pos: int) -> list:
+def compute_skill_slots(json_dict: dict) -> numpy.ndarray:
+    """
+    スキルの枠ごとの座標を、スキルの開始位置を0とした座標で作成する。
+    :param json_dict: info.jsonを読み込んだdict
+    :return: ndarray(int32) 14×[スキル名, 固有スキルのレベル]×[top, left, bottom, right]
+    """
     # スキルの番号
     # 1   2
     # 3   4
     # ... ...
     # 13  14
 
-    ofs = read_json['info']['skills']['ofs']
+    skills = json_dict['info']['skills']
+    ofs = skills['ofs']
     pos_name = get_position("name", ofs)
     pos_uniquelv = get_position("uniquelv", ofs)
-    leftside = get_position_skills_leftside()
-    rightside = get_position_skills_rightside()
 
-    pos_list = []
+    slots = numpy.zeros((14, 2, 4), dtype=numpy.int32)
     for i in range(0, 14, 1):
         # 偶奇判別
-        x = rightside if i % 2 else leftside
+        x = skills['rightside']['left'] if i % 2 else skills['leftside']['left']
         # Y座標
-        y = start_y_pos + int(ofs['next_height'] * int(i / 2))
+        y = int(ofs['next_height'] * int(i / 2))
+        slots[i] = [[pos_name.top + y, pos_name.left + x, pos_name.bottom + y, pos_name.right + x],
+                    [pos_uniquelv.top + y, pos_uniquelv.left + x, pos_uniquelv.bottom + y, pos_uniquelv.right + x]]
+    return slots
+
 
-        new_list = [Position(pos_name.top + y, pos_name.left + x, pos_name.bottom + y, pos_name.right + x),
-                    Position(pos_uniquelv.top + y, pos_uniquelv.left + x, pos_uniquelv.bottom + y,
-                             pos_uniquelv.right + x)]
-        pos_list.append(new_list)
+__skill_slots = __layout.SKILL_SLOTS if __layout is not None else compute_skill_slots(read_json)
 
-    return pos_list
+
+@functools.lru_cache(maxsize=64)
+def get_position_skills(start_y_pos: int) -> list:
+    """
+    スキルの枠ごとの座標を返す。開始位置ごとに作成したリストを使い回すため、変更しないでください。
+    :param start_y_pos: スキルの開始位置のY座標
+    :return: [[スキル名の座標(Position), 固有スキルのレベルの座標(Position)], ...] 14枠分
+    """
+    slots = __skill_slots + numpy.array([start_y_pos, 0, start_y_pos, 0], dtype=numpy.int32)
+    return [[Position(*name), Position(*uniquelv)] for name, uniquelv in slots.tolist()]
 
 
 def get_tabs_name() -> list:
@@ -117,8 +206,39 @@ def get_image_aspect() -> int:
 
 
 def get_template_matching_image_path_skill() -> str:
-    return read_json['template_matching']['image_path']['skill']
+    return get_path(read_json['template_matching']['image_path']['skill'])
 
 
 def get_template_matching_image_path_rank() -> str:
-    return read_json['template_matching']['image_path']['rank']
\ No newline at end of file
+    return get_path(read_json['template_matching']['image_path']['rank'])
+
+
+def get_template_matching_image_path_digit() -> str:
+    return get_path(read_json['template_matching']['image_path']['digit'])
+
+
+def get_digit_setting() -> list:
+    """
+    ステータスの数字の読み取りに使用する値を返す。
+    :return: [文字と判別する閾値, 正規化後の幅, 正規化後の高さ, 文字と判定する最小の一致度]
+    """
+    p = read_json['digit']
+    return [p['threshold'], p['width'], p['height'], p['min_score']]
+
+
+def get_rank_setting() -> list:
+    """
+    適性の読み取りに使用する値を返す。
+    :return: [比較する画像の高さ（テンプレート画像の1文字の幅）, 比較する位置のずれの許容値]
+    """
+    p = read_json['rank']
+    return [p['size'], p['shift']]
+
+
+def get_skill_signature_setting() -> list:
+    """
+    スキル名の読み取りに使用する値を返す。
+    :return: [スキル一覧画像を縮小する倍率の逆数, 元の大きさで比較する行の数]
+    """
+    p = read_json['skill_signature']
+    return [p['scale'], p['candidates']]
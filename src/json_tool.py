@@ -1,18 +1,20 @@
-import json
-
-
-def json_to_list(json_dict: dict, route: str = "", result: list = []):
+def json_to_list(json_dict: dict, route: str = "", result: list = None, containers: bool = False):
     """
     jsonの要素を二重リストとして返します。
     :param json_dict: json.loadで読み込んだdict
     :param route: 指定しないでください
     :param result: 指定しないでください
+    :param containers: Trueの場合、子要素を持つ要素も[route, {}]として子要素より前に追加します
     :return: list
     """
+    if result is None:
+        result = []
     for key, value in json_dict.items():
-        route_key = "{0}['{1}']".format(route, key)
+        route_key = "{0}[{1!r}]".format(route, key)
         if type(value) is dict:
-            result = json_to_list(value, route_key)
+            if containers:
+                result.append([route_key, {}])
+            json_to_list(value, route_key, result, containers)
             continue
 
         # $commentの要素はコメントとして出力しない
@@ -23,17 +25,28 @@ def json_to_list(json_dict: dict, route: str = "", result: list = []):
     return result
 
 
-def list_to_variable(arg_list: list, filename: str):
+def list_to_code(arg_list: list, name: str) -> list:
     """
-    json_to_listで作成したリストをpyファイルとして出力します。
+    json_to_listで作成したリストを、変数nameに代入するpythonのコードの行にします。
+    子要素を持つ要素の代入も必要なため、json_to_listはcontainers=Trueで作成してください。
     :param arg_list: json_to_listで作成したlist
+    :param name: 変数名
+    :return: コードの行のリスト（改行なし）
+    """
+    return ["{0} = {{}}".format(name)] + ["{0}{1} = {2!r}".format(name, item[0], item[1]) for item in arg_list]
+
+
+def list_to_variable(arg_list: list, filename: str, name: str = "read_json"):
+    """
+    json_to_listで作成したリストをpyファイルとして出力します。
+    :param arg_list: json_to_listで作成したlist（containers=True）
     :param filename: ファイル名
+    :param name: 変数名
     :return: 出力の成否
     """
     try:
-        fstream = open(filename, mode='w', encoding='utf-8')
-        for item in arg_list:
-            fstream.writelines("{0} = {1}\n".format(item[0], item[1]))
-    except ValueError:
+        with open(filename, mode='w', encoding='utf-8') as fstream:
+            fstream.writelines(line + "\n" for line in list_to_code(arg_list, name))
+    except (OSError, ValueError):
         return False
     return True
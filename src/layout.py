@@ -0,0 +1,520 @@
+# このファイルはsrc/layout_compiler.pyで作成しています。直接編集しないでください。
+# json/info.json・json/skill.jsonを変更した場合は python -m src.layout_compiler で作り直してください。
+# jsonの内容と一致しない場合は使用されません（src/info_json.pyのload_layoutを参照）。
+import numpy
+
+from src.position import Position
+
+LAYOUT_VERSION = 1
+# 作成に使用したjsonのハッシュ値
+SOURCES = {'json/info.json': 'a8741efa1545384f63da873e4486d0d9', 'json/skill.json': 'addf6a394f0d66cfa57dbff6ad86c4a3'}
+
+# info.json
+read_json = {}
+read_json['template_matching'] = {}
+read_json['template_matching']['image_path'] = {}
+read_json['template_matching']['image_path']['skill'] = 'image/skill_list.png'
+read_json['template_matching']['image_path']['rank'] = 'image/rank_tile.png'
+read_json['template_matching']['image_path']['digit'] = 'image/digit_tile.png'
+read_json['image'] = {}
+read_json['image']['aspect'] = [0.58, 1]
+read_json['string'] = {}
+read_json['string']['color'] = {}
+read_json['string']['color']['min'] = [120, 50, 20]
+read_json['string']['color']['max'] = [210, 190, 170]
+read_json['digit'] = {}
+read_json['digit']['threshold'] = 160
+read_json['digit']['width'] = 16
+read_json['digit']['height'] = 18
+read_json['digit']['min_score'] = 0.5
+read_json['rank'] = {}
+read_json['rank']['size'] = 100
+read_json['rank']['shift'] = 9
+read_json['skill_signature'] = {}
+read_json['skill_signature']['scale'] = 2
+read_json['skill_signature']['candidates'] = 64
+read_json['speed'] = {}
+read_json['speed']['left'] = 59
+read_json['speed']['top'] = 247
+read_json['speed']['right'] = 120
+read_json['speed']['bottom'] = 288
+read_json['stamina'] = {}
+read_json['stamina']['left'] = 169
+read_json['stamina']['top'] = 247
+read_json['stamina']['right'] = 230
+read_json['stamina']['bottom'] = 288
+read_json['power'] = {}
+read_json['power']['left'] = 279
+read_json['power']['top'] = 247
+read_json['power']['right'] = 340
+read_json['power']['bottom'] = 288
+read_json['guts'] = {}
+read_json['guts']['left'] = 389
+read_json['guts']['top'] = 247
+read_json['guts']['right'] = 450
+read_json['guts']['bottom'] = 288
+read_json['intelligence'] = {}
+read_json['intelligence']['left'] = 499
+read_json['intelligence']['top'] = 247
+read_json['intelligence']['right'] = 560
+read_json['intelligence']['bottom'] = 288
+read_json['turf'] = {}
+read_json['turf']['left'] = 194
+read_json['turf']['top'] = 305
+read_json['turf']['right'] = 215
+read_json['turf']['bottom'] = 326
+read_json['dirt'] = {}
+read_json['dirt']['left'] = 303
+read_json['dirt']['top'] = 305
+read_json['dirt']['right'] = 324
+read_json['dirt']['bottom'] = 326
+read_json['sprint'] = {}
+read_json['sprint']['left'] = 194
+read_json['sprint']['top'] = 338
+read_json['sprint']['right'] = 215
+read_json['sprint']['bottom'] = 358
+read_json['mile'] = {}
+read_json['mile']['left'] = 303
+read_json['mile']['top'] = 338
+read_json['mile']['right'] = 324
+read_json['mile']['bottom'] = 358
+read_json['medium'] = {}
+read_json['medium']['left'] = 412
+read_json['medium']['top'] = 338
+read_json['medium']['right'] = 433
+read_json['medium']['bottom'] = 358
+read_json['long'] = {}
+read_json['long']['left'] = 521
+read_json['long']['top'] = 338
+read_json['long']['right'] = 542
+read_json['long']['bottom'] = 358
+read_json['runner'] = {}
+read_json['runner']['left'] = 194
+read_json['runner']['top'] = 371
+read_json['runner']['right'] = 215
+read_json['runner']['bottom'] = 392
+read_json['leader'] = {}
+read_json['leader']['left'] = 303
+read_json['leader']['top'] = 371
+read_json['leader']['right'] = 324
+read_json['leader']['bottom'] = 392
+read_json['betweener'] = {}
+read_json['betweener']['left'] = 412
+read_json['betweener']['top'] = 371
+read_json['betweener']['right'] = 433
+read_json['betweener']['bottom'] = 392
+read_json['chaser'] = {}
+read_json['chaser']['left'] = 521
+read_json['chaser']['top'] = 371
+read_json['chaser']['right'] = 542
+read_json['chaser']['bottom'] = 392
+read_json['tabs'] = {}
+read_json['tabs']['names'] = ['育成情報', 'スキル', '因子']
+read_json['tabs']['selected'] = {}
+read_json['tabs']['selected']['skill'] = {}
+read_json['tabs']['selected']['skill']['left'] = 50
+read_json['tabs']['selected']['skill']['top'] = 430
+read_json['tabs']['selected']['factor'] = {}
+read_json['tabs']['selected']['factor']['left'] = 225
+read_json['tabs']['selected']['factor']['top'] = 430
+read_json['tabs']['selected']['color'] = {}
+read_json['tabs']['selected']['color']['min_white'] = 240
+read_json['tabs']['selected']['color']['max_white'] = 255
+read_json['info'] = {}
+read_json['info']['left'] = 8
+read_json['info']['top'] = 460
+read_json['info']['right'] = 572
+read_json['info']['bottom'] = 885
+read_json['info']['color'] = {}
+read_json['info']['color']['bg'] = 242
+read_json['info']['skills'] = {}
+read_json['info']['skills']['empty'] = {}
+read_json['info']['skills']['empty']['tolerance'] = 6
+read_json['info']['skills']['empty']['ratio'] = 0.9
+read_json['info']['skills']['leftside'] = {}
+read_json['info']['skills']['leftside']['left'] = 17
+read_json['info']['skills']['rightside'] = {}
+read_json['info']['skills']['rightside']['left'] = 293
+read_json['info']['skills']['ofs'] = {}
+read_json['info']['skills']['ofs']['next_height'] = 61
+read_json['info']['skills']['ofs']['all'] = {}
+read_json['info']['skills']['ofs']['all']['left'] = 0
+read_json['info']['skills']['ofs']['all']['top'] = 0
+read_json['info']['skills']['ofs']['all']['right'] = 267
+read_json['info']['skills']['ofs']['all']['bottom'] = 48
+read_json['info']['skills']['ofs']['name'] = {}
+read_json['info']['skills']['ofs']['name']['left'] = 37
+read_json['info']['skills']['ofs']['name']['top'] = 14
+read_json['info']['skills']['ofs']['name']['right'] = 232
+read_json['info']['skills']['ofs']['name']['bottom'] = 34
+read_json['info']['skills']['ofs']['uniquelv'] = {}
+read_json['info']['skills']['ofs']['uniquelv']['left'] = 233
+read_json['info']['skills']['ofs']['uniquelv']['top'] = 14
+read_json['info']['skills']['ofs']['uniquelv']['right'] = 265
+read_json['info']['skills']['ofs']['uniquelv']['bottom'] = 34
+
+POSITIONS = {
+    'speed': Position(247, 59, 288, 120),
+    'stamina': Position(247, 169, 288, 230),
+    'power': Position(247, 279, 288, 340),
+    'guts': Position(247, 389, 288, 450),
+    'intelligence': Position(247, 499, 288, 560),
+    'turf': Position(305, 194, 326, 215),
+    'dirt': Position(305, 303, 326, 324),
+    'sprint': Position(338, 194, 358, 215),
+    'mile': Position(338, 303, 358, 324),
+    'medium': Position(338, 412, 358, 433),
+    'long': Position(338, 521, 358, 542),
+    'runner': Position(371, 194, 392, 215),
+    'leader': Position(371, 303, 392, 324),
+    'betweener': Position(371, 412, 392, 433),
+    'chaser': Position(371, 521, 392, 542),
+    'info': Position(460, 8, 885, 572),
+}
+
+# 14×[スキル名, 固有スキルのレベル]×[top, left, bottom, right] スキルの開始位置を0とした座標
+SKILL_SLOTS = numpy.array([[[14, 54, 34, 249], [14, 250, 34, 282]], [[14, 330, 34, 525], [14, 526, 34, 558]], [[75, 54, 95, 249], [75, 250, 95, 282]], [[75, 330, 95, 525], [75, 526, 95, 558]], [[136, 54, 156, 249], [136, 250, 156, 282]], [[136, 330, 156, 525], [136, 526, 156, 558]], [[197, 54, 217, 249], [197, 250, 217, 282]], [[197, 330, 217, 525], [197, 526, 217, 558]], [[258, 54, 278, 249], [258, 250, 278, 282]], [[258, 330, 278, 525], [258, 526, 278, 558]], [[319, 54, 339, 249], [319, 250, 339, 282]], [[319, 330, 339, 525], [319, 526, 339, 558]], [[380, 54, 400, 249], [380, 250, 400, 282]], [[380, 330, 400, 525], [380, 526, 400, 558]]], dtype=numpy.int32)
+SKILL_SLOTS.flags.writeable = False
+
+# skill.json
+SKILL_SIZE = 17
+SKILL_NAMES = (
+    '#LookatCurren',
+    '∴win Q.E.D.',
+    'G00 1st.F∞;',
+    'G1苦手',
+    'KEEP IT REAL.',
+    'Nemesis',
+    'Pride of KING',
+    'Shadow Break',
+    'U=ma2',
+    'アガッてきた！',
+    'あきらめ癖',
+    'アクセラレーション',
+    'アクセル全開！',
+    'アングリング×スキーミング',
+    'イナズマステップ',
+    'ヴィクトリーショット',
+    'ヴィットーリアに捧ぐ舞踏',
+    'ウママニア',
+    'ウマ好み',
+    'ウマ込み冷静',
+    'おひとり様◯',
+    'おひとり様◎',
+    'お見通し',
+    'かく乱',
+    'カッティング×DRIVE！',
+    'がんばり屋',
+    'ギアシフト',
+    'ギアチェンジ',
+    'きっとその先へ…！',
+    'キラーチューン',
+    'キラキラ☆STARDOM',
+    'クールダウン',
+    'くじけぬ精神',
+    'ゲインヒール・スペリアー',
+    'ゲート難',
+    'コーナー加速◯',
+    'コーナー加速◎',
+    'コーナー回復◯',
+    'コーナー回復◎',
+    'コーナー巧者〇',
+    'コーナー巧者◎',
+    'コンセントレーション',
+    'コンドル猛撃波',
+    'ささやき',
+    'シックスセンス',
+    'じゃじゃウマ娘',
+    'シューティングスター',
+    'シンパシー',
+    'スーパーラッキーセブン',
+    'スタミナイーター',
+    'スタミナキープ',
+    'スピードイーター',
+    'スピードスター',
+    'スプリントギア',
+    'スプリントターボ',
+    'スリーセブン',
+    'スリップストリーム',
+    'チャート急上昇！',
+    'テンポアップ',
+    'どこ吹く風',
+    'トリック(後)',
+    'トリック(前)',
+    'ノンストップガール',
+    'パス上手',
+    'ハヤテ一文字',
+    'バ群嫌い',
+    'ピュリティオブハート',
+    'ひらめき☆ランディング',
+    'フラワリー☆マニューバ',
+    'プランX',
+    'ブランチャ☆ガナドール',
+    'ブリリアント・レッドエース',
+    'ふり絞り',
+    'ブルーローズチェイサー',
+    'ブレイズ・オブ・プライド',
+    'ペースアップ',
+    'ペースキープ',
+    'ホークアイ',
+    'ポジションセンス',
+    'マイルコーナー◯',
+    'マイルコーナー◎',
+    'マイルの支配者',
+    'マイル直線◯',
+    'マイル直線◎',
+    'まき直し',
+    'まなざし',
+    'ライトニングステップ',
+    'ラッキーセブン',
+    'リードキープ',
+    'リスタート',
+    'リラックス',
+    'レースプランナー',
+    'レーンの魔術師',
+    'レコメンド',
+    'レッツ・アナボリック！',
+    'ワクワククライマックス',
+    '圧倒的リード',
+    '位置取り押し上げ',
+    '一陣の風',
+    '一匹狼',
+    '引っ込み思案',
+    '隠れ蓑',
+    '右回り◯',
+    '右回り◎',
+    '雨の日◯',
+    '雨の日◎',
+    '栄養補給',
+    '鋭い眼光',
+    '円弧のマエストロ',
+    '押し切り準備',
+    '下校の楽しみ',
+    '下校後のスペシャリスト',
+    '夏ウマ娘×',
+    '夏ウマ娘〇',
+    '夏ウマ娘◎',
+    '火事場のバ鹿力',
+    '外差し準備',
+    '外枠得意◯',
+    '外枠得意◎',
+    '危険回避',
+    '奇術師',
+    '貴顕の使命を果たすべく',
+    '技巧派',
+    '詰め寄り',
+    '急ぎ足',
+    '究極テイオーステップ',
+    '京都レース場◯',
+    '京都レース場◎',
+    '曲線のソムリエ',
+    '空回り',
+    '薫風、永遠なる瞬間を',
+    '軽やかステップ',
+    '決意の直滑降',
+    '幻惑のかく乱',
+    '弧線のプロフェッサー',
+    '後方待機',
+    '後方釘付',
+    '好位追走',
+    '好転一息',
+    '巧みなステップ',
+    '紅焔ギア/LP1211-M',
+    '鋼の意志',
+    '豪脚',
+    '根幹距離×',
+    '根幹距離◯',
+    '根幹距離◎',
+    '左回り◯',
+    '左回り◎',
+    '差しけん制',
+    '差しコーナー◯',
+    '差しコーナー◎',
+    '差しためらい',
+    '差しのコツ◯',
+    '差しのコツ◎',
+    '差し駆け引き',
+    '差し焦り',
+    '差し切り体勢',
+    '差し直線◯',
+    '差し直線◎',
+    '最強の名をかけて',
+    '阪神レース場◯',
+    '阪神レース場◎',
+    '策士',
+    '札幌レース場◯',
+    '札幌レース場◎',
+    '仕掛け準備',
+    '仕掛け抜群',
+    '姉御肌',
+    '視界良好！異常なし！',
+    '疾風怒濤',
+    '秋ウマ娘×',
+    '秋ウマ娘〇',
+    '秋ウマ娘◎',
+    '集中力',
+    '十万バリキ',
+    '春ウマ娘×',
+    '春ウマ娘〇',
+    '春ウマ娘◎',
+    '準備万全！',
+    '勝利のチケットを、君にッ！',
+    '勝利の鼓動',
+    '勝利への執念',
+    '小休憩',
+    '小心者',
+    '小倉レース場◯',
+    '小倉レース場◎',
+    '昇り龍',
+    '上昇気流',
+    '乗り換え上手',
+    '食いしん坊',
+    '食い下がり',
+    '尻尾上がり',
+    '深呼吸',
+    '神業ステップ',
+    '迅速果断',
+    '垂れウマ回避',
+    '勢い任せ',
+    '晴れの日◯',
+    '晴れの日◎',
+    '精神一到何事か成らざらん',
+    '静かな呼吸',
+    '積極策',
+    '切り開く者',
+    '雪の日◯',
+    '雪の日◎',
+    '絶対は、ボクだ',
+    '先駆け',
+    '先行けん制',
+    '先行コーナー◯',
+    '先行コーナー◎',
+    '先行ためらい',
+    '先行のコツ◯',
+    '先行のコツ◎',
+    '先行駆け引き',
+    '先行焦り',
+    '先行直線◯',
+    '先行直線◎',
+    '先手必勝',
+    '先陣の心得',
+    '先頭の景色は譲らない…！',
+    '先頭プライド',
+    '千里眼',
+    '潜伏態勢',
+    '前途洋々',
+    '前列狙い',
+    '善後策',
+    '全身全霊',
+    '狙うは最前列！',
+    '束縛',
+    '対抗意識◯',
+    '対抗意識◎',
+    '大きなリード',
+    '大井レース場◯',
+    '大井レース場◎',
+    '大局観',
+    '脱出術',
+    '短距離コーナー◯',
+    '短距離コーナー◎',
+    '短距離直線◯',
+    '短距離直線◎',
+    '地固め',
+    '中距離コーナー◯',
+    '中距離コーナー◎',
+    '中距離直線◯',
+    '中距離直線◎',
+    '中山レース場◯',
+    '中山レース場◎',
+    '注目の踊り子',
+    '長距離コーナー◯',
+    '長距離コーナー◎',
+    '長距離直線◯',
+    '長距離直線◎',
+    '直滑降',
+    '直線一気',
+    '直線加速',
+    '直線回復',
+    '直線巧者',
+    '追い上げ',
+    '追込けん制',
+    '追込コーナー◯',
+    '追込コーナー◎',
+    '追込ためらい',
+    '追込のコツ◯',
+    '追込のコツ◎',
+    '追込駆け引き',
+    '追込焦り',
+    '追込直線◯',
+    '追込直線◎',
+    '徹底マーク◯',
+    '徹底マーク◎',
+    '天命士',
+    '展開窺い',
+    '電撃の煌めき',
+    '登山家',
+    '努力家',
+    '怒涛の追い上げ',
+    '冬ウマ娘×',
+    '冬ウマ娘〇',
+    '冬ウマ娘〇',
+    '東京レース場◯',
+    '東京レース場◎',
+    '逃げけん制',
+    '逃げコーナー◯',
+    '逃げコーナー◎',
+    '逃げためらい',
+    '逃げのコツ◯',
+    '逃げのコツ◎',
+    '逃げ駆け引き',
+    '逃げ焦り',
+    '逃げ直線◯',
+    '逃げ直線◎',
+    '逃亡者',
+    '道悪×',
+    '道悪◯',
+    '道悪◎',
+    '独占力',
+    '読解力',
+    '曇りの日◯',
+    '曇りの日◎',
+    '内的体験',
+    '内弁慶',
+    '内枠得意◯',
+    '内枠得意◎',
+    '汝、皇帝の神威を見よ',
+    '二の矢',
+    '悩殺術',
+    '迫る影',
+    '函館レース場◯',
+    '函館レース場◎',
+    '八方にらみ',
+    '抜け駆け禁止',
+    '抜け出し準備',
+    '非根幹距離◯',
+    '非根幹距離◎',
+    '百万バリキ',
+    '不屈の心',
+    '不沈艦、抜錨ォッ！',
+    '布石',
+    '負けん気',
+    '伏兵〇',
+    '伏兵〇',
+    '別腹タンク',
+    '末脚',
+    '魅惑のささやき',
+    '眠れる獅子',
+    '目くらまし',
+    '優等生×バクシン=大勝利ッ',
+    '遊びはおしまいっ！',
+    '余裕綽々',
+    '様子見',
+    '来ます来てます来させます！',
+    '良バ場×',
+    '良バ場◯',
+    '良バ場◎',
+    '臨機応変',
+    '冷静',
+    '彗眼',
+    '煌星のヴォードヴィル',
+)
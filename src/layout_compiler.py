@@ -0,0 +1,95 @@
+import json
+import os
+import sys
+
+from src import info_json as info, json_tool
+
+# 作成するモジュール
+LAYOUT_PATH = os.path.join(info.BASE_DIR, "src", "layout.py")
+
+HEADER = """# このファイルはsrc/layout_compiler.pyで作成しています。直接編集しないでください。
+# json/info.json・json/skill.jsonを変更した場合は python -m src.layout_compiler で作り直してください。
+# jsonの内容と一致しない場合は使用されません（src/info_json.pyのload_layoutを参照）。
+import numpy
+
+from src.position import Position
+"""
+
+
+def __read(path: str) -> dict:
+    with open(path, mode='rt', encoding='utf-8') as fstream:
+        return json.load(fstream)
+
+
+def __is_position(value) -> bool:
+    return type(value) is dict and all(key in value for key in ("top", "left", "bottom", "right"))
+
+
+def build_source() -> str:
+    """
+    info.json・skill.jsonから、src/layout.pyの内容を作成する。
+    read_json      : info.jsonを読み込んだdict（$commentの要素は除く）
+    POSITIONS      : {info.jsonの直下の要素名: Position} 座標を持つ要素のみ
+    SKILL_SLOTS    : スキルの枠ごとの座標 info_json.compute_skill_slotsを参照
+    SKILL_SIZE     : スキル一覧画像の1行の高さ
+    SKILL_NAMES    : スキル一覧画像の行番号ごとのスキル名
+    :return: pythonのコード
+    """
+    sources = info.get_layout_sources()
+    read_json = __read(info.INFO_JSON_PATH)
+    skill_json = __read(info.SKILL_JSON_PATH)
+
+    lines = [HEADER, "LAYOUT_VERSION = {0!r}".format(info.LAYOUT_VERSION),
+             "# 作成に使用したjsonのハッシュ値",
+             "SOURCES = {0!r}".format({name: info.source_digest(path) for name, path in sources.items()}), ""]
+
+    lines.append("# info.json")
+    lines += json_tool.list_to_code(json_tool.json_to_list(read_json, containers=True), "read_json")
+    lines.append("")
+
+    lines.append("POSITIONS = {")
+    lines += ["    {0!r}: {1!r},".format(key, info.get_position(key, read_json))
+              for key, value in read_json.items() if __is_position(value)]
+    lines += ["}", ""]
+
+    slots = info.compute_skill_slots(read_json)
+    lines.append("# 14×[スキル名, 固有スキルのレベル]×[top, left, bottom, right] スキルの開始位置を0とした座標")
+    lines.append("SKILL_SLOTS = numpy.array({0!r}, dtype=numpy.int32)".format(slots.tolist()))
+    lines.append("SKILL_SLOTS.flags.writeable = False")
+    lines.append("")
+
+    lines.append("# skill.json")
+    lines.append("SKILL_SIZE = {0!r}".format(skill_json["size"]))
+    lines.append("SKILL_NAMES = (")
+    lines += ["    {0!r},".format(skill_json[str(i)]) for i in range(len(skill_json) - 1)]
+    lines.append(")")
+    return "\n".join(lines) + "\n"
+
+
+def compile_layout(output: str = LAYOUT_PATH) -> bool:
+    """
+    src/layout.pyを作成する。内容が変わらない場合は書き込まない。
+    :param output: 出力するファイル
+    :return: 書き込んだ場合True
+    """
+    source = build_source()
+    if os.path.exists(output):
+        with open(output, mode='rt', encoding='utf-8') as fstream:
+            if fstream.read() == source:
+                return False
+    with open(output, mode='wt', encoding='utf-8', newline="\n") as fstream:
+        fstream.write(source)
+    return True
+
+
+if __name__ == "__main__":
+    # python -m src.layout_compiler          : src/layout.pyを作り直す
+    # python -m src.layout_compiler --check  : src/layout.pyがjsonと一致しているかを確認する（一致しない場合は終了コード1）
+    if sys.argv[1:] == ["--check"]:
+        stale = True
+        if os.path.exists(LAYOUT_PATH):
+            with open(LAYOUT_PATH, mode='rt', encoding='utf-8') as fstream:
+                stale = fstream.read() != build_source()
+        print("src/layout.py is out of date" if stale else "src/layout.py is up to date")
+        sys.exit(1 if stale else 0)
+    print("updated: src/layout.py" if compile_layout() else "unchanged: src/layout.py")
@@ -0,0 +1,116 @@
+import json
+import logging
+import sys
+import time
+
+try:
+    import resource
+except ImportError:
+    # Windowsではメモリ使用量を取得しない
+    resource = None
+
+logger = logging.getLogger("uma_detail.metrics")
+
+# 計測の有効・無効 無効の場合は計測処理を行わない
+enabled = False
+__callback = None
+__log = False
+
+
+def enable(callback=None, log: bool = True):
+    """
+    計測を有効にする。計測結果は1件ずつdictとして出力する。
+    {"type": "timer", "name": 処理段階, "value": 秒}
+    {"type": "counter", "name": 名前, "value": 件数, ...}
+    {"type": "score", "name": 名前, "value": 値, ...}
+    :param callback: 計測結果を受け取る関数 callback(record: dict) 複数のスレッドから呼ばれる場合がある
+    :param log: Trueの場合、計測結果をjson文字列としてloggerに出力する
+    """
+    global enabled, __callback, __log
+    __callback, __log = callback, log
+    enabled = True
+
+
+def disable():
+    global enabled, __callback, __log
+    enabled, __callback, __log = False, None, False
+
+
+def emit(record: dict):
+    if __log:
+        logger.info(json.dumps(record, ensure_ascii=False))
+    if __callback is not None:
+        __callback(record)
+
+
+def count(name: str, value: int = 1, **fields):
+    """
+    件数を出力する。
+    :param name: 名前
+    :param value: 件数
+    :param fields: 追加の情報
+    """
+    if enabled:
+        emit(dict(type="counter", name=name, value=value, **fields))
+
+
+def score(name: str, value: float, **fields):
+    """
+    一致度などの値を出力する。
+    :param name: 名前
+    :param value: 値
+    :param fields: 追加の情報
+    """
+    if enabled:
+        emit(dict(type="score", name=name, value=round(float(value), 4), **fields))
+
+
+class __Timer:
+    __slots__ = ["name", "start"]
+
+    def __init__(self, name: str):
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        emit({"type": "timer", "name": self.name, "value": round(time.perf_counter() - self.start, 6)})
+        return False
+
+
+class __NullTimer:
+    __slots__ = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+__null_timer = __NullTimer()
+
+
+def timer(name: str):
+    """
+    withで囲んだ処理の処理時間を出力する。計測が無効の場合は何もしない。
+    :param name: 処理段階の名前
+    :return: コンテキストマネージャ
+    """
+    return __Timer(name) if enabled else __null_timer
+
+
+def get_peak_rss(children: bool = False):
+    """
+    プロセスの最大メモリ使用量（最大常駐セットサイズ）を返す。
+    :param children: Trueの場合、終了した子プロセスのうち最大のもの
+    :return: MB 取得できない環境ではNone
+    """
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF)
+    # macOSはバイト、それ以外はKB単位
+    return round(usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
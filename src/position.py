@@ -0,0 +1,27 @@
+class Position:
+    """
+    画像上の四角の範囲（info.jsonのleft・top・right・bottom）。
+    src/layout.pyで定数として共有するため、値は変更しないでください。
+    """
+
+    __slots__ = ("left", "top", "right", "bottom", "width", "height")
+
+    def __init__(self, arg_top, arg_left, arg_bottom, arg_right):
+        self.left = int(arg_left)
+        self.top = int(arg_top)
+        self.right = int(arg_right)
+        self.bottom = int(arg_bottom)
+        self.width = int(arg_right - arg_left)
+        self.height = int(arg_bottom - arg_top)
+
+    def __eq__(self, other):
+        if not isinstance(other, Position):
+            return NotImplemented
+        return (self.top, self.left, self.bottom, self.right) == (other.top, other.left, other.bottom, other.right)
+
+    def __hash__(self):
+        return hash((self.top, self.left, self.bottom, self.right))
+
+    def __repr__(self):
+        # src/layout.pyにそのまま出力できる形式
+        return "Position({0}, {1}, {2}, {3})".format(self.top, self.left, self.bottom, self.right)
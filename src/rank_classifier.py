@@ -0,0 +1,69 @@
+import threading
+
+import numpy
+
+from src import imagetools as imgtools, info_json as info, template_matching, template_store
+
+RANKS = "SABCDEFG"
+
+# {比較する画像の幅: [適性のテンプレート画像, 位置ごとの適性の番号, 比較用のベクトル]}
+__features = {}
+__lock = threading.Lock()
+
+
+def __to_vectors(images: numpy.ndarray) -> numpy.ndarray:
+    # 平均を引いて長さを1にする（内積がTM_CCOEFF_NORMEDと同じ正規化相互相関になる）
+    vectors = images.reshape(len(images), -1).astype(numpy.float32)
+    vectors -= vectors.mean(axis=1, keepdims=True)
+    norm = numpy.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / numpy.where(norm == 0, 1, norm)
+
+
+def get_features(width: int) -> list:
+    """
+    適性のテンプレート画像（S〜Gを横に並べたもの）から、各文字の位置の前後shiftの範囲を切り出して比較用のベクトルにする。
+    幅ごとに1回だけ作成し、テンプレート画像が読み込み直された場合は作り直す。
+    :param width: 比較する画像の幅（高さはsize）
+    :return: [位置ごとの適性の番号(ndarray), 比較用のベクトル(ndarray 位置の数×(size×width))]
+    """
+    tile = template_store.get_rank_template_gray()
+    with __lock:
+        cached = __features.get(width)
+    if cached is not None and cached[0] is tile:
+        return cached[1:]
+
+    size, shift = info.get_rank_setting()
+    offsets, ranks = [], []
+    for i in range(len(RANKS)):
+        for x in range(size * i - shift, size * i + shift + 1):
+            if 0 <= x <= tile.shape[1] - width:
+                offsets.append(x)
+                ranks.append(i)
+    windows = numpy.lib.stride_tricks.sliding_window_view(tile[:size], (size, width))[0, offsets]
+    cached = [tile, numpy.array(ranks), __to_vectors(windows)]
+    with __lock:
+        __features[width] = cached
+    return cached[1:]
+
+
+def classify_ranks(img: numpy.ndarray, positions: list) -> list:
+    """
+    適性の文字（S〜G）を、全ての位置の画像をまとめて1回の行列積でテンプレートと比較して判別する。
+    :param img: ndarray
+    :param positions: 適性の位置(info.Position)のリスト
+    :return: [[適性の文字, 一致度], ...] positionsの順番
+    """
+    size = info.get_rank_setting()[0]
+    crops = [template_matching.to_gray(imgtools.resize_by_aspect(img[pos.top: pos.bottom, pos.left: pos.right], size))
+             for pos in positions]
+
+    # 幅が同じ画像ごとに重ねて比較する
+    result = [None] * len(crops)
+    for width in sorted({crop.shape[1] for crop in crops}):
+        indexes = [i for i, crop in enumerate(crops) if crop.shape[1] == width]
+        ranks, features = get_features(width)
+        scores = __to_vectors(numpy.array([crops[i] for i in indexes])) @ features.T
+        best = scores.argmax(axis=1)
+        for n, i in enumerate(indexes):
+            result[i] = [RANKS[ranks[best[n]]], float(scores[n, best[n]])]
+    return result
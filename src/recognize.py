@@ -1,34 +1,121 @@
+import functools
 import sys
 import pyocr
 import pyocr.builders
 from PIL import Image
 
+from src import digit_classifier, imagetools
 
-def recognize_number(img: Image) -> str:
+# recognize_numberで使用する読み取り方法
+BACKEND_TESSERACT = "tesseract"  # tesseractによる文字認識（画像ごとに読み取る）
+# tesseractによる文字認識（複数の画像を1枚に並べて1回で読み取る）
+# test/expected_status.jsonと同じ結果になることを確認するまでは、指定した場合のみ使用する
+BACKEND_TESSERACT_BATCH = "tesseract-batch"
+BACKEND_DIGIT = "digit"  # 同梱のテンプレートとの比較（ステータス・固有スキルのレベルの数字のみ対応、外部プログラム不要）
+# 指定できる読み取り方法
+BACKENDS = [BACKEND_TESSERACT, BACKEND_TESSERACT_BATCH, BACKEND_DIGIT]
+
+
+@functools.lru_cache(maxsize=1)
+def get_tool():
     """
-    数字を対象とした文字認識を行い、結果を返す。
-    :param img: Image
-    :return: 認識結果の文字列
+    文字認識に使用するツールを返す。ツールの検索はプロセスで初回のみ行う。
+    :return: pyocrのツール
     """
     tools = pyocr.get_available_tools()
     if len(tools) == 0:
         sys.exit(1)
-    return tools[0].image_to_string(
+    return tools[0]
+
+
+def recognize_number(img: Image, backend: str = BACKEND_TESSERACT) -> str:
+    """
+    数字を対象とした文字認識を行い、結果を返す。
+    :param img: Image
+    :param backend: 読み取り方法 BACKENDSのいずれか（BACKEND_TESSERACT_BATCHは1枚の場合BACKEND_TESSERACTと同じ）
+    :return: 認識結果の文字列
+    """
+    if backend == BACKEND_DIGIT:
+        return digit_classifier.recognize_digits(imagetools.cv_image(img))
+    if backend not in (BACKEND_TESSERACT, BACKEND_TESSERACT_BATCH):
+        raise ValueError("recognize_number: unsupported backend: %s" % backend)
+    return get_tool().image_to_string(
         img,
         lang="eng",
         builder=pyocr.builders.TextBuilder())
 
 
+def recognize_number_batch(images: list, backend: str = BACKEND_TESSERACT) -> list:
+    """
+    複数の画像の数字を認識する。
+    BACKEND_TESSERACT_BATCHの場合は、複数の画像を縦に並べた1枚の画像を作成し、1回の文字認識でまとめて認識する。
+    それ以外は画像ごとにrecognize_numberで認識する。
+    :param images: Imageのリスト
+    :param backend: 読み取り方法 BACKENDSのいずれか
+    :return: 画像ごとの認識結果の文字列のリスト（BACKEND_TESSERACT_BATCHで認識できなかった画像は空文字）
+    """
+    if backend != BACKEND_TESSERACT_BATCH:
+        return [recognize_number(img, backend) for img in images]
+    if len(images) == 0:
+        return []
+    page, cells = tile_images(images)
+    lines = get_tool().image_to_string(
+        page,
+        lang="eng",
+        builder=pyocr.builders.LineBoxBuilder(tesseract_layout=6))
+
+    # 認識した単語の中心が含まれる枠の画像の結果とする
+    words = [[] for _ in cells]
+    for line in lines:
+        for box in line.word_boxes:
+            (left, top), (right, bottom) = box.position
+            index = find_cell(cells, (top + bottom) / 2)
+            if index >= 0:
+                words[index].append((left, box.content))
+    return [" ".join(content for _, content in sorted(item)).strip() for item in words]
+
+
+def tile_images(images: list) -> tuple:
+    """
+    画像を白背景の1枚の画像に縦に並べる。文字が別の行として認識されるように、画像の間には余白を入れる。
+    :param images: Imageのリスト
+    :return: (並べた画像, 各画像の枠[top, bottom]のリスト)
+    """
+    margin = max(img.height for img in images)
+    width = max(img.width for img in images) + margin * 2
+    height = sum(img.height for img in images) + margin * (len(images) + 1)
+
+    page = Image.new("RGB", (width, height), (255, 255, 255))
+    cells = []
+    top = margin
+    for img in images:
+        page.paste(img.convert("RGB"), (margin, top))
+        # 余白の半分までを枠の範囲とする
+        cells.append([top - margin // 2, top + img.height + margin // 2])
+        top += img.height + margin
+    return page, cells
+
+
+def find_cell(cells: list, y: float) -> int:
+    """
+    Y座標が含まれる枠の番号を返す。
+    :param cells: 各画像の枠[top, bottom]のリスト
+    :param y: Y座標
+    :return: 枠の番号 含まれる枠が無い場合は-1
+    """
+    for index, (top, bottom) in enumerate(cells):
+        if top <= y < bottom:
+            return index
+    return -1
+
+
 def recognize_jpn_string(img: Image) -> str:
     """
     日本語文字列を対象とした文字認識を行い、結果を返す。
     :param img: Image
     :return: 認識結果の文字列
     """
-    tools = pyocr.get_available_tools()
-    if len(tools) == 0:
-        sys.exit(1)
-    return tools[0].image_to_string(
+    return get_tool().image_to_string(
         img,
         lang="jpn",
         builder=pyocr.builders.TextBuilder())
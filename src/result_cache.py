@@ -0,0 +1,178 @@
+import collections
+import hashlib
+import os
+import threading
+
+import numpy
+
+from src import info_json as info, roi_image, skill_index
+
+INFO_JSON_PATH = info.INFO_JSON_PATH
+
+
+def get_asset_paths() -> list:
+    """
+    読み取り結果に影響するファイル（設定のjson・テンプレート画像）のパスの一覧を返す。
+    :return: パスのリスト
+    """
+    return [INFO_JSON_PATH, skill_index.SKILL_JSON_PATH,
+            info.get_template_matching_image_path_skill(), info.get_template_matching_image_path_rank(),
+            info.get_template_matching_image_path_digit()]
+
+
+def get_asset_fingerprint() -> str:
+    """
+    設定のjson・テンプレート画像のサイズと更新日時から、内容が変わったことを判別する値を作成する。
+    :return: 16進数の文字列
+    """
+    digest = hashlib.blake2b(digest_size=8)
+    for path in get_asset_paths():
+        stat = os.stat(path)
+        digest.update("{0}:{1}:{2};".format(path, stat.st_size, stat.st_mtime_ns).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    読み取り結果のキャッシュ。
+    キーはimread_umadetailで抽出した後の画像の内容のハッシュなので、再エンコードした同じ画像でも一致する。
+    メモリ上（LRU）と、ディレクトリを指定した場合はディスク上（合計サイズの上限付き）に保存する。
+    設定のjson・テンプレート画像が変わった場合は、キーが変わるため以前の結果は使用されない。
+    """
+
+    def __init__(self, capacity: int = 256, directory: str = None, max_bytes: int = 64 * 1024 * 1024):
+        self.capacity = capacity
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.__memory = collections.OrderedDict()
+        self.__lock = threading.Lock()
+        self.__disk_bytes = 0
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+            self.__disk_bytes = sum(os.path.getsize(p) for p in self.__disk_files())
+
+    @property
+    def disk_bytes(self) -> int:
+        """
+        ディスク上に保存している読み取り結果の合計サイズ
+        """
+        return self.__disk_bytes
+
+    def key(self, img: numpy.ndarray, backend: str = "") -> str:
+        """
+        画像の内容・読み取り方法・設定ファイルからキーを作成する。
+        :param img: imread_umadetailで抽出した画像(ndarray もしくはRoiImage)
+        :param backend: ステータスの読み取り方法
+        :return: キー
+        """
+        if isinstance(img, roi_image.RoiImage):
+            # リサイズ前の画像の内容で判別する（全体をリサイズしないため）
+            backend, img = "{0}:roi{1}".format(backend, img.shape), img.source
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update("{0}:{1}:{2}:{3};".format(get_asset_fingerprint(), backend, img.shape, img.dtype)
+                      .encode("utf-8"))
+        digest.update(numpy.ascontiguousarray(img).data)
+        return digest.hexdigest()
+
+    def get(self, key: str):
+        """
+        キーに対応する読み取り結果を返す。
+        :param key: キー
+        :return: 読み取り結果 無い場合はNone
+        """
+        with self.__lock:
+            value = self.__memory.get(key)
+            if value is not None:
+                self.__memory.move_to_end(key)
+                self.hits += 1
+                return value
+
+        value = self.__read_disk(key)
+        with self.__lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.__put_memory(key, value)
+        return value
+
+    def put(self, key: str, value: str):
+        """
+        読み取り結果を保存する。
+        :param key: キー
+        :param value: 読み取り結果（json文字列）
+        """
+        with self.__lock:
+            self.__put_memory(key, value)
+        self.__write_disk(key, value)
+
+    def clear(self):
+        with self.__lock:
+            self.__memory.clear()
+            for path in self.__disk_files():
+                os.remove(path)
+            self.__disk_bytes = 0
+
+    def __put_memory(self, key: str, value: str):
+        self.__memory[key] = value
+        self.__memory.move_to_end(key)
+        while len(self.__memory) > self.capacity:
+            self.__memory.popitem(last=False)
+
+    def __disk_files(self) -> list:
+        return [os.path.join(self.directory, f) for f in os.listdir(self.directory) if f.endswith(".json")]
+
+    def __read_disk(self, key: str):
+        if self.directory is None:
+            return None
+        path = os.path.join(self.directory, key + ".json")
+        try:
+            with open(path, mode='rt', encoding='utf-8') as fstream:
+                value = fstream.read()
+            # 最近使用したものを残すため、更新日時を使用日時として更新する
+            os.utime(path)
+            return value
+        except FileNotFoundError:
+            return None
+
+    def __write_disk(self, key: str, value: str):
+        if self.directory is None:
+            return
+        path = os.path.join(self.directory, key + ".json")
+        tmp_path = "{0}.{1}.{2}.tmp".format(path, os.getpid(), threading.get_ident())
+        with open(tmp_path, mode='wt', encoding='utf-8') as fstream:
+            fstream.write(value)
+        size = os.path.getsize(tmp_path)
+        with self.__lock:
+            # 同じキーを書き直す場合は、置き換える前のファイルのサイズを差し引く
+            try:
+                previous = os.path.getsize(path)
+            except FileNotFoundError:
+                previous = 0
+            os.replace(tmp_path, path)
+            self.__disk_bytes += size - previous
+            if self.__disk_bytes > self.max_bytes:
+                self.__evict_disk()
+
+    def __evict_disk(self):
+        # 使用日時の古いものから、合計サイズが上限の9割以下になるまで削除する
+        files = []
+        for path in self.__disk_files():
+            try:
+                stat = os.stat(path)
+                files.append((stat.st_mtime_ns, stat.st_size, path))
+            except FileNotFoundError:
+                continue
+        files.sort()
+        total = sum(size for _, size, _ in files)
+        for _, size, path in files:
+            if total <= self.max_bytes * 0.9:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        self.__disk_bytes = total
@@ -0,0 +1,85 @@
+import cv2
+import numpy
+
+from src import imagetools as imgtools
+
+
+class RoiImage:
+    """
+    抽出したウマ娘詳細画面を、全体をリサイズせずに「高さheightにリサイズした画像」として扱う。
+    info.jsonの座標（リサイズ後の座標）で切り出すと、元の解像度の画像から必要な部分だけを計算して返す。
+    切り出した画素値は、全体をリサイズしてから切り出した場合と同じになる。
+
+    img[top: bottom, left: right] / img[y, x] / img[numpy.ix_(rows, cols)] の形の切り出しに対応し、
+    それ以外の使い方をした場合は全体をリサイズした画像（numpy.asarray(img)）を使用する。
+    """
+
+    def __init__(self, source: numpy.ndarray, height: int):
+        """
+        :param source: 抽出した画像（リサイズ前のndarray uint8）
+        :param height: リサイズ後の高さ
+        """
+        self.source = source
+        src_height, src_width = source.shape[:2]
+        # imagetools.resize_by_aspectと同じサイズ
+        self.shape = (height, round(height * (src_width / src_height))) + source.shape[2:]
+        self.__resized = None
+        # リサイズ後の行・列ごとの参照位置と重み
+        self.__rows = imgtools.resize_coefficients(self.shape[0], src_height, True)
+        self.__cols = imgtools.resize_coefficients(self.shape[1], src_width)
+        # 同じ範囲を何度も切り出す場合（空き枠の判別とスキル名の読み取りなど）のため、切り出した結果を保持する
+        self.__regions = {}
+
+    @property
+    def ndim(self) -> int:
+        return len(self.shape)
+
+    @property
+    def dtype(self) -> numpy.dtype:
+        return self.source.dtype
+
+    @property
+    def size(self) -> int:
+        return int(numpy.prod(self.shape))
+
+    def __array__(self, dtype=None):
+        if self.__resized is None:
+            self.__resized = cv2.resize(self.source, dsize=(self.shape[1], self.shape[0]))
+        return self.__resized if dtype is None else self.__resized.astype(dtype)
+
+    def __getitem__(self, key):
+        key = key if isinstance(key, tuple) else (key,)
+        row_key, col_key = (key + (slice(None),) * 2)[:2]
+        # 両方が1次元の配列の場合（要素ごとの組み合わせ）は、全体をリサイズした画像で処理する
+        if all(isinstance(k, numpy.ndarray) and k.ndim == 1 for k in (row_key, col_key)):
+            return numpy.asarray(self)[key]
+        rows, single_row = self.__indexes(row_key, self.shape[0])
+        cols, single_col = self.__indexes(col_key, self.shape[1])
+        if rows is None or cols is None:
+            return numpy.asarray(self)[key]
+
+        cacheable = isinstance(row_key, slice) and isinstance(col_key, slice)
+        area = (row_key.indices(self.shape[0]), col_key.indices(self.shape[1])) if cacheable else None
+        region = self.__regions.get(area)
+        if region is None:
+            region = imgtools.resize_region(self.source, self.__rows[:, rows], self.__cols[:, cols])
+            if cacheable:
+                self.__regions[area] = region
+        # 呼び出し元で書き換えられても保持している結果が変わらないようにコピーを返す
+        return region[(0 if single_row else slice(None), 0 if single_col else slice(None)) + key[2:]].copy()
+
+    @staticmethod
+    def __indexes(key, size: int) -> tuple:
+        # 切り出す位置の一覧と、1つの位置のみ（次元が減る）かどうかを返す 対応していない場合はNone
+        if isinstance(key, slice):
+            return numpy.arange(*key.indices(size)), False
+        if isinstance(key, (int, numpy.integer)):
+            if not -size <= key < size:
+                raise IndexError("index {0} is out of bounds for axis with size {1}".format(key, size))
+            return numpy.array([key % size]), True
+        if isinstance(key, numpy.ndarray) and key.dtype.kind in "iu" and key.size == max(key.shape, default=0):
+            key = key.ravel()
+            if numpy.any((key < -size) | (key >= size)):
+                raise IndexError("index is out of bounds for axis with size {0}".format(size))
+            return key % size, False
+        return None, False
@@ -0,0 +1,159 @@
+import json
+import os
+import threading
+
+import numpy
+
+from src import info_json as info
+
+SKILL_JSON_PATH = info.SKILL_JSON_PATH
+CIRCLE, DOUBLE_CIRCLE = "◯", "◎"
+
+
+class SkillIndex:
+    """
+    skill.jsonを読み込んだスキル名の索引。
+    スキル一覧画像の行番号からスキル名を配列の添字で引けるようにしておく。
+    """
+
+    def __init__(self, read_json: dict):
+        count = len(read_json) - 1
+        self.__build(read_json["size"], [read_json[str(i)] for i in range(count)])
+
+    @classmethod
+    def from_names(cls, size: int, names) -> "SkillIndex":
+        """
+        src/layout.pyのSKILL_SIZE・SKILL_NAMESから作成する。
+        :param size: スキル一覧画像の1行の高さ
+        :param names: 行番号ごとのスキル名
+        :return: SkillIndex
+        """
+        index = cls.__new__(cls)
+        index.__build(size, names)
+        return index
+
+    def __build(self, size: int, names):
+        # 文字列の間隔（スキル一覧画像の1行の高さ）
+        self.size = size
+        # 行番号 → スキル名
+        self.names = numpy.array(list(names), dtype=object)
+        # スキル名 → 行番号（同名のスキルが複数行ある場合は最初の行）
+        self.rows = {}
+        # ○◎の付かないスキル名 → [○のスキル名, ◎のスキル名]
+        self.variants = {}
+        for row, name in enumerate(self.names):
+            self.rows.setdefault(name, row)
+            if name[-1] == CIRCLE or name[-1] == DOUBLE_CIRCLE:
+                variant = self.variants.setdefault(name[:-1], [name[:-1] + CIRCLE, name[:-1] + DOUBLE_CIRCLE])
+                variant[name[-1] == DOUBLE_CIRCLE] = name
+
+    def __len__(self):
+        return len(self.names)
+
+    def rows_for_points(self, tops, bottoms) -> numpy.ndarray:
+        """
+        テンプレートマッチングで取得した位置の上端・下端から行番号をまとめて求める。
+        :param tops: 上端のY座標の一覧
+        :param bottoms: 下端のY座標の一覧
+        :return: ndarray(int) 行番号の一覧
+        """
+        # 位置のY軸の中間を{文字列の間隔}で割った数字を行番号とする
+        pos = (numpy.asarray(tops) + numpy.asarray(bottoms)) / 2
+        return numpy.floor((pos - 2) / self.size).astype(numpy.intp)
+
+    def names_for_rows(self, rows) -> numpy.ndarray:
+        """
+        行番号の一覧からスキル名の一覧を返す。
+        :param rows: 行番号の一覧
+        :return: ndarray(str) スキル名の一覧
+        """
+        rows = numpy.asarray(rows, dtype=numpy.intp)
+        if numpy.any((rows < 0) | (rows >= len(self.names))):
+            raise IndexError("skill_index: row out of range: %s" % rows)
+        return self.names[rows]
+
+    def names_for_points(self, points) -> numpy.ndarray:
+        """
+        テンプレートマッチングで取得した位置の一覧からスキル名の一覧を返す。
+        :param points: [[left, top, right, bottom], ...]
+        :return: ndarray(str) スキル名の一覧
+        """
+        points = numpy.asarray(points).reshape(-1, 4)
+        return self.names_for_rows(self.rows_for_points(points[:, 1], points[:, 3]))
+
+    def name_for_point(self, pt) -> str:
+        """
+        テンプレートマッチングで取得した位置からスキル名を返す。
+        :param pt: [left, top, right, bottom]
+        :return: スキル名
+        """
+        return self.names_for_points([pt])[0]
+
+    def variant(self, name: str, double: bool) -> str:
+        """
+        ○◎の付くスキル名を、指定した側のスキル名に置き換えて返す。
+        :param name: スキル名
+        :param double: Trueなら◎、Falseなら○
+        :return: スキル名 ○◎の付かないスキル名はそのまま返す
+        """
+        variant = self.variants.get(name[:-1]) if name[-1:] in (CIRCLE, DOUBLE_CIRCLE) else None
+        return variant[double] if variant is not None else name
+
+
+__skill_index = None
+# 読み込んだskill.jsonの更新日時
+__mtime = None
+__lock = threading.Lock()
+
+
+def load(path: str = SKILL_JSON_PATH) -> SkillIndex:
+    with open(path, mode='rt', encoding='utf-8') as fstream:
+        return SkillIndex(json.load(fstream))
+
+
+def __load_default() -> SkillIndex:
+    global __mtime
+    __mtime = os.path.getmtime(SKILL_JSON_PATH)
+    # jsonと一致するsrc/layout.pyがあれば、jsonを読み込まずに作成する
+    layout = info.load_layout()
+    if layout is not None:
+        return SkillIndex.from_names(layout.SKILL_SIZE, layout.SKILL_NAMES)
+    return load()
+
+
+def get_skill_index() -> SkillIndex:
+    """
+    スキル名の索引を返す。初回のみskill.jsonを読み込む。
+    スキルの枠ごとに呼び出されるため、skill.jsonの更新日時は確認しない。
+    読み込んだ後にskill.jsonを変更した場合は、reload_if_modified（daemon.pyが要求ごとに呼び出す）かreloadで読み込み直す。
+    :return: SkillIndex
+    """
+    global __skill_index
+    if __skill_index is None:
+        with __lock:
+            if __skill_index is None:
+                __skill_index = __load_default()
+    return __skill_index
+
+
+def reload() -> SkillIndex:
+    """
+    skill.jsonを読み込み直す。
+    :return: SkillIndex
+    """
+    global __skill_index
+    with __lock:
+        __skill_index = __load_default()
+    return __skill_index
+
+
+def reload_if_modified() -> bool:
+    """
+    skill.jsonの更新日時が変わっている場合だけ読み込み直す。
+    常駐プロセス(daemon.py)のみが呼び出す（app.py・batch.py・server.pyは起動時に読み込んだ内容を使用する）。
+    :return: 読み込み直した場合True
+    """
+    if __skill_index is None or os.path.getmtime(SKILL_JSON_PATH) == __mtime:
+        return False
+    reload()
+    return True
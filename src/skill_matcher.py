@@ -0,0 +1,90 @@
+import math
+import threading
+
+import cv2
+import numpy
+
+from src import info_json as info, skill_index, template_matching, template_store
+
+# [スキル一覧画像, スキル名の索引, 縮小したスキル一覧画像]
+__signatures = None
+__lock = threading.Lock()
+
+
+def get_signatures() -> list:
+    """
+    スキル一覧画像の幅を1/scaleに縮小し、各行の大まかな比較に使用する画像を作成する。
+    文字の高さは12px程度しかないため、縦方向は縮小しない。
+    1回だけ作成し、スキル一覧画像かskill.jsonが読み込み直された場合は作り直す。
+    :return: [縮小したスキル一覧画像(ndarray), スキル名の索引(SkillIndex)]
+    """
+    global __signatures
+    sheet = template_store.get_skill_template_gray()
+    index = skill_index.get_skill_index()
+    cached = __signatures
+    if cached is not None and cached[0] is sheet and cached[1] is index:
+        return cached[1:]
+
+    scale = info.get_skill_signature_setting()[0]
+    small = cv2.resize(sheet, (sheet.shape[1] // scale, sheet.shape[0]), interpolation=cv2.INTER_AREA)
+    small.flags.writeable = False
+    cached = [sheet, index, small]
+    with __lock:
+        __signatures = cached
+    return cached[1:]
+
+
+def candidates(target: numpy.ndarray, count: int = None) -> list:
+    """
+    幅を縮小した画像同士を1回のテンプレートマッチングで比較し、一致度の高いスキル一覧画像の行を返す。
+    :param target: 背景を除去したスキル名の画像（グレースケール変換済みの画像も指定できる）
+    :param count: 返す行の数 省略した場合はinfo.jsonのcandidates
+    :return: [[行番号, 一致度], ...] 一致度の高い順
+    """
+    index, small = get_signatures()
+    scale, default_count = info.get_skill_signature_setting()
+    gray = template_matching.to_gray(target)
+    height, width = gray.shape[:2]
+    shrunk = cv2.resize(gray, (max(1, round(width / scale)), height), interpolation=cv2.INTER_AREA)
+    match = cv2.matchTemplate(small, shrunk, cv2.TM_CCOEFF_NORMED).max(axis=1)
+
+    # Y座標ごとの最大値を、行ごとの最大値にまとめる
+    tops = numpy.arange(len(match))
+    rows = index.rows_for_points(tops, tops + height)
+    valid = (rows >= 0) & (rows < len(index))
+    rows, match = rows[valid], match[valid]
+    starts = numpy.flatnonzero(numpy.r_[True, rows[1:] != rows[:-1]])
+    scores = numpy.maximum.reduceat(match, starts)
+    rows = rows[starts]
+
+    count = min(len(rows), count or default_count)
+    best = numpy.argsort(-scores, kind="stable")[:count]
+    return [[int(rows[i]), float(scores[i])] for i in best]
+
+
+def match(target: numpy.ndarray, count: int = None) -> list:
+    """
+    一致度の高い行だけをスキル一覧画像（元の大きさ）と比較する。
+    最も一致する行が候補に含まれていれば、結果はスキル一覧画像全体でテンプレートマッチングした場合の
+    最大値・最大値の位置と同じになる。
+    :param target: 背景を除去したスキル名の画像（グレースケール変換済みの画像も指定できる）
+    :param count: 比較する行の数 省略した場合はinfo.jsonのcandidates
+    :return: [最大値, 最大値の位置]
+    """
+    sheet = template_store.get_skill_template_gray()
+    index = skill_index.get_skill_index()
+    gray = template_matching.to_gray(target)
+    height = gray.shape[0]
+    max_value, max_pt = -1.0, (0, 0)
+    # 全体を比較した場合と同じ位置を返すように、上の行から順に比較する
+    for row, _ in sorted(candidates(gray, count)):
+        # 位置のY軸の中間がこの行に入る範囲（SkillIndex.rows_for_pointsの逆算）
+        top = max(0, math.ceil(row * index.size + 2 - height / 2))
+        bottom = min(sheet.shape[0] - height + 1, math.ceil((row + 1) * index.size + 2 - height / 2))
+        if top >= bottom:
+            continue
+        _, value, _, pt = cv2.minMaxLoc(cv2.matchTemplate(sheet[top: bottom + height - 1], gray,
+                                                          cv2.TM_CCOEFF_NORMED))
+        if value > max_value:
+            max_value, max_pt = value, (pt[0], pt[1] + top)
+    return [max_value, max_pt]
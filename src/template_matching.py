@@ -2,15 +2,24 @@ import cv2
 import numpy
 
 
-def matching(img: numpy.ndarray, template: numpy.ndarray) -> int:
+def to_gray(img: numpy.ndarray) -> numpy.ndarray:
     """
+    テンプレートマッチング用のグレースケール画像に変換する。変換済みの場合はそのまま返す。
     :param img: 画像(ndarray)
-    :param template: テンプレート(ndarray)
+    :return: グレースケール画像(ndarray)
+    """
+    return img if img.ndim == 2 else cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
+
+
+def matching(img: numpy.ndarray, template: numpy.ndarray) -> int:
+    """
+    :param img: 画像(ndarray) グレースケール変換済みの画像も指定できる
+    :param template: テンプレート(ndarray) グレースケール変換済みの画像も指定できる
     :return: [最小値、最大値、最小値の位置、最大値の位置]
     """
     # グレースケール変換
-    gray1 = cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
-    gray2 = cv2.cvtColor(template, cv2.COLOR_RGB2GRAY)
+    gray1 = to_gray(img)
+    gray2 = to_gray(template)
 
     # テンプレートマッチング
     match = cv2.matchTemplate(gray1, gray2, cv2.TM_CCOEFF_NORMED)
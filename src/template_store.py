@@ -0,0 +1,95 @@
+import os
+import threading
+
+import cv2
+import numpy
+
+from src import info_json as info, template_matching
+
+# 読み込み済みのテンプレート画像 {パス: [カラー画像, グレースケール画像, 更新日時]}
+__templates = {}
+__lock = threading.Lock()
+
+
+def __load(path: str) -> list:
+    """
+    テンプレート画像をファイルから読み込み、カラー画像とグレースケール画像を作成する。
+    :param path: 画像のパス
+    :return: [カラー画像, グレースケール画像, 更新日時]
+    """
+    color = cv2.imread(path)
+    if color is None:
+        raise FileNotFoundError("template_store: cannot read template: %s" % path)
+    gray = template_matching.to_gray(color)
+    # 共有する配列なので、誤って書き換えられないように読み取り専用にする
+    color.flags.writeable = False
+    gray.flags.writeable = False
+    return [color, gray, os.path.getmtime(path)]
+
+
+def __get(path: str) -> list:
+    item = __templates.get(path)
+    if item is None:
+        with __lock:
+            item = __templates.get(path)
+            if item is None:
+                item = __templates[path] = __load(path)
+    return item
+
+
+def get_template(path: str) -> numpy.ndarray:
+    """
+    テンプレート画像（カラー）を返す。初回のみファイルから読み込む。
+    :param path: 画像のパス
+    :return: 読み取り専用のndarray
+    """
+    return __get(path)[0]
+
+
+def get_template_gray(path: str) -> numpy.ndarray:
+    """
+    テンプレート画像（グレースケール）を返す。初回のみファイルから読み込む。
+    :param path: 画像のパス
+    :return: 読み取り専用のndarray
+    """
+    return __get(path)[1]
+
+
+def get_skill_template_gray() -> numpy.ndarray:
+    return get_template_gray(info.get_template_matching_image_path_skill())
+
+
+def get_rank_template_gray() -> numpy.ndarray:
+    return get_template_gray(info.get_template_matching_image_path_rank())
+
+
+def preload() -> None:
+    """
+    スキル・適正のテンプレート画像を読み込んでおく。
+    """
+    get_skill_template_gray()
+    get_rank_template_gray()
+
+
+def reload(path: str = None) -> None:
+    """
+    テンプレート画像を読み込み直す。画像ファイルを差し替えた場合に使用する。
+    :param path: 画像のパス 省略した場合は読み込み済みの全ての画像
+    """
+    with __lock:
+        paths = [path] if path is not None else list(__templates.keys())
+        for p in paths:
+            __templates[p] = __load(p)
+
+
+def reload_if_modified() -> list:
+    """
+    更新日時が変わったテンプレート画像だけを読み込み直す。
+    常駐プロセス(daemon.py)のみが呼び出す（それ以外は起動時に読み込んだ画像を使用する）。
+    :return: 読み込み直した画像のパスの一覧
+    """
+    modified = [path for path, item in list(__templates.items())
+                if not os.path.exists(path) or os.path.getmtime(path) != item[2]]
+    for path in modified:
+        reload(path)
+    return modified
@@ -0,0 +1,26 @@
+import glob
+import os
+import sys
+
+import pytest
+
+# python -m pytest をどのディレクトリから実行しても、パッケージのモジュールを読み込めるようにする
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(TEST_DIR))
+
+import uma_detail  # noqa: E402
+
+
+def get_test_image_paths() -> list:
+    """
+    :return: test/のウマ娘詳細画面の画像のパスのリスト
+    """
+    return sorted(p for p in glob.glob(os.path.join(TEST_DIR, "*")) if p.lower().endswith((".png", ".jpg")))
+
+
+@pytest.fixture(scope="session")
+def detail_images() -> dict:
+    """
+    :return: {ファイル名: imread_umadetailで抽出した画像}
+    """
+    return {os.path.basename(path): uma_detail.imread_umadetail(path) for path in get_test_image_paths()}
@@ -0,0 +1,14 @@
+import batch
+
+
+def test_load_processed_skips_errors_and_partial_lines(tmp_path):
+    output = tmp_path / "out.jsonl"
+    output.write_text('{"path": "a.png", "error": "SystemExit: 1"}\n'
+                      '{"path": "b.png", "result": {"speed": 1}}\n'
+                      '{"path": "c.png", "res', encoding="utf-8")
+    # 失敗した画像・途中で中断した行の画像は、再開した場合に読み取り直す
+    assert batch.load_processed(str(output)) == {"b.png"}
+
+
+def test_load_processed_missing_file(tmp_path):
+    assert batch.load_processed(str(tmp_path / "none.jsonl")) == set()
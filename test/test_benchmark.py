@@ -0,0 +1,11 @@
+import os
+
+import benchmark
+from src import recognize
+
+
+def test_run_stages_times_every_stage():
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "IMG_0516.PNG")
+    times = benchmark.run_stages(path, recognize.BACKEND_DIGIT)
+    assert list(times) == benchmark.STAGES
+    assert all(elapsed >= 0 for elapsed in times.values())
@@ -0,0 +1,101 @@
+import asyncio
+import os
+import socket
+import stat
+import threading
+
+import pytest
+
+import daemon
+from src import daemon_client
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Unix domain sockets are not available")
+
+
+def serve_once(socket_path: str, response: bytes):
+    """
+    1回だけ接続を受け付け、要求を読み捨てて指定した応答を返すソケットを作成する。
+    """
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(socket_path)
+    listener.listen(1)
+
+    def run():
+        conn, _ = listener.accept()
+        with conn:
+            conn.makefile("rb").readline()
+            conn.sendall(response)
+        listener.close()
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+@pytest.mark.parametrize("response", [b'{"result": "trunc', b"\xff\xfe\n", b"[1, 2]\n"])
+def test_request_returns_none_on_garbled_response(tmp_path, response):
+    socket_path = str(tmp_path / "daemon.sock")
+    thread = serve_once(socket_path, response)
+    # app.pyはNoneの場合にこのプロセスで読み取り直す
+    assert daemon_client.recognize("a.png", socket_path=socket_path) is None
+    thread.join(5)
+
+
+def test_socket_is_created_owner_only(tmp_path):
+    socket_path = str(tmp_path / "daemon.sock")
+
+    async def run():
+        app = daemon.RecognitionDaemon(socket_path, idle_timeout=60)
+        task = asyncio.create_task(app.serve())
+        while not os.path.exists(socket_path):
+            await asyncio.sleep(0.01)
+        mode = stat.S_IMODE(os.stat(socket_path).st_mode)
+        app.stopped.set()
+        await task
+        return mode
+
+    umask = os.umask(0o022)
+    try:
+        assert asyncio.run(run()) == 0o600
+        # 変更したumaskは元に戻す
+        assert os.umask(0o022) == 0o022
+    finally:
+        os.umask(umask)
+
+
+def test_request_ignores_socket_of_other_user(tmp_path, monkeypatch):
+    socket_path = str(tmp_path / "daemon.sock")
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(socket_path)
+    listener.listen(1)
+    try:
+        # 他のユーザーが作成したソケットには、画像のパスを送らない
+        monkeypatch.setattr(os, "getuid", lambda: os.stat(socket_path).st_uid + 1)
+        assert not daemon_client.is_trusted_socket(socket_path)
+        assert daemon_client.recognize("a.png", socket_path=socket_path) is None
+    finally:
+        listener.close()
+
+
+def test_serve_does_not_remove_other_files(tmp_path):
+    socket_path = tmp_path / "daemon.sock"
+    socket_path.write_text("not a socket")
+    assert daemon_client.request({"command": "ping"}, str(socket_path)) is None
+    with pytest.raises(RuntimeError):
+        asyncio.run(daemon.RecognitionDaemon(str(socket_path), idle_timeout=60).serve())
+    assert socket_path.read_text() == "not a socket"
+
+
+def test_default_socket_dir_is_private(tmp_path, monkeypatch):
+    monkeypatch.delenv("UMA_DETAIL_SOCKET", raising=False)
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path / "none"))
+    monkeypatch.setattr(daemon_client.tempfile, "gettempdir", lambda: str(tmp_path))
+    socket_path = daemon_client.get_socket_path()
+    assert os.path.dirname(socket_path) != str(tmp_path)
+    daemon_client.make_socket_dir(socket_path)
+    assert stat.S_IMODE(os.stat(os.path.dirname(socket_path)).st_mode) == 0o700
+
+    # 他のユーザーが書き込めるディレクトリにはソケットを作成しない
+    os.chmod(os.path.dirname(socket_path), 0o777)
+    with pytest.raises(PermissionError):
+        daemon_client.make_socket_dir(socket_path)
@@ -0,0 +1,17 @@
+import csv
+import json
+
+from src import detail_result
+
+
+def test_csv_skills_round_trip(tmp_path):
+    # 区切り文字・引用符を含むスキル名も、読み込んだ時に元のスキル名に戻せること
+    skills = [("a|b", "lv3"), ('c,"d"', ""), ("e", "")]
+    result = detail_result.DetailResult([1, 2, 3, 4, 5], "ABCDEFGSAB", skills)
+    path = str(tmp_path / "out.csv")
+    with detail_result.ColumnWriter(path) as writer:
+        writer.write("x.png", result)
+
+    with open(path, mode='rt', encoding='utf-8', newline='') as fstream:
+        row = list(csv.DictReader(fstream))[0]
+    assert list(zip(json.loads(row["skills"]), json.loads(row["skill_levels"]))) == skills
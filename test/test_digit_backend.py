@@ -0,0 +1,38 @@
+import json
+import os
+
+import uma_detail
+from src import recognize
+
+EXPECTED_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "expected_status.json")
+# 固有スキルのレベル（目視で確認した値）
+# 数字のテンプレート画像はステータスの数字から作成しているため、レベルの数字は作成に使用していない（held-out）
+EXPECTED_LEVELS = {"IMG_0027.PNG": "lv4", "IMG_0028.PNG": "lv2", "IMG_0516.PNG": "lv4", "IMG_0518.PNG": "lv5",
+                   "IMG_TEST_JPG.jpg": "lv5"}
+
+
+def no_tesseract():
+    raise AssertionError("tesseract must not be used with the digit backend")
+
+
+def load_expected() -> dict:
+    with open(EXPECTED_PATH, mode='rt', encoding='utf-8') as fstream:
+        return {key: value for key, value in json.load(fstream).items() if not key.startswith("$")}
+
+
+def test_digit_backend_does_not_use_tesseract(monkeypatch, detail_images):
+    monkeypatch.setattr(recognize, "get_tool", no_tesseract)
+    expected = load_expected()
+    for name, img in detail_images.items():
+        result = uma_detail.get_status_result(img, recognize.BACKEND_DIGIT)
+        assert list(result.status) == [expected[name][field] for field in uma_detail.STATUS_FIELDS], name
+        # 最初のスキルが固有スキル
+        assert result.skills[0][1] == EXPECTED_LEVELS[name], name
+
+
+def test_digit_backend_reads_level_with_skills_only(monkeypatch, detail_images):
+    # スキルだけを読み取る場合も、固有スキルのレベルはtesseractを使用せずに読み取る
+    monkeypatch.setattr(recognize, "get_tool", no_tesseract)
+    for name, img in detail_images.items():
+        skills = uma_detail.get_status_fields(img, [uma_detail.SKILL_FIELD], recognize.BACKEND_DIGIT)
+        assert list(skills[uma_detail.SKILL_FIELD].values())[0] == EXPECTED_LEVELS[name], name
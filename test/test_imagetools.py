@@ -0,0 +1,90 @@
+import itertools
+import os
+import sys
+import time
+
+import numpy
+
+# テストとしてではなく、処理時間の比較のために直接実行した場合もパッケージのモジュールを読み込めるようにする
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import imagetools as imgtools, info_json as info  # noqa: E402
+
+# スキル名の背景除去に使用する輝度（uma_detail.__match_skill_slotと同じ値）
+LUMINANCE = 60
+
+
+def except_light_color_loop(img: numpy.ndarray, luminance: int) -> numpy.ndarray:
+    """
+    ベクトル化する前のexcept_light_color（1画素ずつ輝度を計算する）。
+    """
+    height, width = img.shape[:2]
+    dst = img.copy()
+    for x, y in itertools.product(range(0, width, 1), range(0, height, 1)):
+        colors = dst[(y, x)]
+        dbg = int(imgtools.get_luminance(colors))
+        if not dbg <= luminance:
+            dst[(y, x)] = [255] * 3
+    return dst
+
+
+def get_skill_crops(detail_images: dict) -> list:
+    """
+    test/の画像の各スキルの枠（スキル名の部分）を切り出す。
+    :return: ndarrayのリスト
+    """
+    import uma_detail
+
+    crops = []
+    for img in detail_images.values():
+        for name, _ in info.get_position_skills(uma_detail.get_skill_start_pos(img)):
+            crops.append(img[name.top: name.bottom, name.left: name.right])
+    return crops
+
+
+def test_except_light_color_matches_loop(detail_images):
+    crops = get_skill_crops(detail_images)
+    assert len(crops) > 0
+    for crop in crops:
+        for luminance in (LUMINANCE, 60.5):
+            expected = except_light_color_loop(crop, luminance)
+            numpy.testing.assert_array_equal(imgtools.except_light_color(crop, luminance), expected)
+
+
+def test_except_light_color_threshold_boundary():
+    # 輝度の計算結果がちょうど閾値の前後になる色を全て含む画像で比較する
+    values = numpy.arange(0, 256, 5, dtype=numpy.uint8)
+    img = numpy.array(list(itertools.product(values, repeat=3)), dtype=numpy.uint8).reshape(-1, len(values), 3)
+    for luminance in (0, 30, LUMINANCE, 100):
+        numpy.testing.assert_array_equal(imgtools.except_light_color(img, luminance),
+                                         except_light_color_loop(img, luminance))
+
+
+def test_except_light_color_batch_and_inplace(detail_images):
+    crops = get_skill_crops(detail_images)
+    crops = [crop for crop in crops if crop.shape == crops[0].shape]
+    stacked = numpy.stack(crops)
+    expected = numpy.stack([except_light_color_loop(crop, LUMINANCE) for crop in crops])
+    numpy.testing.assert_array_equal(imgtools.except_light_color(stacked, LUMINANCE), expected)
+
+    copied = stacked.copy()
+    result = imgtools.except_light_color(copied, LUMINANCE, inplace=True)
+    assert result is copied
+    numpy.testing.assert_array_equal(copied, expected)
+
+
+if __name__ == "__main__":
+    # python test/test_imagetools.py [繰り返し回数] : test/の画像のスキルの枠で処理時間を比較する
+    import conftest
+    import uma_detail
+
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    images = {os.path.basename(p): uma_detail.imread_umadetail(p) for p in conftest.get_test_image_paths()}
+    targets = get_skill_crops(images)
+    for label, func in (("loop", except_light_color_loop), ("vectorized", imgtools.except_light_color)):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for target in targets:
+                func(target, LUMINANCE)
+        elapsed = (time.perf_counter() - start) / repeat / len(targets)
+        print("{0}: {1:.3f}ms/枠 ({2}枠)".format(label, elapsed * 1000, len(targets)))
@@ -0,0 +1,28 @@
+import uma_detail
+from src import imagetools as imgtools, info_json as info, rank_classifier, template_matching, template_store
+
+MATCH_SIZE = 100
+
+
+def classify_rank_baseline(img, pos) -> list:
+    """
+    1項目ずつテンプレート画像全体とテンプレートマッチングする、以前の適性の判別。
+    :return: [適性の文字, 一致度]
+    """
+    new_image = imgtools.resize_by_aspect(img[pos.top: pos.bottom, pos.left: pos.right].copy(), MATCH_SIZE)
+    _, max_value, _, max_pt = template_matching.matching(new_image, template_store.get_rank_template_gray())
+    for i, rank in enumerate(rank_classifier.RANKS):
+        if -10 + MATCH_SIZE * i < max_pt[0] < 90 + MATCH_SIZE * i:
+            return [rank, max_value]
+    return ["G", max_value]
+
+
+def test_matches_template_matching(detail_images):
+    positions = [info.get_position(name) for name in uma_detail.SUITABLE_FIELDS]
+    for name, img in detail_images.items():
+        result = rank_classifier.classify_ranks(img, positions)
+        expected = [classify_rank_baseline(img, pos) for pos in positions]
+        assert [rank for rank, _ in result] == [rank for rank, _ in expected], name
+        for field, (_, score), (_, expected_score) in zip(uma_detail.SUITABLE_FIELDS, result, expected):
+            # 最も一致する位置が比較する範囲に含まれていれば、一致度もテンプレート画像全体と比較した場合と同じになる
+            assert abs(score - expected_score) < 1e-4, (name, field)
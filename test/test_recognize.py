@@ -0,0 +1,80 @@
+import json
+import os
+import threading
+
+import pyocr
+import pyocr.builders
+import pytest
+
+import uma_detail
+from src import recognize
+
+EXPECTED_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "expected_status.json")
+
+
+def load_expected() -> dict:
+    with open(EXPECTED_PATH, mode='rt', encoding='utf-8') as fstream:
+        return {key: value for key, value in json.load(fstream).items() if not key.startswith("$")}
+
+
+class StubTool:
+    """
+    tesseractの代わりに、呼び出された回数と読み取り方法だけを記録するツール。
+    """
+
+    def __init__(self):
+        self.builders = []
+        self.threads = []
+
+    def image_to_string(self, img, lang=None, builder=None):
+        self.builders.append(type(builder))
+        self.threads.append(threading.current_thread().name)
+        return [] if isinstance(builder, pyocr.builders.LineBoxBuilder) else "1"
+
+
+def test_tesseract_backend_reads_each_field(monkeypatch, detail_images):
+    # 既定のtesseractは項目ごとに文字認識する（1枚に並べた画像の文字認識は指定した場合のみ）
+    tool = StubTool()
+    monkeypatch.setattr(recognize, "get_tool", lambda: tool)
+    img = detail_images["IMG_0516.PNG"]
+    meta = {}
+    uma_detail.get_skill(img, meta, read_level=False)
+    numbers = uma_detail.get_status_numbers([img], [meta])[0]
+    assert numbers == ["1"] * 5 + ["lv1"]
+    assert tool.builders == [pyocr.builders.TextBuilder] * 6
+
+
+def test_tesseract_backend_uses_workers(monkeypatch, detail_images):
+    # set_workersを指定した場合は、項目ごとの文字認識もスレッドプールで行う
+    tool = StubTool()
+    monkeypatch.setattr(recognize, "get_tool", lambda: tool)
+    img = detail_images["IMG_0516.PNG"]
+    meta = {}
+    uma_detail.get_skill(img, meta, read_level=False)
+    uma_detail.set_workers(4)
+    try:
+        numbers = uma_detail.get_status_numbers([img], [meta])[0]
+    finally:
+        uma_detail.set_workers(0)
+    assert numbers == ["1"] * 5 + ["lv1"]
+    assert len(tool.threads) == 6
+    assert all(name.startswith("uma_detail") for name in tool.threads), tool.threads
+
+
+def test_tesseract_batch_backend_is_single_call(monkeypatch, detail_images):
+    tool = StubTool()
+    monkeypatch.setattr(recognize, "get_tool", lambda: tool)
+    imgs = list(detail_images.values())
+    uma_detail.get_status_numbers(imgs, backend=recognize.BACKEND_TESSERACT_BATCH)
+    assert tool.builders == [pyocr.builders.LineBoxBuilder]
+
+
+@pytest.mark.skipif(not pyocr.get_available_tools(), reason="tesseract is not installed")
+@pytest.mark.parametrize("backend", [recognize.BACKEND_TESSERACT, recognize.BACKEND_TESSERACT_BATCH])
+def test_tesseract_matches_expected(detail_images, backend):
+    # BACKEND_TESSERACT_BATCHを既定にする前に、項目ごとの文字認識と同じ結果になることを確認する
+    expected = load_expected()
+    names = list(expected)
+    numbers = uma_detail.get_status_numbers([detail_images[name] for name in names], backend=backend)
+    for name, number in zip(names, numbers):
+        assert [int(value) for value in number] == [expected[name][field] for field in uma_detail.STATUS_FIELDS], name
@@ -0,0 +1,46 @@
+import os
+
+import cv2
+import numpy
+
+import uma_detail
+from src import metrics
+
+
+def counters(func) -> list:
+    """
+    funcを実行し、出力された件数の名前を返す。
+    """
+    records = []
+    metrics.enable(records.append, log=False)
+    try:
+        func()
+    finally:
+        metrics.disable()
+    return [record["name"] for record in records if record["type"] == "counter"]
+
+
+def test_reduced_decode_is_off_by_default(detail_images):
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "IMG_0027.PNG")
+    numpy.testing.assert_array_equal(uma_detail.imread_umadetail(path), detail_images["IMG_0027.PNG"])
+
+
+def test_reduced_decode_large_jpeg(tmp_path):
+    # 2160pxのPNGをJPEGに変換して、1/2で読み込まれることを確認する
+    src = cv2.imread(os.path.join(os.path.dirname(os.path.abspath(__file__)), "IMG_0027.PNG"))
+    path = str(tmp_path / "large.jpg")
+    cv2.imwrite(path, src, [cv2.IMWRITE_JPEG_QUALITY, 95])
+    with open(path, mode='rb') as fstream:
+        assert uma_detail.get_decode_reduction(numpy.frombuffer(fstream.read(), dtype=numpy.uint8)) == 2
+
+    result = {}
+    names = counters(lambda: result.setdefault("img", uma_detail.imread_umadetail(path, reduced=True)))
+    assert "reduced_decode" in names
+    assert result["img"].shape == uma_detail.imread_umadetail(path).shape
+
+
+def test_reduced_decode_skips_small_images(detail_images):
+    # test/の画像は縮小すると1000pxに足りない（PNGは縮小しない）ため、読み取り結果は変わらない
+    for name, img in detail_images.items():
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), name)
+        numpy.testing.assert_array_equal(uma_detail.imread_umadetail(path, reduced=True), img, name)
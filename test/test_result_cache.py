@@ -0,0 +1,27 @@
+import os
+
+from src import result_cache
+
+
+def get_total_size(directory) -> int:
+    return sum(os.path.getsize(os.path.join(directory, f)) for f in os.listdir(directory))
+
+
+def test_rewrite_same_key_keeps_disk_size(tmp_path):
+    cache = result_cache.ResultCache(directory=str(tmp_path), max_bytes=1000)
+    cache.put("a", "x" * 100)
+    for length in (100, 300, 50, 200):
+        cache.put("b", "y" * length)
+    # 同じキーを書き直しても、合計サイズは実際のファイルの合計と一致する
+    assert cache.disk_bytes == get_total_size(tmp_path) == 300
+    assert cache.get("a") == "x" * 100
+
+
+def test_evict_oldest_when_over_limit(tmp_path):
+    cache = result_cache.ResultCache(capacity=1, directory=str(tmp_path), max_bytes=250)
+    for key in ("a", "b", "c"):
+        cache.put(key, key * 100)
+        os.utime(os.path.join(str(tmp_path), key + ".json"), ns=(0, len(os.listdir(str(tmp_path))) * 10 ** 9))
+    assert cache.disk_bytes == get_total_size(tmp_path) <= 250 * 0.9
+    assert cache.get("a") is None
+    assert cache.get("c") == "c" * 100
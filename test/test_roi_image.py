@@ -0,0 +1,58 @@
+import os
+
+import cv2
+import numpy
+import pytest
+
+import uma_detail
+from conftest import get_test_image_paths
+from src import imagetools as imgtools, info_json as info, recognize, roi_image
+
+
+@pytest.fixture(scope="module")
+def extracted() -> dict:
+    """
+    :return: {ファイル名: 抽出したウマ娘詳細画面（リサイズ前）}
+    """
+    extract = getattr(uma_detail, "__extract")
+    return {os.path.basename(path): extract(uma_detail.decode_image(path)) for path in get_test_image_paths()}
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_resize_region_matches_cv2_resize(seed):
+    # OpenCVのリサイズの計算が変わった場合は、ここで失敗する
+    rng = numpy.random.default_rng(seed)
+    for _ in range(60):
+        src_height, src_width = rng.integers(2, 300, size=2)
+        dst_height, dst_width = rng.integers(1, 300, size=2)
+        channels = rng.choice([1, 3, 4])
+        img = rng.integers(0, 256, size=(src_height, src_width, channels), dtype=numpy.uint8)
+        img = img[:, :, 0] if channels == 1 else img
+        expected = cv2.resize(img, dsize=(int(dst_width), int(dst_height)))
+        rows = imgtools.resize_coefficients(dst_height, src_height, True)
+        cols = imgtools.resize_coefficients(dst_width, src_width)
+        numpy.testing.assert_array_equal(imgtools.resize_region(img, rows, cols), expected)
+
+
+def test_regions_match_full_resize(extracted):
+    # 読み取りに使用する全ての範囲が、全体をリサイズしてから切り出した場合と同じ画素値になること
+    for name, dst in extracted.items():
+        resized = imgtools.resize_by_aspect(dst, uma_detail.DETAIL_HEIGHT)
+        roi = roi_image.RoiImage(dst, uma_detail.DETAIL_HEIGHT)
+        assert roi.shape == resized.shape, name
+        positions = [info.get_position(field) for field in uma_detail.STATUS_FIELDS + uma_detail.SUITABLE_FIELDS]
+        for skill, level in info.get_position_skills(uma_detail.get_skill_start_pos(resized)):
+            positions += [skill, level]
+        for pos in positions:
+            numpy.testing.assert_array_equal(roi[pos.top: pos.bottom, pos.left: pos.right],
+                                             resized[pos.top: pos.bottom, pos.left: pos.right], name)
+        numpy.testing.assert_array_equal(numpy.asarray(roi), resized, name)
+
+
+def test_roi_results_match_resize_first(extracted):
+    for name, dst in extracted.items():
+        expected = uma_detail.get_status_result(imgtools.resize_by_aspect(dst, uma_detail.DETAIL_HEIGHT),
+                                                recognize.BACKEND_DIGIT)
+        result = uma_detail.get_status_result(roi_image.RoiImage(dst, uma_detail.DETAIL_HEIGHT),
+                                              recognize.BACKEND_DIGIT)
+        assert result.to_json() == expected.to_json(), name
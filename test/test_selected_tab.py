@@ -0,0 +1,37 @@
+import uma_detail
+from src import info_json as info
+
+TAB_TRAINING, TAB_SKILL, TAB_FACTOR = info.get_tabs_name()
+
+
+def select_tab(img, tab: str):
+    """
+    選択しているタブの判別に使用する座標の色を変更して、指定したタブを選択している画像を作成する。
+    （スキルのタブを選択している画像の、スキルのタブの色を他のタブに移す）
+    """
+    (skill_left, skill_top), (factor_left, factor_top) = info.get_tabs_selected_detect_pos()
+    selected = img[skill_top, skill_left].copy()
+    dst = img.copy()
+    dst[skill_top, skill_left] = [255] * 3
+    if tab == TAB_FACTOR:
+        dst[factor_top, factor_left] = selected
+    return dst
+
+
+def test_skill_tab_is_detected(detail_images):
+    for name, img in detail_images.items():
+        assert uma_detail.get_selected_tab(img) == TAB_SKILL, name
+
+
+def test_other_tabs_are_detected(detail_images):
+    for name, img in detail_images.items():
+        assert uma_detail.get_selected_tab(select_tab(img, TAB_TRAINING)) == TAB_TRAINING, name
+        assert uma_detail.get_selected_tab(select_tab(img, TAB_FACTOR)) == TAB_FACTOR, name
+
+
+def test_skills_are_skipped_outside_skill_tab(detail_images):
+    img = select_tab(detail_images["IMG_0518.PNG"], TAB_FACTOR)
+    meta = {}
+    assert uma_detail.get_skill_for_tab(img, meta) == {}
+    assert meta["tab"] == TAB_FACTOR
+    assert uma_detail.DetailReader(img).read([uma_detail.SKILL_FIELD])[uma_detail.SKILL_FIELD] == {}
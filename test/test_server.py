@@ -0,0 +1,91 @@
+import asyncio
+import json
+import os
+
+import server
+from src import recognize
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+async def send(port: int, raw: bytes) -> tuple:
+    """
+    localhostのサーバーにリクエストを送信する。
+    :return: (ステータスコード, レスポンスのjson)
+    """
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(raw)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    header, _, body = response.partition(b"\r\n\r\n")
+    return int(header.split(b" ", 2)[1]), json.loads(body.decode("utf-8"))
+
+
+def post(path: str, body: bytes) -> bytes:
+    return "POST {0} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {1}\r\n\r\n" \
+               .format(path, len(body)).encode("latin-1") + body
+
+
+async def run_requests(requests: list, queue_size: int = 1, func=None) -> list:
+    app = server.RecognitionServer(workers=1, queue_size=queue_size)
+    # ポート0を指定して、空いているポートで待ち受ける
+    listener = await app.start("127.0.0.1", 0)
+    try:
+        port = listener.sockets[0].getsockname()[1]
+        if func is not None:
+            return await func(port)
+        return [await send(port, raw) for raw in requests]
+    finally:
+        listener.close()
+        await listener.wait_closed()
+        app.close()
+
+
+def test_recognize_and_malformed_requests():
+    with open(os.path.join(TEST_DIR, "IMG_0518.PNG"), mode='rb') as fstream:
+        image = fstream.read()
+    path = "/recognize?backend=" + recognize.BACKEND_DIGIT
+    (ok_status, ok_body), (bad_status, bad_body), (line_status, _), (health_status, health), \
+        (backend_status, backend_body) = asyncio.run(
+            run_requests([post(path, image), post(path, b"not an image"), b"GARBAGE\r\n\r\n",
+                          b"GET /health HTTP/1.1\r\n\r\n", post("/recognize?backend=unknown", b"x")]))
+
+    assert ok_status == 200
+    assert [ok_body["speed"], ok_body["stamina"], ok_body["power"], ok_body["guts"], ok_body["intelligence"]] == \
+           [1060, 550, 988, 369, 566]
+    # 画像として読み込めないボディ
+    assert bad_status == 400
+    assert bad_body["error"].startswith("ImageDecodeError")
+    # HTTPのリクエストとして不正な形式
+    assert line_status == 400
+    assert health_status == 200 and health["status"] == "ok"
+    # 存在しない読み取り方法は、ワーカープロセスに渡さずに断る
+    assert backend_status == 400
+    assert backend_body["error"] == "unsupported backend: unknown"
+
+
+def test_rejects_when_saturated():
+    with open(os.path.join(TEST_DIR, "IMG_0518.PNG"), mode='rb') as fstream:
+        image = fstream.read()
+    raw = post("/recognize?backend=" + recognize.BACKEND_DIGIT, image)
+
+    async def saturate(port: int) -> list:
+        # ボディを途中まで送った要求で処理中の枠を埋めておく（処理待ちの上限は0）
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(raw[:-100])
+        await writer.drain()
+        await asyncio.sleep(0.2)
+        # 断る場合はボディを読まないため、小さなボディで送る
+        rejected = await send(port, post("/recognize?backend=" + recognize.BACKEND_DIGIT, b"x"))
+        # 残りを送ると、埋めていた要求は通常通り読み取られる
+        writer.write(raw[-100:])
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        return [rejected, int(response.split(b" ", 2)[1])]
+
+    (rejected_status, rejected_body), accepted_status = asyncio.run(run_requests([], queue_size=0, func=saturate))
+    assert rejected_status == 503
+    assert rejected_body["error"] == "server busy"
+    assert accepted_status == 200
@@ -0,0 +1,43 @@
+import cv2
+
+import uma_detail
+from src import recognize, skill_index, skill_matcher, template_matching, template_store
+
+
+def match_full_sheet(target) -> list:
+    """
+    絞り込みを行わずに、スキル一覧画像全体でテンプレートマッチングする。
+    :return: [最大値, 最大値の位置]
+    """
+    gray = template_matching.to_gray(target)
+    _, value, _, pt = cv2.minMaxLoc(cv2.matchTemplate(template_store.get_skill_template_gray(), gray,
+                                                      cv2.TM_CCOEFF_NORMED))
+    return [value, pt]
+
+
+def name_for_match(target, pt) -> str:
+    height, width = target.shape[:2]
+    return skill_index.get_skill_index().name_for_point((pt[0], pt[1], pt[0] + width, pt[1] + height))
+
+
+def test_candidates_match_full_sheet(monkeypatch, detail_images):
+    # test/の全ての画像の全てのスキルの枠で、候補の行に絞り込んだ結果と全体を比較した結果が同じになること
+    targets = []
+    match = skill_matcher.match
+
+    def record(target, count=None):
+        targets.append(target.copy())
+        return match(target, count)
+
+    monkeypatch.setattr(skill_matcher, "match", record)
+    for img in detail_images.values():
+        uma_detail.get_skill(img, read_level=False, backend=recognize.BACKEND_DIGIT)
+    assert len(targets) > 0
+
+    for target in targets:
+        value, pt = match(target)
+        full_value, full_pt = match_full_sheet(target)
+        assert tuple(pt) == tuple(full_pt)
+        # 比較する範囲の大きさによって、一致度は浮動小数点の誤差程度だけ異なる
+        assert abs(value - full_value) < 1e-4
+        assert name_for_match(target, pt) == name_for_match(target, full_pt)
@@ -0,0 +1,76 @@
+import os
+
+import cv2
+import numpy
+import pytest
+
+import uma_detail
+import video
+from src import info_json as info, recognize
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def read_frame(name: str) -> numpy.ndarray:
+    return cv2.imread(os.path.join(TEST_DIR, name))
+
+
+def select_factor_tab(frame: numpy.ndarray) -> numpy.ndarray:
+    """
+    スキルのタブを選択しているスクリーンショットを、因子のタブを選択している画像に変更する。
+    （タブの判別に使用する座標の周辺の色を入れ替える）
+    """
+    dst = frame.copy()
+    detail = getattr(uma_detail, "__extract")(dst)
+    # 抽出した部分は元の画像のビューのため、ビューの中の座標で書き換える
+    scale = detail.shape[0] / uma_detail.DETAIL_HEIGHT
+    (skill_left, skill_top), (factor_left, factor_top) = info.get_tabs_selected_detect_pos()
+    selected = detail[round(skill_top * scale), round(skill_left * scale)].copy()
+    for left, top, color in ((skill_left, skill_top, [255] * 3), (factor_left, factor_top, selected)):
+        y, x = round(top * scale), round(left * scale)
+        detail[y - 4: y + 5, x - 4: x + 5] = color
+    return dst
+
+
+def write_video(path: str, frames: list) -> str:
+    height, width = frames[0].shape[:2]
+    # 可逆圧縮のコーデックで書き込む（読み込んだフレームがスクリーンショットと同じになるように）
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"FFV1"), 5, (width, height))
+    if not writer.isOpened():
+        pytest.skip("FFV1 codec is not available")
+    for frame in frames:
+        writer.write(frame)
+    writer.release()
+    return path
+
+
+def get_skills(name: str) -> list:
+    img = uma_detail.imread_umadetail(os.path.join(TEST_DIR, name))
+    return list(uma_detail.get_skill(img, read_level=False, backend=recognize.BACKEND_DIGIT))
+
+
+def test_merges_skills_of_distinct_frames(tmp_path):
+    first, second = read_frame("IMG_0516.PNG"), read_frame("IMG_0518.PNG")
+    path = write_video(str(tmp_path / "scroll.avi"), [first, first, first, second, second])
+    result = video.recognize_video(path, recognize.BACKEND_DIGIT)
+
+    assert {key: result["meta"][key] for key in ("frames", "distinct_frames", "detail_frames")} == \
+           {"frames": 5, "distinct_frames": 2, "detail_frames": 2}
+    expected = get_skills("IMG_0516.PNG")
+    expected += [skill for skill in get_skills("IMG_0518.PNG") if skill not in expected]
+    assert list(result["skills"]) == expected
+    # ステータスは最初の詳細画面から読み取る
+    assert result["speed"] == 917
+
+
+def test_skips_frames_of_other_tabs(tmp_path):
+    first = read_frame("IMG_0516.PNG")
+    factor = select_factor_tab(read_frame("IMG_0518.PNG"))
+    assert uma_detail.get_selected_tab(uma_detail.extract_umadetail(factor)) == info.get_tabs_name()[2]
+    path = write_video(str(tmp_path / "tabs.avi"), [first, factor, first])
+    result = video.recognize_video(path, recognize.BACKEND_DIGIT)
+
+    assert result["meta"]["distinct_frames"] == 3
+    assert result["meta"]["other_tab_frames"] == 1
+    # 因子のタブのフレームの内容はスキルに追加しない
+    assert list(result["skills"]) == get_skills("IMG_0516.PNG")
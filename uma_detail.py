@@ -1,11 +1,14 @@
-import json
-import math
+import concurrent.futures
+import io
+import os
 from functools import partial
 
 import cv2
 import numpy
+from PIL import Image
 
-from src import imagetools as imgtools, info_json as info, recognize, template_matching
+from src import color_masks, detail_result, errors, imagetools as imgtools, info_json as info, metrics, \
+    rank_classifier, recognize, result_cache, roi_image, skill_index, skill_matcher
 
 GREEN_REF_VAL = [[100, 180, 0], [190, 255, 70]]
 WHITE_REF_VAL = [[250] * 3, [255] * 3]
@@ -21,19 +24,46 @@ is_white_color = \
 :return: bool: Trueなら緑（白）、Falseなら閾値外
 """
 
+# 抽出したウマ娘詳細画面をリサイズする高さ（info.jsonの座標の基準）
+DETAIL_HEIGHT = 1000
+# 縮小して読み込む倍率 → cv2.imdecodeのフラグ
+REDUCED_DECODE_FLAGS = {1: cv2.IMREAD_COLOR, 2: cv2.IMREAD_REDUCED_COLOR_2, 4: cv2.IMREAD_REDUCED_COLOR_4,
+                        8: cv2.IMREAD_REDUCED_COLOR_8}
+# Exifの回転の情報のタグ
+EXIF_ORIENTATION = 0x0112
 
-def __except_string(img: numpy.ndarray) -> numpy.ndarray:
+# 上部・下部のおおよその位置を探す縮小画像の高さ
+EXTRACT_THUMBNAIL_HEIGHT = 250
+
+# 空きのスキルの枠を表す値
+SKILL_SLOT_EMPTY = object()
+
+# 読み取りを並列に行うスレッドプール Noneの場合は順番に処理する
+__executor = None
+
+
+def __get_string_range() -> list:
     """
-    画像の文字部分のみを抽出する。
-    :param img: ndarray
-    :return: 加工したndarray もしくは加工前のndarray
+    文字色の範囲を、cv2.inRangeで使用する両端を含む範囲にして返す。
+    :return: [[R, G, B]の最小値, [R, G, B]の最大値]
     """
     lower, upper = info.get_string_color()
-    # 文字色範囲の値をTrue、範囲外をFalseに置き換えた配列を取得
-    x = ((img > lower[::-1]) & (img < upper[::-1])).all(axis=2)
-    # 置き換えた配列からnonzeroでTrueの位置を抽出して、その位置から画像を切り出して返す。
-    result = numpy.nonzero(x)
-    return img[min(result[0]): max(result[0]) + 1, min(result[1]): max(result[1]) + 1] if len(result[0]) > 0 else img
+    # 文字色は最小値・最大値を含まない範囲
+    return [[value + 1 for value in lower], [value - 1 for value in upper]]
+
+
+def __except_string(mask: numpy.ndarray) -> tuple:
+    """
+    画像の文字部分のみを抽出する範囲を返す。
+    :param mask: 文字色範囲のマスク（画像と同じ大きさ）
+    :return: 文字部分の範囲 (slice(上, 下), slice(左, 右)) 文字色が無い場合は画像全体
+    """
+    # マスクから文字色が含まれる行・列を抽出して、その範囲を返す。
+    rows = numpy.flatnonzero(mask.any(axis=1))
+    if len(rows) == 0:
+        return slice(None), slice(None)
+    columns = numpy.flatnonzero(mask.any(axis=0))
+    return slice(rows[0], rows[-1] + 1), slice(columns[0], columns[-1] + 1)
 
 
 def __get_skillname_for_json(pt) -> str:
@@ -42,137 +72,351 @@ def __get_skillname_for_json(pt) -> str:
     :param pt: テンプレートマッチングで取得した位置
     :return: スキル名
     """
-    with open("json/skill.json", mode='rt', encoding='utf-8') as fstream:
-        read_json = json.load(fstream)
-        string_size = read_json["size"]
-
-        # テンプレートマッチングで取得した位置のY軸の中間を{文字列の間隔}で割った数字で辞書検索
-        pos = (pt[1] + pt[3]) / 2
-        key = math.floor((pos - 2) / string_size)
-        skill_name = read_json[str(key)]
-
-    return skill_name
+    return skill_index.get_skill_index().name_for_point(pt)
 
 
-def __is_circle_or_double(img: numpy.ndarray) -> bool:
+def __is_circle_or_double(string_mask: numpy.ndarray, light_mask: numpy.ndarray) -> bool:
     """
     # 画像の最後の文字が○か◎を判別する
-    :param img: ndarray
+    :param string_mask: 文字部分の文字色範囲のマスク
+    :param light_mask: 文字部分の明るい色（背景として白色に加工する部分）のマスク
     :return: ◎・・・True　○・・・False
     """
     # 画像の右端から文字の色が出現する回数で判断する
     circle_size = 14
     bg_count = 2  # 判別用
 
-    height, width = round(int(img.shape[0]) / 2), int(img.shape[1])
-    cpy_img = img[height: height + 1, width - circle_size: width]
-    lower, upper = info.get_string_color()
-    # 文字色範囲の値をTrue、範囲外をFalseに置き換えた配列を取得
-    x = ((cpy_img > lower[::-1]) & (cpy_img < upper[::-1])).all(axis=2)
-    count = numpy.count_nonzero(x)
+    height, width = round(int(string_mask.shape[0]) / 2), int(string_mask.shape[1])
+    # 背景を白色に加工した画像の文字色の画素 = 文字色範囲かつ明るい色ではない画素
+    count = numpy.count_nonzero((string_mask[height: height + 1, width - circle_size: width] > 0) &
+                                ~light_mask[height: height + 1, width - circle_size: width])
 
     return True if count > bg_count else False
 
 
+def __rows_in_range(columns: numpy.ndarray, ref_val: list) -> numpy.ndarray:
+    """
+    3箇所のいずれかの色が閾値内に収まる行の番号を返す。
+    :param columns: 3箇所の列を並べた画像(ndarray 高さ×3×3)
+    :param ref_val: [[R, G, B]の最小値, [R, G, B]の最大値]
+    :return: ndarray(int) 行の番号の一覧
+    """
+    return numpy.flatnonzero(color_masks.in_range(columns, ref_val[0], ref_val[1]).any(axis=1))
+
+
+def __refine_bound(columns: numpy.ndarray, start: int, stop: int, ref_val: list, first: bool):
+    """
+    縮小画像で見つけた位置の前後だけを元の解像度で調べ、閾値内に収まる最初（最後）の行を返す。
+    :return: 行の番号 見つからない場合はNone
+    """
+    rows = __rows_in_range(columns[start: stop], ref_val)
+    if len(rows) == 0:
+        return None
+    return start + int(rows[0] if first else rows[-1])
+
+
 def __extract_umadetail(img: numpy.ndarray) -> numpy.ndarray:
     """
     画像から背景部分を除いた部分を抽出する。
     :param img : ndarray
     :return: リサイズ後のndarray
+    :raises errors.NotDetailScreenError: 上部（緑）・下部（白）が見つからない
     """
     aspect = info.get_image_aspect()[0]
     height, width = img.shape[:2]
 
-    # 上部(緑部分)を設定する。
     # 検索条件は、誤検知を少なくする為、画像の3箇所（1/3,1/2,2/3地点）の色が閾値内に収まる部分を条件とする。
-    cpy_img = cv2.hconcat([img[0: height, int(width * 0.33): int(width * 0.33) + 1],
-                           img[0: height, int(width * 0.5): int(width * 0.5) + 1],
-                           img[0: height, int(width * 0.66): int(width * 0.66) + 1]])
-    result1 = ((cpy_img >= GREEN_REF_VAL[0][::-1]) & (cpy_img <= GREEN_REF_VAL[1][::-1])).all(axis=2)
-    top_pos = numpy.where(result1 == [True, True, True])[0][0]
-
-    # 下部(白部分)を設定
-    result2 = ((cpy_img >= WHITE_REF_VAL[0][::-1]) & (cpy_img <= WHITE_REF_VAL[1][::-1])).all(axis=2)
-    bottom_pos = numpy.where(result2 == [True, True, True])[0][-1]
+    columns = img[:, [int(width * 0.33), int(width * 0.5), int(width * 0.66)]]
+
+    # 縦方向を1/scaleに縮小した画像で、上部(緑部分)と下部(白部分)のおおよその位置を探す
+    # （縮小時に平均されるため、JPEGのノイズで閾値から外れる画素があっても見つけられる）
+    scale = max(1, height // EXTRACT_THUMBNAIL_HEIGHT)
+    thumbnail = cv2.resize(columns[:height // scale * scale], (3, height // scale), interpolation=cv2.INTER_AREA) \
+        if scale > 1 else columns
+    green = __rows_in_range(thumbnail, GREEN_REF_VAL)
+    white = __rows_in_range(thumbnail, WHITE_REF_VAL)
+    if len(green) == 0:
+        raise errors.NotDetailScreenError("extract_umadetail: header (green) not found")
+    if len(white) == 0 or white[-1] <= green[0]:
+        raise errors.NotDetailScreenError("extract_umadetail: bottom (white) not found")
+
+    # 見つけた位置の前後の範囲だけを元の解像度で調べる 見つからない場合は縮小画像の位置を使用する
+    top_pos = __refine_bound(columns, max(0, (green[0] - 1) * scale), (green[0] + 1) * scale, GREEN_REF_VAL, True)
+    top_pos = green[0] * scale if top_pos is None else top_pos
+    bottom_pos = __refine_bound(columns, white[-1] * scale, (white[-1] + 2) * scale, WHITE_REF_VAL, False)
+    bottom_pos = (white[-1] + 1) * scale - 1 if bottom_pos is None else bottom_pos
 
     # 切り取る高さを基準としてアスペクト比で幅を計算
     true_height = bottom_pos - top_pos
     resize_w = int((width - (true_height * aspect)) / 2)
+    if true_height <= 0 or resize_w < 0:
+        raise errors.NotDetailScreenError("extract_umadetail: unexpected aspect ratio")
 
     # トリミング [top: bottom, left: right]
     dst = img[top_pos: bottom_pos, resize_w: width - resize_w]
     return dst
 
 
-def __get_skill_for_template_matching(img: numpy.ndarray, start_pos: int) -> dict:
+def __is_empty_skill_slot(masks: color_masks.ColorMasks, pos: info.Position) -> bool:
+    """
+    スキルの枠が空き（詳細の背景色のみ）かどうかを判別する。
+    :param masks: スキルの枠の範囲のマスク
+    :param pos: スキル名の位置
+    :return: 空きならTrue
+    """
+    tolerance, ratio = info.get_skills_empty_detect()
+    bg = info.get_color_info_bg()
+    target = masks.crop(masks.in_range([bg - tolerance] * 3, [bg + tolerance] * 3), pos)
+    if target.size == 0:
+        return True
+    # 背景色との差が許容値以内の画素の割合で判断する
+    return numpy.count_nonzero(target) >= target.size * ratio
+
+
+def __format_level(text: str) -> str:
+    """
+    固有スキルのレベルの文字認識結果を"lv{数字}"の形式にする。
+    :param text: 文字認識結果
+    :return: 最後の文字が数字なら"lv{数字}"、それ以外は文字認識結果
+    """
+    return "lv{0}".format(text[-1]) if text[-1:].isdecimal() else text
+
+
+def __match_skill_slot(masks: color_masks.ColorMasks, index: int, skill: info.Position):
+    """
+    スキルの枠1つ分のスキル名を取得する。
+    :param masks: スキルの枠の範囲のマスク
+    :param index: 枠の番号
+    :param skill: スキル名の位置
+    :return: [スキル名, 一致度] 空きの枠の場合はSKILL_SLOT_EMPTY、一致するスキルが無い場合はNone
+    """
+    # 空きの枠は背景の除去・テンプレートマッチング・文字認識を行わない
+    if __is_empty_skill_slot(masks, skill):
+        metrics.count("skill_slot_skipped", slot=index)
+        return SKILL_SLOT_EMPTY
+    # 対象部分の画像を抽出
+    target_img = masks.crop(masks.band, skill)
+    height, width = target_img.shape[:2]
+    # 文字部分の範囲を、共有しているマスクのビューから求める
+    region = __except_string(masks.crop(masks.in_range(*__get_string_range()), skill))
+    # 抜き出した画像の背景色を消去（imgtools.except_light_colorと同じ加工を、共有しているマスクで行う）
+    luminance = 60
+    light_mask = masks.crop(masks.light(luminance), skill)[region]
+    target_img = target_img[region].copy()
+    target_img[light_mask] = 255
+    # ↓　テンプレートマッチング（幅を縮小した画像で一致度の高い行を絞り込んでから比較する）
+    max_value, max_pt = skill_matcher.match(target_img)
+    # ↑　テンプレートマッチング
+    threshold = 0.2
+    # 閾値以下、もしくは[0, 0]の座標を返しているなら処理しない
+    if max_value < threshold or numpy.all(max_pt == numpy.array([0, 0])):
+        metrics.score("skill_match", max_value, slot=index, matched=False)
+        metrics.count("skill_rejected", slot=index)
+        return None
+    metrics.score("skill_match", max_value, slot=index, matched=True)
+    metrics.count("skill_matched", slot=index)
+    pt = max_pt[0], max_pt[1], max_pt[0] + width, max_pt[1] + height
+    # 文字位置からスキル名を取得
+    skill_name = __get_skillname_for_json(pt)
+    # 最終文字が○か◎かどうか判定する
+    if skill_name[-1] in (skill_index.CIRCLE, skill_index.DOUBLE_CIRCLE):
+        string_mask = masks.crop(masks.in_range(*__get_string_range()), skill)[region]
+        skill_name = skill_index.get_skill_index().variant(skill_name, __is_circle_or_double(string_mask, light_mask))
+    return [skill_name, max_value]
+
+
+def __get_skill_for_template_matching(img: numpy.ndarray, start_pos: int, meta: dict = None,
+                                      read_level: bool = True, backend: str = recognize.BACKEND_TESSERACT) -> dict:
     mydict = {}
     position = info.get_position_skills(start_pos)
-    for index, item in enumerate(position):
+    # スキル名の枠全体を1回だけ切り出し、色ごとのマスクを枠の間で共有する
+    names_pos = [skill for skill, lv in position]
+    masks = color_masks.ColorMasks(img, min(pos.top for pos in names_pos), min(pos.left for pos in names_pos),
+                                   max(pos.bottom for pos in names_pos), max(pos.right for pos in names_pos))
+    # 並列実行の場合は枠ごとにスレッドプールで処理する（結果は枠の順番通りに受け取る）
+    if __executor is None:
+        names = (__match_skill_slot(masks, index, skill) for index, skill in enumerate(names_pos))
+    else:
+        names = __executor.map(__match_skill_slot, [masks] * len(names_pos), range(len(names_pos)), names_pos)
+    skipped = 0
+    scores = {}
+    for index, (item, matched) in enumerate(zip(position, names)):
         skill, lv = item
-        # 対象部分の画像を抽出
-        target_img = img[skill.top: skill.bottom, skill.left: skill.right].copy()
-        height, width = target_img.shape[:2]
-        # 抜き出した画像の背景色を消去
-        luminance = 60
-        target_img = imgtools.except_light_color(__except_string(target_img), luminance)
-        # ↓　テンプレートマッチング
-        matching_png = info.get_template_matching_image_path_skill()
-        cv_tmp_match = cv2.imread(matching_png)
-        res = template_matching.matching(cv_tmp_match, target_img)
-        # ↑　テンプレートマッチング
-        threshold = 0.2
-        # 閾値以下、もしくは[0, 0]の座標を返しているなら処理しない
-        if res[1] < threshold or numpy.all(res[3] == numpy.array([0, 0])):
+        if matched is SKILL_SLOT_EMPTY:
+            skipped += 1
+            continue
+        if matched is None:
             continue
-        pt = res[3][0], res[3][1], res[3][0] + width, res[3][1] + height  # max_pt
-        # 文字位置からスキル名を取得
-        skill_name = __get_skillname_for_json(pt)
-        # 最終文字が○か◎かどうか判定する
-        circle, double_circle = "◯", "◎"
-        if skill_name[-1] == circle or skill_name[-1] == double_circle:
-            skill_name = "{0}{1}".format(skill_name[:-1],
-                                         (double_circle if __is_circle_or_double(target_img) else circle))
+        skill_name, scores[skill_name] = matched
         # 初回のスキルだけ、固有スキルの可能性があるので、レベルも取得
         level = ""
-        if index == 0:
-            level = recognize.recognize_number(
-                imgtools.pil_image(img[lv.top: lv.bottom, lv.left: lv.right]))
-            level = "lv{0}".format(level[-1]) if level[-1].isdecimal() else level
+        if index == 0 and read_level:
+            level = __format_level(recognize.recognize_number(
+                imgtools.pil_image(img[lv.top: lv.bottom, lv.left: lv.right]), backend))
+        elif index == 0 and meta is not None:
+            # 文字認識をまとめて行う場合は、読み取る位置だけを記録しておく
+            meta["level_skill"], meta["level_position"] = skill_name, lv
         mydict[skill_name] = level
+    if meta is not None:
+        meta["skipped_slots"], meta["skill_scores"] = skipped, scores
     return mydict
 
 
-def imread_umadetail(img_path: str) -> numpy.ndarray:
+def __read_buffer(source) -> numpy.ndarray:
+    # 画像ファイルの内容をコピーせずにndarray(uint8)として返す
+    if isinstance(source, (str, os.PathLike)):
+        # 日本語を含むパスでも読み込めるように、ファイルの内容を読み込んでからデコードする
+        return numpy.fromfile(source, dtype=numpy.uint8)
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return numpy.frombuffer(source, dtype=numpy.uint8)
+    if hasattr(source, "read"):
+        return numpy.frombuffer(source.read(), dtype=numpy.uint8)
+    raise TypeError("decode_image: unsupported source: %s" % type(source).__name__)
+
+
+def get_decode_reduction(buf: numpy.ndarray, height: int = DETAIL_HEIGHT) -> int:
+    """
+    画像のヘッダーだけを読み取り、縮小して読み込んでも高さがheight以上になる最大の倍率を返す。
+    縮小して読み込むことで処理時間とメモリを減らせるのはJPEGのみのため、それ以外は1を返す。
+    :param buf: 画像ファイルの内容
+    :param height: 縮小後に必要な高さ
+    :return: 1, 2, 4, 8のいずれか
+    """
     try:
-        read_test = cv2.imread(img_path)
-        return imgtools.resize_by_aspect(__extract_umadetail(read_test), 1000)
-    except Exception as e:
-        return e
+        with Image.open(io.BytesIO(buf)) as header:
+            if header.format != "JPEG":
+                return 1
+            width, src_height = header.size
+            # cv2.imdecodeは回転の情報（Exif）に従って回転するので、90度回転する場合は幅が高さになる
+            if header.getexif().get(EXIF_ORIENTATION, 1) in (5, 6, 7, 8):
+                src_height = width
+    except (OSError, SyntaxError, ValueError):
+        return 1
+    for reduction in (8, 4, 2):
+        if src_height // reduction >= height:
+            return reduction
+    return 1
+
+
+def __decode_array(source: numpy.ndarray) -> numpy.ndarray:
+    # 読み込み済みの画像はカラー（3チャンネル）に揃える
+    if source.ndim == 2:
+        return cv2.cvtColor(source, cv2.COLOR_GRAY2BGR)
+    if source.ndim == 3 and source.shape[2] == 4:
+        return cv2.cvtColor(source, cv2.COLOR_BGRA2BGR)
+    if source.ndim == 3 and source.shape[2] == 3 and source.dtype == numpy.uint8:
+        return source
+    raise errors.ImageDecodeError("decode_image: unsupported array: {0} {1}".format(source.shape, source.dtype))
+
+
+def __decode_buffer(buf: numpy.ndarray, reduction: int = 1) -> numpy.ndarray:
+    img = cv2.imdecode(buf, REDUCED_DECODE_FLAGS[reduction]) if buf.size > 0 else None
+    if img is None:
+        raise errors.ImageDecodeError("decode_image: cannot decode image")
+    return img
+
+
+def decode_image(source, reduced: bool = False) -> numpy.ndarray:
+    """
+    画像を読み込む。ファイルのパスの他、メモリ上の画像データ・ファイルオブジェクト・読み込み済みの画像を指定出来る。
+    メモリ上のデータはコピーせずにそのままcv2.imdecodeで読み込む。
+    :param source: ファイルのパス / bytes・bytearray・memoryview / read()を持つオブジェクト / ndarray
+    :param reduced: Trueの場合、高さがDETAIL_HEIGHT以上になる範囲で縮小して読み込む（get_decode_reductionを参照）
+    :return: ndarray [B,G,R]
+    """
+    if isinstance(source, numpy.ndarray):
+        return __decode_array(source)
+    buf = __read_buffer(source)
+    return __decode_buffer(buf, get_decode_reduction(buf) if reduced else 1)
+
+
+def __extract(img: numpy.ndarray) -> numpy.ndarray:
+    with metrics.timer("extract"):
+        dst = __extract_umadetail(img)
+    if dst.size == 0:
+        raise errors.NotDetailScreenError("extract_umadetail: detail screen not found")
+    return dst
+
+
+def __resize(dst: numpy.ndarray, roi: bool = False) -> numpy.ndarray:
+    with metrics.timer("resize"):
+        return roi_image.RoiImage(dst, DETAIL_HEIGHT) if roi else imgtools.resize_by_aspect(dst, DETAIL_HEIGHT)
+
+
+def extract_umadetail(img: numpy.ndarray, roi: bool = False) -> numpy.ndarray:
+    """
+    読み込んだ画像からウマ娘詳細画面の部分を抽出して、高さ1000pxにリサイズする。
+    :param img: ndarray
+    :param roi: Trueの場合、全体をリサイズせずに、読み取りに使用する部分だけを元の解像度から計算するRoiImageを返す
+                （読み取り結果はリサイズした場合と同じ 大きな画像の場合にリサイズの処理時間とメモリを省略できる）
+    :return: リサイズ後のndarray もしくはRoiImage
+    :raises errors.NotDetailScreenError: ウマ娘詳細画面の部分が見つからない
+    """
+    return __resize(__extract(img), roi)
+
+
+def imread_umadetail(source, roi: bool = False, reduced: bool = False) -> numpy.ndarray:
+    """
+    画像を読み込み、ウマ娘詳細画面の部分を抽出する。
+    :param source: ファイルのパス / bytes・bytearray・memoryview / read()を持つオブジェクト / ndarray
+    :param roi: Trueの場合、全体をリサイズしない（extract_umadetailを参照）
+    :param reduced: Trueの場合、JPEGは詳細画面の部分の高さが1000px以上になる範囲で縮小して読み込む（既定はFalse）
+                    （読み込みの処理時間とメモリを減らせるが、リサイズ前の画素値が変わるため適性などの読み取り結果が
+                    変わる場合がある 縮小した結果が1000px未満の場合は縮小せずに読み込み直す）
+    :return: リサイズ後のndarray もしくはRoiImage
+    :raises FileNotFoundError: ファイルが存在しない
+    :raises errors.ImageDecodeError: 画像として読み込めない
+    :raises errors.NotDetailScreenError: ウマ娘詳細画面の部分が見つからない
+    """
+    if isinstance(source, numpy.ndarray) or not reduced:
+        with metrics.timer("decode"):
+            img = decode_image(source)
+        return __resize(__extract(img), roi)
+
+    with metrics.timer("decode"):
+        buf = __read_buffer(source)
+        reduction = get_decode_reduction(buf)
+        img = __decode_buffer(buf, reduction)
+    if reduction > 1:
+        # 抽出した部分の座標は縮小後の画像の座標 高さが足りない場合は縮小せずに読み込み直す
+        try:
+            dst = __extract(img)
+        except errors.NotDetailScreenError:
+            dst = None
+        if dst is not None and dst.shape[0] >= DETAIL_HEIGHT:
+            metrics.count("reduced_decode", reduction=reduction)
+            return __resize(dst, roi)
+        metrics.count("reduced_decode_retry", reduction=reduction)
+        with metrics.timer("decode"):
+            img = __decode_buffer(buf)
+    return __resize(__extract(img), roi)
 
 
 def get_selected_tab(img: numpy.ndarray) -> str:
     """
     読み込んだ画像の選択しているタブを取得する。
     :param img: ndarray
-    :return:
+    :return: info_json.get_tabs_nameのいずれか
     """
     # ["育成情報", "スキル", "因子"]のタブ　適当な箇所の色を抜き出して、白系ではない箇所を選択項目として設定
     # (白系の方が指定する範囲がわかりやすいため)
     min_white, max_white = info.get_tabs_selected_color()
     pos_skill, pos_factor = info.get_tabs_selected_detect_pos()
 
-    if not imgtools.is_color_range(img[pos_skill[0], pos_skill[1]], min_white, max_white, True):
+    # 座標は[left, top]のため、ndarrayは[top, left]の順に指定する
+    if not imgtools.is_color_range(img[pos_skill[1], pos_skill[0]], min_white, max_white, True):
         return info.get_tabs_name()[1]
-    elif not imgtools.is_color_range(img[pos_factor[0], pos_factor[1]], min_white, max_white, True):
+    elif not imgtools.is_color_range(img[pos_factor[1], pos_factor[0]], min_white, max_white, True):
         return info.get_tabs_name()[2]
     else:
         return info.get_tabs_name()[0]
 
 
-def get_skill(img: numpy.ndarray) -> dict:
+def get_skill_start_pos(img: numpy.ndarray) -> int:
     """
-    スキルを取得する。
-    :return: dict [key: スキル名, vallue: スキルLv]
+    スキルの読み込みを開始するY座標を取得する。
+    :param img: ndarray
+    :return: Y座標
     """
     # Y軸が不定の為、Y軸の読み込み開始位置を設定する
     # ※スキル数が14を超える場合、１枚で入り切らず、２枚の読み込みが必要な場合があり、Y軸がズレる可能性があるため
@@ -185,17 +429,49 @@ def get_skill(img: numpy.ndarray) -> dict:
                                      start_pos=[pos_detail.top, pos_skill_detect], min_rgb=[color_detail_bg] * 3,
                                      max_rgb=[color_detail_bg] * 3)
     # Y軸の設定　初期設定の値から最初に”詳細の背景色以外”が見つかる場所 ＋外枠の2px
-    start_pos = imgtools.search_color(img=img, scan_direction=0,
-                                      start_pos=[find_pos, pos_skill_detect], min_rgb=[color_detail_bg] * 3,
-                                      max_rgb=[color_detail_bg] * 3, opt_except=True) + 2
+    return imgtools.search_color(img=img, scan_direction=0,
+                                 start_pos=[find_pos, pos_skill_detect], min_rgb=[color_detail_bg] * 3,
+                                 max_rgb=[color_detail_bg] * 3, opt_except=True) + 2
+
+
+def get_skill(img: numpy.ndarray, meta: dict = None, read_level: bool = True,
+              backend: str = recognize.BACKEND_TESSERACT) -> dict:
+    """
+    スキルを取得する。
+    :param meta: 指定した場合、空きのため読み取りを省略した枠の数を"skipped_slots"に設定する
+    :param read_level: Falseを指定した場合、固有スキルのレベルは読み取らずに、
+                       スキル名を"level_skill"、レベルの位置を"level_position"としてmetaに設定する
+    :param backend: 固有スキルのレベルの読み取り方法 recognize.BACKENDSのいずれか
+    :return: dict [key: スキル名, vallue: スキルLv]
+    """
+    with metrics.timer("skill_anchor"):
+        start_pos = get_skill_start_pos(img)
+    return get_skill_from_pos(img, start_pos, meta, read_level, backend)
 
-    return __get_skill_for_template_matching(img, start_pos)
+
+def get_skill_from_pos(img: numpy.ndarray, start_pos: int, meta: dict = None, read_level: bool = True,
+                       backend: str = recognize.BACKEND_TESSERACT) -> dict:
+    """
+    指定したY座標からスキルを取得する。引数はget_skillと同じ。
+    :param start_pos: get_skill_start_posで取得したY座標
+    :return: dict [key: スキル名, vallue: スキルLv]
+    """
+    with metrics.timer("skill_matching"):
+        return __get_skill_for_template_matching(img, start_pos, meta, read_level, backend)
 
 
 # ステータス
+def __format_status(r: str):
+    if str.isdecimal(r):
+        return r
+    # 数字として読み取れなかった場合は0とする
+    metrics.count("ocr_fallback", text=r)
+    return 0
+
+
 def __get_status(img: numpy.ndarray, pos: info.Position) -> str:
     r = recognize.recognize_number(imgtools.pil_image(img[pos.top: pos.bottom, pos.left: pos.right]))
-    return r if str.isdecimal(r) else 0
+    return __format_status(r)
 
 
 get_status_speed = partial(__get_status, pos=info.get_position_speed())
@@ -207,22 +483,7 @@ get_status_intelligence = partial(__get_status, pos=info.get_position_intelligen
 
 # 適正
 def __get_suitable(img: numpy.ndarray, pos: info.Position) -> str:
-    # テンプレートマッチングに使用する画像を取得
-    match_image = cv2.imread(info.get_template_matching_image_path_rank())
-    match_size = 100
-    match_string = ["S", "A", "B", "C", "D", "E", "F", "G"]
-    new_image = img[pos.top: pos.bottom, pos.left: pos.right].copy()
-    new_image = imgtools.resize_by_aspect(new_image, match_size)
-
-    # テンプレートマッチング（最小値の位置を取得）
-    pt = template_matching.get_template_matching_max_point(new_image, match_image)[0]
-    # 比較する位置を調整（startとendの処理）して、比較結果を返す
-    for i in range(len(match_string)):
-        start = -10 + (match_size * i)
-        end = 90 + (match_size * i)
-        if start < pt < end:
-            return match_string[i]
-    return "G"
+    return rank_classifier.classify_ranks(img, [pos])[0][0]
 
 
 # バ場適正
@@ -240,31 +501,257 @@ get_status_betweener = partial(__get_suitable, pos=info.get_position_betweener()
 get_status_chaser = partial(__get_suitable, pos=info.get_position_chaser())
 
 
+__status_readers = [get_status_speed, get_status_stamina, get_status_power, get_status_guts,
+                    get_status_intelligence]
+# 読み取る項目の名前（jsonのキー）
+STATUS_FIELDS = detail_result.STATUS_FIELDS
+SUITABLE_FIELDS = detail_result.SUITABLE_FIELDS
+SKILL_FIELD = detail_result.SKILL_FIELD
+FIELDS = STATUS_FIELDS + SUITABLE_FIELDS + [SKILL_FIELD]
+__suitable_positions = [info.get_position(name) for name in SUITABLE_FIELDS]
+
+
+def set_workers(workers: int):
+    """
+    1枚の画像の各項目（スキルの枠・ステータス・適性）の読み取りを、共有のスレッドプールで並列に行うように設定する。
+    適性は全ての項目をまとめて1つの処理として扱う。
+    並列に行った場合も、結果は順番に処理した場合と同じになる。
+    :param workers: スレッド数 0以下の場合は並列に行わず、順番に処理する（初期値 デバッグ用）
+    """
+    global __executor
+    if __executor is not None:
+        __executor.shutdown()
+    __executor = concurrent.futures.ThreadPoolExecutor(workers, thread_name_prefix="uma_detail") \
+        if workers > 0 else None
+
+
+def __read_all(readers: list, img: numpy.ndarray) -> list:
+    if __executor is None:
+        return [reader(img) for reader in readers]
+    return list(__executor.map(lambda reader: reader(img), readers))
+
+
 def get_status_all(img: numpy.ndarray):
-    return [get_status_speed(img), get_status_stamina(img), get_status_power(img), get_status_guts(img),
-            get_status_intelligence(img), get_status_turf(img), get_status_dirt(img),
-            get_status_sprint(img), get_status_mile(img), get_status_medium(img), get_status_long(img),
-            get_status_runner(img), get_status_leader(img), get_status_betweener(img),
-            get_status_chaser(img)]
-
-
-def get_status_to_json(img: numpy.ndarray):
-    dict = "{0}".format(get_skill(img)).replace("'", '"')
-    js = '"speed": {0[0]}, ' \
-         '"stamina": {0[1]}, ' \
-         '"power": {0[2]}, ' \
-         '"guts": {0[3]}, ' \
-         '"intelligence": {0[4]},' \
-         '"turf": "{0[5]}", ' \
-         '"dirt": "{0[6]}",' \
-         '"sprint": "{0[7]}",' \
-         '"mile": "{0[8]}",' \
-         '"medium": "{0[9]}",' \
-         '"long": "{0[10]}",' \
-         '"runner": "{0[11]}",' \
-         '"leader": "{0[12]}",' \
-         '"betweener": "{0[13]}",' \
-         '"chaser": "{0[14]}",' \
-         '"skills": {1} ' \
-        .format(get_status_all(img), dict)
-    return "{" + js + "}"
+    return __read_all(__status_readers, img) + get_suitable_all(img)
+
+
+def get_suitable_all(img: numpy.ndarray) -> list:
+    return [rank for rank, score in get_suitable_all_with_score(img)]
+
+
+def get_suitable_all_with_score(img: numpy.ndarray) -> list:
+    """
+    全ての適性（バ場・距離・脚質）をまとめて1回で読み取る。
+    :param img: ndarray
+    :return: [[適性の文字, 一致度], ...] turf, dirt, sprint, mile, medium, long, runner, leader, betweener, chaserの順番
+    """
+    with metrics.timer("aptitude"):
+        result = rank_classifier.classify_ranks(img, __suitable_positions)
+    for name, (rank, score) in zip(SUITABLE_FIELDS, result):
+        metrics.score("aptitude_match", score, field=name, rank=rank)
+    return result
+
+
+def get_status_numbers(imgs: list, metas: list = None, backend: str = recognize.BACKEND_TESSERACT) -> list:
+    """
+    複数の画像のステータス（と固有スキルのレベル）を取得する。
+    recognize.BACKEND_TESSERACT_BATCHの場合は、全ての画像の数字を1回の文字認識でまとめて読み取る。
+    それ以外はset_workersで並列に行うように設定した場合、項目ごとの文字認識を共有のスレッドプールで行う。
+    :param imgs: ndarrayのリスト
+    :param metas: get_skill(read_level=False)で取得したmetaのリスト 指定した場合、固有スキルのレベルも読み取る
+    :param backend: ステータス・固有スキルのレベルの読み取り方法 recognize.BACKENDSのいずれか
+                    （BACKEND_DIGITの場合はtesseractを使用しない）
+    :return: [[スピード, スタミナ, パワー, 根性, 賢さ, 固有スキルのレベル], ...]
+             固有スキルのレベルはmetasを指定し、かつ固有スキルがある場合のみ
+    """
+    positions = [info.get_position_speed(), info.get_position_stamina(), info.get_position_power(),
+                 info.get_position_guts(), info.get_position_intelligence()]
+    metas = metas if metas is not None else [{}] * len(imgs)
+
+    # 全ての画像から文字認識する部分を抽出して、まとめて文字認識を行う
+    crops, level_crops = [], []
+    for img, meta in zip(imgs, metas):
+        crops += [imgtools.pil_image(img[pos.top: pos.bottom, pos.left: pos.right]) for pos in positions]
+        if "level_position" in meta:
+            pos = meta["level_position"]
+            level_crops.append(imgtools.pil_image(img[pos.top: pos.bottom, pos.left: pos.right]))
+    with metrics.timer("status_ocr"):
+        if __executor is None or backend == recognize.BACKEND_TESSERACT_BATCH:
+            texts = recognize.recognize_number_batch(crops + level_crops, backend)
+        else:
+            # 項目ごとに文字認識する場合は、共有のスレッドプールで並列に行う（結果は項目の順番通りに受け取る）
+            texts = list(__executor.map(partial(recognize.recognize_number, backend=backend), crops + level_crops))
+        texts, level_texts = iter(texts[:len(crops)]), iter(texts[len(crops):])
+
+    result = []
+    for meta in metas:
+        numbers = [__format_status(next(texts)) for _ in positions]
+        result.append(numbers + ([__format_level(next(level_texts))] if "level_position" in meta else []))
+    return result
+
+
+def get_status_result_list(imgs: list, backend: str = recognize.BACKEND_TESSERACT,
+                           cache: result_cache.ResultCache = None) -> list:
+    """
+    複数の画像の読み取り結果をDetailResultのリストで返す。数字の文字認識はget_status_numbersでまとめて行う。
+    :param imgs: ndarrayのリスト
+    :param backend: ステータスの読み取り方法 recognize.BACKENDSのいずれか
+    :param cache: 指定した場合、同じ画像の読み取り結果はキャッシュから返す
+    :return: DetailResultのリスト
+    """
+    with metrics.timer("total"):
+        return __get_status_result_list(imgs, backend, cache)
+
+
+def __get_status_result_list(imgs: list, backend: str, cache: result_cache.ResultCache) -> list:
+    keys = [cache.key(img, backend) for img in imgs] if cache is not None else [None] * len(imgs)
+    cached = [cache.get(key) if cache is not None else None for key in keys]
+    result = [detail_result.DetailResult.from_json(item) if item is not None else None for item in cached]
+    # キャッシュに無い画像だけを読み取る
+    targets = [i for i, item in enumerate(result) if item is None]
+    imgs = [imgs[i] for i in targets]
+    if cache is not None:
+        metrics.count("cache_hit", len(result) - len(targets))
+        metrics.count("cache_miss", len(targets))
+
+    # 並列実行の場合、適性は他の項目と関係なく読み取れるので、先にスレッドプールで読み取りを始めておく
+    # スキルの枠はget_skillの中でスレッドプールに分配されるので、スレッドプールの中で待ち合わせることはない
+    suitables = [__executor.submit(get_suitable_all_with_score, img) for img in imgs] \
+        if __executor is not None else None
+
+    metas = [{"tab": get_selected_tab(img)} for img in imgs]
+    skills = [get_skill_for_tab(img, meta, read_level=False) for img, meta in zip(imgs, metas)]
+    numbers = get_status_numbers(imgs, metas, backend)
+
+    for index, (i, img, skill, meta, number) in enumerate(zip(targets, imgs, skills, metas, numbers)):
+        if "level_skill" in meta:
+            skill[meta["level_skill"]] = number[5]
+        suitable = get_suitable_all_with_score(img) if suitables is None else suitables[index].result()
+        scores = meta.get("skill_scores", {})
+        result[i] = detail_result.DetailResult(
+            number[:5], [rank for rank, _ in suitable], skill, [score for _, score in suitable],
+            [scores.get(name) for name in skill], meta.get("skipped_slots", 0), meta["tab"])
+        if cache is not None:
+            # 一致度も含めて保存する
+            cache.put(keys[i], result[i].to_json(confidence=True))
+    return result
+
+
+def get_status_result(img: numpy.ndarray, backend: str = recognize.BACKEND_TESSERACT,
+                      cache: result_cache.ResultCache = None) -> detail_result.DetailResult:
+    """
+    画像1枚の読み取り結果をDetailResultで返す。
+    :param img: ndarray
+    :param backend: ステータスの読み取り方法 recognize.BACKENDSのいずれか
+    :param cache: 指定した場合、同じ画像の読み取り結果はキャッシュから返す
+    :return: DetailResult
+    """
+    return get_status_result_list([img], backend, cache)[0]
+
+
+def get_status_to_json_list(imgs: list, backend: str = recognize.BACKEND_TESSERACT,
+                            cache: result_cache.ResultCache = None) -> list:
+    """
+    複数の画像の読み取り結果をjson文字列のリストで返す。数字の文字認識はget_status_numbersでまとめて行う。
+    :param imgs: ndarrayのリスト
+    :param backend: ステータスの読み取り方法 recognize.BACKENDSのいずれか
+    :param cache: 指定した場合、同じ画像の読み取り結果はキャッシュから返す
+    :return: json文字列のリスト
+    """
+    return [result.to_json() for result in get_status_result_list(imgs, backend, cache)]
+
+
+def get_status_to_json(img: numpy.ndarray, backend: str = recognize.BACKEND_TESSERACT,
+                       cache: result_cache.ResultCache = None):
+    return get_status_to_json_list([img], backend, cache)[0]
+
+
+def get_skill_for_tab(img: numpy.ndarray, meta: dict, read_level: bool = True,
+                      backend: str = recognize.BACKEND_TESSERACT) -> dict:
+    """
+    スキルのタブが選択されている場合のみ、スキルを読み取る。
+    :param img: ndarray
+    :param meta: get_skillのmeta "tab"が無い場合はget_selected_tabで判別して設定する
+    :param read_level: get_skillのread_level
+    :param backend: get_skillのbackend
+    :return: {スキル名: レベル} スキルのタブではない場合は空
+    """
+    if "tab" not in meta:
+        meta["tab"] = get_selected_tab(img)
+    if meta["tab"] != info.get_tabs_name()[1]:
+        metrics.count("skill_tab_skipped", tab=meta["tab"])
+        meta["skipped_slots"] = 0
+        return {}
+    return get_skill(img, meta, read_level, backend)
+
+
+class DetailReader:
+    """
+    1枚の画像から、必要な項目だけを必要になった時に読み取る。読み取った項目は保持し、2回目以降は読み取らない。
+    スキルは選択しているタブ（get_selected_tab）がスキルの場合のみ読み取る。
+
+    reader = DetailReader(img)
+    reader.read(["speed", "skills"])  # {"speed": 1060, "skills": {...}} ステータスと固有スキルのレベルはまとめて文字認識する
+    reader["turf"]                    # 適性のみ読み取る
+    """
+
+    def __init__(self, img: numpy.ndarray, backend: str = recognize.BACKEND_TESSERACT):
+        """
+        :param img: imread_umadetailで抽出した画像
+        :param backend: ステータスの読み取り方法
+        """
+        self.img = img
+        self.backend = backend
+        self.meta = {}
+        self.__values = {}
+
+    @property
+    def tab(self) -> str:
+        """
+        選択しているタブ
+        """
+        if "tab" not in self.meta:
+            self.meta["tab"] = get_selected_tab(self.img)
+        return self.meta["tab"]
+
+    def __getitem__(self, field: str):
+        return self.read([field])[field]
+
+    def read(self, fields: list = None) -> dict:
+        """
+        指定した項目を読み取る。同時に指定した項目は、まとめて読み取る。
+        :param fields: 項目の名前（FIELDS）のリスト 省略した場合は全ての項目
+        :return: {項目の名前: 値}
+        :raises KeyError: 存在しない項目を指定した
+        """
+        fields = FIELDS if fields is None else list(fields)
+        unknown = [field for field in fields if field not in FIELDS]
+        if unknown:
+            raise KeyError("DetailReader: unknown fields: {0}".format(unknown))
+        missing = [field for field in fields if field not in self.__values]
+
+        read_status = any(field in STATUS_FIELDS for field in missing)
+        if SKILL_FIELD in missing:
+            # 固有スキルのレベルは、ステータスも読み取る場合はステータスと一緒に文字認識する
+            self.__values[SKILL_FIELD] = get_skill_for_tab(self.img, self.meta, not read_status, self.backend)
+        if read_status:
+            level = SKILL_FIELD in missing and "level_skill" in self.meta
+            numbers = get_status_numbers([self.img], [self.meta if level else {}], self.backend)[0]
+            self.__values.update(zip(STATUS_FIELDS, numbers))
+            if level:
+                self.__values[SKILL_FIELD][self.meta["level_skill"]] = numbers[5]
+
+        if any(field in SUITABLE_FIELDS for field in missing):
+            self.__values.update(zip(SUITABLE_FIELDS, get_suitable_all(self.img)))
+        return {field: self.__values[field] for field in fields}
+
+
+def get_status_fields(img: numpy.ndarray, fields: list, backend: str = recognize.BACKEND_TESSERACT) -> dict:
+    """
+    指定した項目だけを読み取る。（DetailReaderを参照）
+    :param img: imread_umadetailで抽出した画像
+    :param fields: 項目の名前（FIELDS）のリスト
+    :param backend: ステータスの読み取り方法
+    :return: {項目の名前: 値}
+    """
+    return DetailReader(img, backend).read(fields)
@@ -0,0 +1,131 @@
+import argparse
+import json
+import sys
+
+import cv2
+import numpy
+
+import uma_detail
+from src import errors, info_json as info, recognize
+
+# 変化の判別に使用する縮小画像の幅
+THUMBNAIL_WIDTH = 64
+
+
+def iter_frames(path: str, step: int = 1):
+    """
+    動画ファイルから1フレームずつ読み込む。読み込んだフレームは保持しない。
+    :param path: 動画ファイルのパス
+    :param step: 何フレームごとに読み込むか 間のフレームはデコードしない
+    :return: (フレーム番号, ndarray)のジェネレーター
+    """
+    capture = cv2.VideoCapture(path)
+    if not capture.isOpened():
+        raise errors.ImageDecodeError("iter_frames: cannot open video: {0}".format(path))
+    try:
+        index = 0
+        while True:
+            if index % step:
+                if not capture.grab():
+                    break
+            else:
+                ok, frame = capture.read()
+                if not ok:
+                    break
+                yield index, frame
+            index += 1
+    finally:
+        capture.release()
+
+
+def thumbnail(img: numpy.ndarray) -> numpy.ndarray:
+    """
+    変化の判別に使用する、縮小したグレースケール画像を作成する。
+    :param img: ndarray
+    :return: ndarray(float32)
+    """
+    height, width = img.shape[:2]
+    size = (THUMBNAIL_WIDTH, max(1, round(height * THUMBNAIL_WIDTH / width)))
+    return cv2.resize(cv2.cvtColor(img, cv2.COLOR_BGR2GRAY), size, interpolation=cv2.INTER_AREA).astype(numpy.float32)
+
+
+def iter_distinct_frames(frames, threshold: float):
+    """
+    直前に返したフレームとほとんど同じフレームを除く。比較には縮小画像のみを保持する。
+    :param frames: (フレーム番号, ndarray)のイテラブル
+    :param threshold: 縮小画像の画素値の差の平均がこの値以下の場合は同じフレームとする
+    :return: (フレーム番号, ndarray)のジェネレーター
+    """
+    last = None
+    for index, frame in frames:
+        current = thumbnail(frame)
+        if last is not None and last.shape == current.shape and float(numpy.abs(current - last).mean()) <= threshold:
+            continue
+        last = current
+        yield index, frame
+
+
+def recognize_video(path: str, backend: str = recognize.BACKEND_TESSERACT, threshold: float = 2.0,
+                    step: int = 1) -> dict:
+    """
+    スクロールしながら録画した動画を読み取り、スキルをまとめた1件の読み取り結果を返す。
+    ステータス・適性・固有スキルのレベルは最初に見つかった詳細画面から読み取り、
+    スキルはそれ以降の詳細画面から見つかった順に重複を除いて追加する。（スキルのタブ以外を選択しているフレームは除く）
+    :param path: 動画ファイルのパス
+    :param backend: ステータスの読み取り方法
+    :param threshold: 同じフレームとする差（iter_distinct_frames）
+    :param step: 何フレームごとに読み込むか
+    :return: 読み取り結果 "meta"に読み込んだフレーム数などを追加する
+    :raises errors.NotDetailScreenError: 詳細画面のフレームが無い
+    """
+    result = None
+    counts = {"frames": 0, "distinct_frames": 0, "detail_frames": 0, "other_tab_frames": 0}
+
+    def count_frames(frames):
+        for item in frames:
+            counts["frames"] += 1
+            yield item
+
+    for _, frame in iter_distinct_frames(count_frames(iter_frames(path, step)), threshold):
+        counts["distinct_frames"] += 1
+        try:
+            img = uma_detail.extract_umadetail(frame)
+        except errors.NotDetailScreenError:
+            continue
+        counts["detail_frames"] += 1
+        if result is None:
+            result = uma_detail.get_status_result(img, backend).to_dict()
+            continue
+        meta = {}
+        skills = uma_detail.get_skill_for_tab(img, meta, read_level=False, backend=backend)
+        if meta["tab"] != info.get_tabs_name()[1]:
+            counts["other_tab_frames"] += 1
+        for skill in skills:
+            result["skills"].setdefault(skill, "")
+
+    if result is None:
+        raise errors.NotDetailScreenError("recognize_video: detail screen not found: {0}".format(path))
+    result["meta"].update(counts)
+    return result
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description="スキル一覧をスクロールしながら録画した動画を読み取り、結果をjsonで出力します。")
+    parser.add_argument("video", help="動画ファイル")
+    parser.add_argument("--backend", default=recognize.BACKEND_TESSERACT,
+                        choices=recognize.BACKENDS, help="ステータスの読み取り方法")
+    parser.add_argument("--threshold", type=float, default=2.0,
+                        help="直前のフレームとの差（縮小画像の画素値の差の平均）がこの値以下のフレームは読み取らない")
+    parser.add_argument("--step", type=int, default=1, help="何フレームごとに読み込むか")
+    args = parser.parse_args(argv)
+    try:
+        result = recognize_video(args.video, args.backend, args.threshold, max(1, args.step))
+    except errors.UmaDetailError as e:
+        print("{0}: {1}".format(type(e).__name__, e), file=sys.stderr)
+        return 1
+    print(json.dumps(result, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())